@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+# Cache-Control per read endpoint. Clients revalidate cheaply with the
+# ETag once max-age passes; stale-while-revalidate lets CDNs answer first.
+CACHE_POLICIES = {
+    "passport": "public, max-age=60, stale-while-revalidate=300",
+    "reviews": "public, max-age=30, stale-while-revalidate=120",
+    "reviews_private": "private, max-age=0, must-revalidate",
+    "review_summary": "public, max-age=60, stale-while-revalidate=300",
+    "latest_materials": "public, max-age=300, stale-while-revalidate=600",
+}
+
+
+def make_etag(*parts) -> str:
+    """Weak validator from version counters and ids; never hashes a body."""
+    return 'W/"' + "-".join(str(p) for p in parts) + '"'
+
+
+def cache_headers(policy: str, etag: str, last_modified: datetime | None = None, vary: str | None = None) -> dict:
+    headers = {"ETag": etag, "Cache-Control": CACHE_POLICIES[policy]}
+
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_utc(last_modified), usegmt=True)
+    if vary:
+        headers["Vary"] = vary
+
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None = None) -> bool:
+    """
+    RFC 9110 evaluation: If-None-Match (weak comparison) wins; otherwise
+    If-Modified-Since at one-second resolution.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        return "*" in tags or etag.removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return _utc(last_modified).replace(microsecond=0) <= _utc(since)
+
+    return False
+
+
+def not_modified(headers: dict) -> Response:
+    return Response(status_code=304, headers=headers)
+
+
+def _utc(value: datetime) -> datetime:
+    # Stored timestamps are naive UTC (datetime.utcnow)
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
@@ -0,0 +1,88 @@
+import contextvars
+import uuid
+
+from fastapi import HTTPException
+
+from app.core.security import decode_token
+from app.utils.logger import request_id_var
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+
+class RequestIdMiddleware:
+    """
+    Assign every request a correlation id (or reuse the caller's
+    X-Request-ID), expose it to logging and echo it back in the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == REQUEST_ID_HEADER:
+                request_id = value.decode("latin-1")[:64]
+                break
+
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (REQUEST_ID_HEADER, request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
+
+
+# User id behind the current request, recorded on outbox events
+actor_var = contextvars.ContextVar("actor_id", default=None)
+
+
+class ActorMiddleware:
+    """
+    Expose the bearer token's user id as actor_var for the whole request.
+
+    Set here rather than in get_current_user: sync dependencies run in a
+    copied context, so a value set there never reaches the endpoint's flush.
+    Only the signature is checked; routes still authenticate as before.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        actor_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"authorization":
+                actor_id = _token_subject(value.decode("latin-1"))
+                break
+
+        token = actor_var.set(actor_id)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            actor_var.reset(token)
+
+
+def _token_subject(header: str):
+    if header[:7].lower() != "bearer ":
+        return None
+    try:
+        return int(decode_token(header[7:], "access")["sub"])
+    except (HTTPException, KeyError, ValueError):
+        return None
@@ -0,0 +1,205 @@
+"""
+Per-client token buckets and threadpool load shedding for expensive routes.
+
+Routes opt in with `dependencies=[Depends(rate_limit("batch_create"))]`.
+Each client (JWT `sub`, else IP) has one bucket of RATE_LIMIT_BURST tokens
+refilled at RATE_LIMIT_PER_MINUTE; a route spends its ROUTE_COSTS weight
+per call. Buckets live in-process unless RATE_LIMIT_REDIS_URL is set, in
+which case every worker shares them through Redis.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import anyio.to_thread
+from fastapi import HTTPException, Request
+
+from app.core.security import decode_token
+from app.utils.logger import get_logger
+
+try:
+    import redis.asyncio as aioredis
+    from redis.exceptions import RedisError
+except ImportError:  # optional; only needed for RATE_LIMIT_REDIS_URL
+    aioredis = None
+
+logger = get_logger("rate_limit")
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "120"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "120"))
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL")
+# Reverse proxies in front of the app (Render's router counts as one). Each
+# appends the address it received the request from to X-Forwarded-For, so
+# the client is the Nth entry from the right; anything further left is
+# client-supplied and ignored. RATE_LIMIT_TRUST_FORWARDED=true means 1.
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "1" if RATE_LIMIT_TRUST_FORWARDED else "0"))
+
+# Reject guarded requests with 503 once this many sync handlers are
+# already waiting for a worker thread
+SHED_QUEUE_DEPTH = int(os.getenv("SHED_QUEUE_DEPTH", "32"))
+SHED_RETRY_AFTER_SECONDS = int(os.getenv("SHED_RETRY_AFTER_SECONDS", "2"))
+
+# Tokens spent per call; LLM-backed writes cost far more than reads
+ROUTE_COSTS = {
+    "batch_create": 10,
+    "transport_create": 5,
+    "ai_generate_score": 20,
+    "passport_view": 1,
+}
+
+MAX_LOCAL_BUCKETS = 100_000
+
+
+# =====================================================
+# BUCKETS
+# =====================================================
+
+class LocalBuckets:
+    """Thread-safe in-process token buckets with LRU eviction."""
+
+    def __init__(self, rate_per_second: float, burst: float, max_keys: int = MAX_LOCAL_BUCKETS):
+        self.rate = rate_per_second
+        self.burst = burst
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    async def acquire(self, key: str, cost: float) -> float:
+        return self.take(key, cost)
+
+    def take(self, key: str, cost: float) -> float:
+        """Spend `cost` tokens; returns 0 if allowed, else seconds to wait."""
+        now = time.monotonic()
+
+        with self.lock:
+            tokens, updated = self.buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / self.rate
+
+            self.buckets[key] = (tokens, now)
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+
+        return wait
+
+
+# KEYS[1] = bucket; ARGV = rate/s, burst, cost, now (seconds)
+REDIS_TOKEN_BUCKET = """
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local rate, burst, cost, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBuckets:
+    """Same buckets shared by every worker; fails open if Redis is down."""
+
+    def __init__(self, url: str, rate_per_second: float, burst: float):
+        self.rate = rate_per_second
+        self.burst = burst
+        self.client = aioredis.Redis.from_url(url, socket_timeout=0.2)
+        self.script = self.client.register_script(REDIS_TOKEN_BUCKET)
+
+    async def acquire(self, key: str, cost: float) -> float:
+        try:
+            return float(await self.script(
+                keys=[f"ratelimit:{key}"],
+                args=[self.rate, self.burst, cost, time.time()],
+            ))
+        except RedisError as e:
+            logger.warning(f"Rate limit backend unavailable, allowing request: {e}")
+            return 0.0
+
+
+def _create_buckets():
+    rate = RATE_LIMIT_PER_MINUTE / 60.0
+
+    if RATE_LIMIT_REDIS_URL:
+        if aioredis is None:
+            logger.warning("RATE_LIMIT_REDIS_URL set but redis is not installed; using in-process buckets")
+        else:
+            return RedisBuckets(RATE_LIMIT_REDIS_URL, rate, RATE_LIMIT_BURST)
+
+    return LocalBuckets(rate, RATE_LIMIT_BURST)
+
+
+buckets = _create_buckets()
+
+
+# =====================================================
+# DEPENDENCY
+# =====================================================
+
+def client_key(request: Request) -> str:
+    """User id from a valid access token, else the client IP."""
+    auth = request.headers.get("authorization", "")
+    if auth[:7].lower() == "bearer ":
+        try:
+            return f"user:{decode_token(auth[7:], 'access')['sub']}"
+        except HTTPException:
+            pass  # the route's own auth will reject it
+
+    if RATE_LIMIT_TRUSTED_PROXIES > 0:
+        hops = [h.strip() for h in request.headers.get("x-forwarded-for", "").split(",") if h.strip()]
+        if len(hops) >= RATE_LIMIT_TRUSTED_PROXIES:
+            return f"ip:{hops[-RATE_LIMIT_TRUSTED_PROXIES]}"
+
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def threadpool_waiting() -> int:
+    """Sync handlers queued for a worker thread right now."""
+    return anyio.to_thread.current_default_thread_limiter().statistics().tasks_waiting
+
+
+def rate_limit(route: str):
+    """
+    Dependency enforcing ROUTE_COSTS[route]. Declared async so it runs on the
+    event loop and rejects before the request takes a threadpool slot.
+    """
+    cost = ROUTE_COSTS[route]
+
+    async def limiter(request: Request):
+        if not RATE_LIMIT_ENABLED:
+            return
+
+        waiting = threadpool_waiting()
+        if waiting >= SHED_QUEUE_DEPTH:
+            logger.warning(f"Shedding {route}: {waiting} requests waiting for a worker thread")
+            raise HTTPException(
+                status_code=503,
+                detail="Server busy, retry shortly",
+                headers={"Retry-After": str(SHED_RETRY_AFTER_SECONDS)},
+            )
+
+        wait = await buckets.acquire(client_key(request), cost)
+
+        if wait > 0:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+
+    return limiter
@@ -0,0 +1,15 @@
+from fastapi import Response
+from pydantic import BaseModel
+
+
+class ModelResponse(Response):
+    """
+    Serialize a Pydantic model straight to JSON bytes in pydantic-core,
+    skipping FastAPI's response_model re-validation and jsonable_encoder.
+    Routes still declare response_model for the OpenAPI schema.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, model: BaseModel, **kwargs):
+        super().__init__(content=model.model_dump_json(), **kwargs)
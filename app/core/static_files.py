@@ -0,0 +1,59 @@
+import mimetypes
+import stat
+
+import anyio.to_thread
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse
+
+# Preferred order when the client accepts several encodings
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+def accepted_encodings(headers: Headers) -> set:
+    accepted = set()
+
+    for part in headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.replace(" ", "").removeprefix("q=")
+        if params and q.replace(".", "").strip("0") == "":
+            continue  # q=0 means "not acceptable"
+        if name:
+            accepted.add(name.lower())
+
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves a sibling .br / .gz file when the client accepts
+    it, so pre-rendered JSON is never compressed per request.
+    """
+
+    async def get_response(self, path: str, scope):
+        headers = Headers(scope=scope)
+        accepted = accepted_encodings(headers)
+
+        if scope["method"] in ("GET", "HEAD"):
+            for encoding, suffix in ENCODINGS:
+                if encoding not in accepted:
+                    continue
+
+                full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+                if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                    continue
+
+                response = FileResponse(
+                    full_path,
+                    stat_result=stat_result,
+                    media_type=mimetypes.guess_type(path)[0] or "application/octet-stream",
+                    headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+                )
+                if self.is_not_modified(response.headers, headers):
+                    return NotModifiedResponse(response.headers)
+                return response
+
+        response = await super().get_response(path, scope)
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
@@ -1,17 +1,27 @@
 import traceback
+from datetime import datetime
 
 from sqlalchemy.orm import Session, joinedload, selectinload
-from sqlalchemy import or_
+from sqlalchemy import or_, select, func
 from sqlalchemy.exc import IntegrityError
 from app.models.batch import Batch, BatchStatus, ValidationStatus
 from app.models.product import Product
 from app.models.ai_score import AIScore
 from app.services.change_analyzer import classify_change
 from app.services.ai_engine import generate_ai_rating
+from app.services.rule_scorer import score_composition, needs_escalation
+from app.services.composition import composition_vector, composition_fingerprint, parse_vector
+from app.services.report_bodies import store_body
+from app.crud.lab_queue import enqueue_batch
 from app.core.config import APP_BASE_URL
 from app.crud.material import add_materials
-from app.models.material import BatchMaterial
+from app.crud.location import get_location_id
+from app.crud.product import invalidate_manufacturer_dashboard
+from app.models.material import BatchMaterial, Material
 from app.models.lab_report import LabReport
+from app.utils.logger import get_logger
+
+logger = get_logger("crud.batch")
 
 def extract_product_details(product):
     return {
@@ -22,6 +32,76 @@ def extract_product_details(product):
     }
 
 
+def _rule_materials(db: Session, current_materials: list) -> list:
+    """Attach Material.risk_level to the submitted composition."""
+    names = [m["name"] for m in current_materials]
+    risk_levels = dict(
+        db.query(Material.name, Material.risk_level)
+        .filter(Material.name.in_(names))
+        .all()
+    ) if names else {}
+
+    return [
+        {**m, "risk_level": risk_levels.get(m["name"])}
+        for m in current_materials
+    ]
+
+
+def escalate_score(db: Session, batch, product_details: dict, current_materials: list):
+    """
+    Replace the rule score create_batch stored with an LLM rating. Called
+    after the batch committed: the LLM can take LLM_TIMEOUT_SECONDS, and a
+    transaction held open that long keeps its outbox ids invisible until
+    the dispatcher gives them up as rolled back. If the LLM gives no
+    rating, the rule score is kept for refresh_stale_ai_scores to retry.
+    """
+    try:
+        ai_rating = generate_ai_rating(product_details, batch, current_materials)
+        if ai_rating["rating"] is None:
+            return
+
+        score = db.query(AIScore).filter(AIScore.batch_id == batch.id).first()
+        if score is None:
+            score = AIScore(batch_id=batch.id)
+            db.add(score)
+
+        score.rating = ai_rating["rating"]
+        score.reasoning = ai_rating["reasoning"]
+        score.source = "llm"
+        score.confidence = None
+        score.generated_at = datetime.utcnow()
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception(f"Failed to escalate AI score for batch {batch.id}")
+
+
+def _is_novel(db: Session, batch) -> bool:
+    """
+    No other batch, of any product, has this exact composition (served by
+    ix_batches_composition_vector).
+    """
+    if batch.composition_vector is None:
+        return False
+    return db.execute(
+        select(Batch.id)
+        .where(Batch.composition_vector == batch.composition_vector, Batch.id != batch.id)
+        .limit(1)
+    ).first() is None
+
+
+def _identical_batches(batch):
+    """
+    Ids of other batches of the same product with the same composition
+    (served by ix_batches_product_fingerprint).
+    """
+    return select(Batch.id).where(
+        Batch.product_id == batch.product_id,
+        Batch.composition_fingerprint == batch.composition_fingerprint,
+        Batch.id != batch.id,
+    )
+
+
 # ============================================================
 # BASE QUERY (Reusable)
 # ============================================================
@@ -93,6 +173,50 @@ def get_batch(db: Session, batch_id: int, manufacturer_id: int):
     )
 
 
+def get_batch_owner(db: Session, batch_id: int):
+    """Manufacturer id of a batch, or None if it does not exist."""
+    return (
+        db.query(Product.manufacturer_id)
+        .join(Batch, Batch.product_id == Product.id)
+        .filter(Batch.id == batch_id)
+        .scalar()
+    )
+
+
+# ============================================================
+# VERSIONS (cheap HTTP validators)
+# ============================================================
+def get_batch_version(db: Session, batch_id: int):
+    """Version counters and timestamps of one batch, without loading it."""
+    return db.execute(
+        select(
+            Batch.id,
+            Batch.version,
+            func.coalesce(Batch.updated_at, Batch.created_at).label("modified_at"),
+            Batch.review_version,
+            func.coalesce(Batch.reviews_updated_at, Batch.created_at).label("reviews_modified_at"),
+        ).where(Batch.id == batch_id)
+    ).first()
+
+
+def get_latest_batch_version(db: Session, product_id: int):
+    """Same as get_batch_version for a product's most recent batch."""
+    latest_id = (
+        select(Batch.id)
+        .where(Batch.product_id == product_id)
+        .order_by(Batch.created_at.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    return db.execute(
+        select(
+            Batch.id,
+            Batch.version,
+            func.coalesce(Batch.updated_at, Batch.created_at).label("modified_at"),
+        ).where(Batch.id == latest_id)
+    ).first()
+
+
 # ============================================================
 # CREATE
 # ============================================================
@@ -128,17 +252,28 @@ def create_batch(
             )
 
             batch = Batch(**batch_payload, product_id=product_id)
+            batch.manufacturing_location_id = get_location_id(db, batch.manufacturing_location)
             db.add(batch)
             db.flush()
 
-            # -------- 3. Add Materials --------
-            add_materials(
+            # -------- 3. Add Materials + Fingerprint --------
+            batch_materials = add_materials(
                 db=db,
                 materials=materials_data,
                 batch_id=batch.id,
             )
 
-            # -------- 4. Fetch Previous Batch --------
+            batch.composition_vector = composition_vector(
+                (bm.material_id, bm.percentage) for bm in batch_materials
+            )
+            batch.composition_fingerprint = composition_fingerprint(batch.composition_vector)
+
+            # -------- 4. Identical Composition (any earlier batch) --------
+            identical = None
+            if batch.composition_fingerprint:
+                identical = db.execute(_identical_batches(batch).limit(1)).scalar()
+
+            # -------- 5. Fetch Previous Batch --------
             previous = (
                 db.query(Batch)
                 .filter(Batch.product_id == product_id)
@@ -147,59 +282,61 @@ def create_batch(
                 .first()
             )
 
-            # -------- 5. Prepare Material Comparison --------
-            previous_materials = []
-            if previous:
-                previous_materials = [
-                    {
-                        "name": bm.material.name,
-                        "percentage": bm.percentage,
-                    }
-                    for bm in previous.materials
-                ]
-
             current_materials = [
                 m.model_dump()
                 for m in materials_data
             ]
 
+            rule_materials = _rule_materials(db, current_materials)
+
+            # Rule score only: the LLM is consulted after commit (escalate_score)
             ai_rating = None
+            escalate = False
             product_details = extract_product_details(product)
 
             # -------- 6. Validation Logic --------
-            if previous:
-                change_type = classify_change(
-                    previous_materials,
-                    current_materials
-                )
+            if identical or previous:
+                if identical:
+                    change_type = "no_change"
+                    same_composition = _identical_batches(batch)
+                else:
+                    # Compare against the previous batch's stored vector
+                    change_type = classify_change(
+                        parse_vector(previous.composition_vector),
+                        parse_vector(batch.composition_vector),
+                    )
+                    same_composition = [previous.id]
 
                 #  NO CHANGE → reuse everything
                 if change_type == "no_change":
                     batch.validation_status = ValidationStatus.auto_verified
                     batch.status = BatchStatus.verified
 
-                    # ---- Reuse AI score ----
+                    # ---- Reuse AI score (latest of any identical batch) ----
                     ai_rating = (
                         db.query(AIScore)
-                        .filter(AIScore.batch_id == previous.id)
+                        .filter(AIScore.batch_id.in_(same_composition))
                         .order_by(AIScore.id.desc())
                         .first()
                     )
 
-                    # ---- Reuse Lab Report ----
+                    # ---- Reuse Lab Report (latest of any identical batch) ----
                     previous_lab = (
                         db.query(LabReport)
-                        .filter(LabReport.batch_id == previous.id)
+                        .filter(LabReport.batch_id.in_(same_composition))
                         .order_by(LabReport.created_at.desc())
                         .first()
                     )
 
+                    # Thin row pointing at the shared body; legacy inline
+                    # analysis is moved into a body on first reuse
                     if previous_lab:
                         db.add(
                             LabReport(
                                 batch_id=batch.id,
                                 lab_id=previous_lab.lab_id,
-                                analysis_data=previous_lab.analysis_data,
+                                body_hash=previous_lab.body_hash
+                                or store_body(db, previous_lab.inline_analysis),
                                 certifications=previous_lab.certifications,
                                 safety_status=previous_lab.safety_status,
                                 notes="Reused from previous batch",
@@ -211,41 +348,43 @@ def create_batch(
                 #  MINOR CHANGE → AI review
                 elif change_type == "minor":
                     batch.validation_status = ValidationStatus.ai_review
-                    ai_rating = generate_ai_rating(
-                        product_details,
-                        batch,
-                        current_materials
-                    )
+                    ai_rating = score_composition(rule_materials)
                     batch.status = BatchStatus.verified
 
                 #  MAJOR CHANGE → Lab required
                 else:
                     batch.validation_status = ValidationStatus.lab_required
-                    ai_rating = generate_ai_rating(
-                        product_details,
-                        batch,
-                        current_materials
-                    )
+                    ai_rating = score_composition(rule_materials)
                 
             #  FIRST BATCH
             else:
                 batch.validation_status = ValidationStatus.lab_required
-                ai_rating = generate_ai_rating(
-                    product_details,
+                ai_rating = score_composition(rule_materials)
+
+            # -------- 7. Queue for Lab Testing --------
+            if batch.validation_status == ValidationStatus.lab_required:
+                enqueue_batch(
+                    db,
                     batch,
-                    current_materials
+                    [m["risk_level"] for m in rule_materials],
                 )
 
-            # -------- 7. Store AI Score --------
+            # -------- 8. Store AI Score --------
             if ai_rating:
                 if isinstance(ai_rating, dict):
-                    db.add(
-                        AIScore(
-                            batch_id=batch.id,
-                            rating=ai_rating["rating"],
-                            reasoning=ai_rating["reasoning"],
+                    escalate = needs_escalation(ai_rating, novel=_is_novel(db, batch))
+                    # rating is None when the rules produced no score; keep
+                    # the batch and leave the score to escalate_score
+                    if ai_rating["rating"] is not None:
+                        db.add(
+                            AIScore(
+                                batch_id=batch.id,
+                                rating=ai_rating["rating"],
+                                reasoning=ai_rating["reasoning"],
+                                source=ai_rating["source"],
+                                confidence=ai_rating["confidence"],
+                            )
                         )
-                    )
                 else:
                     # reused AI score object
                     db.add(
@@ -253,6 +392,8 @@ def create_batch(
                             batch_id=batch.id,
                             rating=ai_rating.rating,
                             reasoning=ai_rating.reasoning,
+                            source=ai_rating.source,
+                            confidence=ai_rating.confidence,
                         )
                     )
 
@@ -267,6 +408,12 @@ def create_batch(
         print("Error creating batch:", traceback.format_exc())
         raise ValueError("Failed to create batch")
 
+    # -------- 9. LLM Escalation (own transaction) --------
+    if escalate:
+        escalate_score(db, batch, product_details, current_materials)
+
+    invalidate_manufacturer_dashboard(manufacturer_id)
+
     return (
         _base_query(db)
         .filter(Batch.id == batch.id)
@@ -299,11 +446,17 @@ def update_batch(
 
     update_data = data.model_dump(exclude_unset=True)
 
+    if "manufacturing_location" in update_data:
+        update_data["manufacturing_location_id"] = get_location_id(db, update_data["manufacturing_location"])
+
     for key, value in update_data.items():
         setattr(batch, key, value)
 
     db.commit()
 
+    if "batch_code" in update_data:
+        invalidate_manufacturer_dashboard(manufacturer_id)
+
     return (
         _base_query(db)
         .filter(Batch.id == batch.id)
@@ -333,4 +486,5 @@ def delete_batch(
         raise ValueError("Batch not found")
 
     db.delete(batch)
-    db.commit()
\ No newline at end of file
+    db.commit()
+    invalidate_manufacturer_dashboard(manufacturer_id)
\ No newline at end of file
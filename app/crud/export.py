@@ -0,0 +1,165 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+from app.models.batch import Batch
+from app.models.product import Product
+from app.models.material import BatchMaterial
+from app.models.transport import Transport
+from app.models.lab_report import LabReport, LabReportBody
+from app.models.user import User
+
+# Rows fetched per round trip; psycopg2 uses a named (server-side) cursor
+YIELD_PER = 1000
+
+
+def _stream(db: Session, stmt):
+    return db.execute(
+        stmt.execution_options(stream_results=True, yield_per=YIELD_PER)
+    )
+
+
+def _enum_value(value):
+    return value.value if hasattr(value, "value") else value
+
+
+# ============================================================
+# BATCHES (Manufacturer Scoped, same as list_batches)
+# ============================================================
+BATCH_COLUMNS = [
+    "id", "product_id", "product_name", "batch_code", "manufacture_date", "expiry_date",
+    "manufacturing_location", "base_carbon_footprint", "status", "validation_status",
+    "created_at", "materials",
+]
+
+
+def iter_batches(db: Session, manufacturer_id: int | None):
+    """
+    Stream batches with their materials. manufacturer_id=None exports all
+    batches (admin).
+    """
+    stmt = (
+        select(Batch)
+        .join(Batch.product)
+        .options(
+            selectinload(Batch.product),
+            selectinload(Batch.materials).selectinload(BatchMaterial.material),
+        )
+    )
+
+    if manufacturer_id is not None:
+        stmt = stmt.where(Product.manufacturer_id == manufacturer_id)
+
+    for batch in _stream(db, stmt.order_by(Batch.id)).scalars():
+        yield {
+            "id": batch.id,
+            "product_id": batch.product_id,
+            "product_name": batch.product.name,
+            "batch_code": batch.batch_code,
+            "manufacture_date": batch.manufacture_date,
+            "expiry_date": batch.expiry_date,
+            "manufacturing_location": batch.manufacturing_location,
+            "base_carbon_footprint": batch.base_carbon_footprint,
+            "status": _enum_value(batch.status),
+            "validation_status": _enum_value(batch.validation_status),
+            "created_at": batch.created_at,
+            "materials": [
+                {
+                    "name": bm.material.name,
+                    "percentage": bm.percentage,
+                    "source": bm.source,
+                }
+                for bm in batch.materials
+            ],
+        }
+
+
+# ============================================================
+# TRANSPORTS (Transporter Scoped, same as get_my_transports)
+# ============================================================
+TRANSPORT_COLUMNS = [
+    "id", "batch_id", "batch_code", "transporter_id", "origin", "destination",
+    "distance_km", "fuel_type", "vehicle_type", "transport_emission", "notes", "created_at",
+]
+
+
+def iter_transports(db: Session, transporter_id: int | None):
+    stmt = (
+        select(Transport, Batch.batch_code)
+        .join(Batch, Batch.id == Transport.batch_id)
+    )
+
+    if transporter_id is not None:
+        stmt = stmt.where(Transport.transporter_id == transporter_id)
+
+    for t, batch_code in _stream(db, stmt.order_by(Transport.id)):
+        yield {
+            "id": t.id,
+            "batch_id": t.batch_id,
+            "batch_code": batch_code,
+            "transporter_id": t.transporter_id,
+            "origin": t.origin,
+            "destination": t.destination,
+            "distance_km": t.distance_km,
+            "fuel_type": t.fuel_type,
+            "vehicle_type": t.vehicle_type,
+            "transport_emission": t.transport_emission,
+            "notes": t.notes,
+            "created_at": t.created_at,
+        }
+
+
+# ============================================================
+# LAB REPORTS (Lab Scoped, same as get_reports_by_lab_paginated)
+# ============================================================
+LAB_REPORT_COLUMNS = [
+    "id", "batch_id", "batch_code", "lab_id", "safety_status", "lab_score", "verified",
+    "certifications", "notes", "created_at", "analysis_data",
+]
+
+
+def iter_lab_reports(db: Session, lab_id: int | None, verified: bool | None = None):
+    # Bodies are joined in rather than resolved per row through the cache
+    stmt = (
+        select(LabReport, Batch.batch_code, LabReportBody.analysis_data)
+        .join(Batch, Batch.id == LabReport.batch_id)
+        .outerjoin(LabReportBody, LabReportBody.hash == LabReport.body_hash)
+    )
+
+    if lab_id is not None:
+        stmt = stmt.where(LabReport.lab_id == lab_id)
+
+    if verified is not None:
+        stmt = stmt.where(LabReport.verified == verified)
+
+    for report, batch_code, body in _stream(db, stmt.order_by(LabReport.id)):
+        yield {
+            "id": report.id,
+            "batch_id": report.batch_id,
+            "batch_code": batch_code,
+            "lab_id": report.lab_id,
+            "safety_status": _enum_value(report.safety_status),
+            "lab_score": report.lab_score,
+            "verified": report.verified,
+            "certifications": report.certifications,
+            "notes": report.notes,
+            "created_at": report.created_at,
+            "analysis_data": body if report.body_hash else report.inline_analysis,
+        }
+
+
+# ============================================================
+# USERS (Admin)
+# ============================================================
+USER_COLUMNS = ["id", "name", "email", "role", "created_at"]
+
+
+def iter_users(db: Session):
+    stmt = select(User.id, User.name, User.email, User.role, User.created_at)
+
+    for row in _stream(db, stmt.order_by(User.id)):
+        yield {
+            "id": row.id,
+            "name": row.name,
+            "email": row.email,
+            "role": _enum_value(row.role),
+            "created_at": row.created_at,
+        }
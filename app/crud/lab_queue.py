@@ -0,0 +1,229 @@
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import select, update, delete, exists, or_, and_
+from sqlalchemy.orm import Session, joinedload
+from app.models.lab_queue import LabQueueItem
+from app.models.batch import Batch
+
+LAB_LEASE_MINUTES = int(os.getenv("LAB_LEASE_MINUTES", "60"))
+LAB_CLAIM_MAX = int(os.getenv("LAB_CLAIM_MAX", "20"))
+
+# How much earlier than its creation time a batch is queued, by the
+# riskiest material it contains (unrated materials count as moderate)
+RISK_HEADSTART_HOURS = {
+    "high": int(os.getenv("LAB_QUEUE_HIGH_RISK_HEADSTART_HOURS", "48")),
+    "moderate": int(os.getenv("LAB_QUEUE_MODERATE_RISK_HEADSTART_HOURS", "24")),
+    "low": 0,
+}
+RISK_ORDER = ["low", "moderate", "high"]
+
+
+def queue_risk(risk_levels) -> str:
+    """Highest risk among the materials; None (unrated) counts as moderate."""
+    levels = [getattr(r, "value", r) or "moderate" for r in risk_levels] or ["moderate"]
+    return max(levels, key=RISK_ORDER.index)
+
+
+def queue_priority(created_at: datetime, risk: str) -> datetime:
+    return created_at - timedelta(hours=RISK_HEADSTART_HOURS[risk])
+
+
+def _available(now: datetime):
+    """Open items that are unclaimed or whose lease has expired."""
+    return and_(
+        LabQueueItem.completed_at.is_(None),
+        or_(
+            LabQueueItem.claimed_by.is_(None),
+            LabQueueItem.lease_expires_at < now,
+        ),
+    )
+
+
+def _active_claim(now: datetime):
+    return and_(
+        LabQueueItem.completed_at.is_(None),
+        LabQueueItem.claimed_by.isnot(None),
+        LabQueueItem.lease_expires_at >= now,
+    )
+
+
+def _has_batch():
+    """False for items left behind by a batch deleted outside the ORM."""
+    return exists().where(Batch.id == LabQueueItem.batch_id)
+
+
+def purge_orphans(conn) -> int:
+    """Delete queue items whose batch no longer exists."""
+    queue = LabQueueItem.__table__
+    batches = Batch.__table__
+    return conn.execute(
+        delete(queue).where(~exists().where(batches.c.id == queue.c.batch_id))
+    ).rowcount
+
+
+def _with_batch(query):
+    return query.options(joinedload(LabQueueItem.batch).joinedload(Batch.product))
+
+
+# ==========================================================
+# ENQUEUE / COMPLETE
+# ==========================================================
+
+def enqueue_batch(db: Session, batch, risk_levels):
+    """Add a lab_required batch to the queue (caller commits)."""
+    risk = queue_risk(risk_levels)
+    item = LabQueueItem(
+        batch_id=batch.id,
+        risk_level=risk,
+        priority_at=queue_priority(batch.created_at or datetime.utcnow(), risk),
+    )
+    db.add(item)
+    return item
+
+
+def complete_for_batch(db: Session, batch_id: int, lab_id: int):
+    """
+    Mark the batch's item done when a report is filed. Rejects the report
+    if another lab currently holds the lease.
+    """
+    now = datetime.utcnow()
+    item = (
+        db.query(LabQueueItem)
+        .filter(LabQueueItem.batch_id == batch_id)
+        .with_for_update()
+        .first()
+    )
+
+    if not item or item.completed_at:
+        return
+
+    if item.claimed_by not in (None, lab_id) and item.lease_expires_at and item.lease_expires_at >= now:
+        raise HTTPException(
+            status_code=409,
+            detail="Batch is claimed by another lab"
+        )
+
+    item.claimed_by = lab_id
+    item.completed_at = now
+
+
+# ==========================================================
+# CLAIM / RENEW / RELEASE
+# ==========================================================
+
+def claim_items(db: Session, lab_id: int, count: int):
+    """
+    Atomically lease up to `count` of the highest-priority open items.
+
+    One UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED): on
+    Postgres concurrent claimers skip each other's rows instead of waiting;
+    SQLite serializes writers, so the single statement is already atomic.
+    """
+    now = datetime.utcnow()
+    token = uuid.uuid4().hex
+    count = max(1, min(count, LAB_CLAIM_MAX))
+
+    candidates = (
+        select(LabQueueItem.id)
+        .where(_available(now), _has_batch())
+        .order_by(LabQueueItem.priority_at, LabQueueItem.id)
+        .limit(count)
+        .with_for_update(skip_locked=True)
+    )
+
+    db.execute(
+        update(LabQueueItem)
+        .where(LabQueueItem.id.in_(candidates))
+        .values(
+            claimed_by=lab_id,
+            claim_token=token,
+            claimed_at=now,
+            lease_expires_at=now + timedelta(minutes=LAB_LEASE_MINUTES),
+            attempts=LabQueueItem.attempts + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+    return (
+        _with_batch(db.query(LabQueueItem))
+        .filter(LabQueueItem.claim_token == token)
+        .order_by(LabQueueItem.priority_at)
+        .all()
+    )
+
+
+def get_my_claims(db: Session, lab_id: int):
+    return (
+        _with_batch(db.query(LabQueueItem))
+        .filter(
+            LabQueueItem.claimed_by == lab_id,
+            _active_claim(datetime.utcnow()),
+            _has_batch(),
+        )
+        .order_by(LabQueueItem.lease_expires_at)
+        .all()
+    )
+
+
+def _owned_item(db: Session, item_id: int, lab_id: int):
+    item = (
+        db.query(LabQueueItem)
+        .filter(LabQueueItem.id == item_id)
+        .with_for_update()
+        .first()
+    )
+
+    if not item:
+        raise HTTPException(status_code=404, detail="Queue item not found")
+
+    if item.completed_at:
+        raise HTTPException(status_code=400, detail="Queue item already completed")
+
+    # An expired lease still belongs to the lab until someone else claims it
+    if item.claimed_by != lab_id:
+        raise HTTPException(status_code=409, detail="Queue item is not claimed by you")
+
+    return item
+
+
+def renew_claim(db: Session, item_id: int, lab_id: int):
+    item = _owned_item(db, item_id, lab_id)
+    item.lease_expires_at = datetime.utcnow() + timedelta(minutes=LAB_LEASE_MINUTES)
+    db.commit()
+    return _with_batch(db.query(LabQueueItem)).filter(LabQueueItem.id == item_id).first()
+
+
+def release_claim(db: Session, item_id: int, lab_id: int):
+    item = _owned_item(db, item_id, lab_id)
+    item.claimed_by = None
+    item.claim_token = None
+    item.claimed_at = None
+    item.lease_expires_at = None
+    db.commit()
+
+
+def claimed_by_others(lab_id: int):
+    """Batch ids currently leased by a different lab (for pending listings)."""
+    return select(LabQueueItem.batch_id).where(
+        _active_claim(datetime.utcnow()),
+        LabQueueItem.claimed_by != lab_id,
+    )
+
+
+def queue_stats(db: Session) -> dict:
+    now = datetime.utcnow()
+    open_items = db.query(LabQueueItem).filter(LabQueueItem.completed_at.is_(None))
+
+    return {
+        "open": open_items.count(),
+        "available": db.query(LabQueueItem).filter(_available(now)).count(),
+        "claimed": db.query(LabQueueItem).filter(_active_claim(now)).count(),
+        "expired_leases": open_items.filter(
+            LabQueueItem.claimed_by.isnot(None),
+            LabQueueItem.lease_expires_at < now,
+        ).count(),
+    }
@@ -1,9 +1,12 @@
 from fastapi import HTTPException
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, cast, String
-from app.models.lab_report import LabReport
+from sqlalchemy import or_, cast, String, null, select, func, distinct
+from app.models.lab_report import LabReport, LabReportBody, LabMeasurement
 from app.models.batch import Batch
 from app.models.batch import ValidationStatus, BatchStatus
+from app.services.report_bodies import store_body, prefetch_bodies
+from app.services.lab_analysis import parameter_key
+from app.crud.lab_queue import complete_for_batch
 
 # ==========================================================
 # CREATE
@@ -40,7 +43,7 @@ def create_lab_report(db: Session, data, batch_id: int, lab_id: int):
     report = LabReport(
         batch_id=batch_id,
         lab_id=lab_id,
-        analysis_data=[section.model_dump() for section in data.analysis_data],
+        body_hash=store_body(db, [section.model_dump() for section in data.analysis_data]),
         certifications=data.certifications,
         safety_status=data.safety_status,
         notes=data.notes,
@@ -48,6 +51,8 @@ def create_lab_report(db: Session, data, batch_id: int, lab_id: int):
         verified=False
     )
 
+    complete_for_batch(db, batch_id, lab_id)
+
     db.add(report)
     db.commit()
     db.refresh(report)
@@ -78,6 +83,11 @@ def update_lab_report(db: Session, report_id: int, data):
 
     update_data = data.dict(exclude_unset=True)
 
+    # Analysis content is immutable; point the report at the new body
+    if "analysis_data" in update_data:
+        report.body_hash = store_body(db, update_data.pop("analysis_data"))
+        report.inline_analysis = null()
+
     for key, value in update_data.items():
         setattr(report, key, value)
 
@@ -116,7 +126,7 @@ def get_all_reports_paginated(db: Session, skip: int, limit: int):
         .all()
     )
 
-    return items, total
+    return prefetch_bodies(db, items), total
 
 
 def get_reports_by_lab_paginated(
@@ -156,7 +166,7 @@ def get_reports_by_lab_paginated(
         .all()
     )
 
-    return items, total
+    return prefetch_bodies(db, items), total
 
 
 def get_all_reports_admin(
@@ -182,7 +192,7 @@ def get_all_reports_admin(
         .all()
     )
 
-    return items, total
+    return prefetch_bodies(db, items), total
 
 
 def verify_lab_report(db: Session, report_id: int):
@@ -223,4 +233,97 @@ def reject_lab_report(db: Session, report_id: int, reason: str | None = None):
     db.commit()
     db.refresh(report)
 
-    return report
\ No newline at end of file
+    return report
+
+# ==========================================================
+# ANALYSIS QUERIES (lab_measurements / JSONB)
+# ==========================================================
+
+def _matching_bodies(db: Session, parameter, min_value, max_value, section):
+    """
+    Subquery of body hashes matching the filters. Parameter ranges use
+    ix_lab_measurements_param_value; a section-only filter uses the
+    JSONB GIN index on Postgres.
+    """
+    if parameter is None and section is not None and db.get_bind().dialect.name == "postgresql":
+        return select(LabReportBody.hash).where(
+            LabReportBody.analysis_data.contains([{"title": section}])
+        )
+
+    stmt = select(LabMeasurement.body_hash).distinct()
+
+    if parameter is not None:
+        stmt = stmt.where(LabMeasurement.parameter_key == parameter_key(parameter))
+    if min_value is not None:
+        stmt = stmt.where(LabMeasurement.value >= min_value)
+    if max_value is not None:
+        stmt = stmt.where(LabMeasurement.value <= max_value)
+    if section is not None:
+        stmt = stmt.where(LabMeasurement.section == section)
+
+    return stmt
+
+
+def search_reports(
+    db: Session,
+    lab_id: int | None,
+    skip: int,
+    limit: int,
+    parameter: str | None = None,
+    min_value: float | None = None,
+    max_value: float | None = None,
+    section: str | None = None,
+    verified: bool | None = None,
+):
+    """
+    Reports whose analysis has `parameter` within [min_value, max_value]
+    and/or a section titled `section`. lab_id=None searches all labs (admin).
+    """
+    query = (
+        db.query(LabReport)
+        .join(LabReport.batch)
+        .options(joinedload(LabReport.batch))
+        .filter(
+            LabReport.body_hash.in_(
+                _matching_bodies(db, parameter, min_value, max_value, section)
+            )
+        )
+    )
+
+    if lab_id is not None:
+        query = query.filter(LabReport.lab_id == lab_id)
+
+    if verified is not None:
+        query = query.filter(LabReport.verified == verified)
+
+    total = query.count()
+
+    items = (
+        query.order_by(LabReport.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+    return prefetch_bodies(db, items), total
+
+
+def list_parameters(db: Session, lab_id: int | None):
+    """Distinct measured parameters with unit, report count and value range."""
+    stmt = (
+        select(
+            func.min(LabMeasurement.parameter).label("parameter"),
+            LabMeasurement.unit,
+            func.count(distinct(LabReport.id)).label("reports"),
+            func.min(LabMeasurement.value).label("min_value"),
+            func.max(LabMeasurement.value).label("max_value"),
+        )
+        .join(LabReport, LabReport.body_hash == LabMeasurement.body_hash)
+        .group_by(LabMeasurement.parameter_key, LabMeasurement.unit)
+        .order_by(func.min(LabMeasurement.parameter))
+    )
+
+    if lab_id is not None:
+        stmt = stmt.where(LabReport.lab_id == lab_id)
+
+    return db.execute(stmt).all()
@@ -0,0 +1,71 @@
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.location import Location
+from app.services.gazetteer import normalize_place
+
+
+def location_key(name) -> str | None:
+    """
+    Case-, accent-, punctuation- and whitespace-insensitive key of a place
+    name; None for blank names. Names with no ASCII letters or digits fall
+    back to their lowercased, whitespace-collapsed text.
+    """
+    return normalize_place(name) or " ".join((name or "").lower().split()) or None
+
+
+def insert_locations_stmt(bind):
+    """INSERT ... ON CONFLICT DO NOTHING for the bind's dialect."""
+    dialect = postgresql if bind.dialect.name == "postgresql" else sqlite
+    return dialect.insert(Location.__table__).on_conflict_do_nothing(index_elements=["key"])
+
+
+def find_location_id(db, name):
+    """Id of an existing location, without creating one."""
+    key = location_key(name)
+    if key is None:
+        return None
+    return db.execute(select(Location.id).where(Location.key == key)).scalar()
+
+
+def get_location_ids(db, names) -> dict:
+    """
+    Map each name to its location id, creating missing locations. Works on
+    a Session or a Connection; concurrent creators of the same key converge
+    on one row.
+    """
+    keys = {name: key for name in names if (key := location_key(name)) is not None}
+    if not keys:
+        return {}
+
+    ids = dict(db.execute(
+        select(Location.key, Location.id).where(Location.key.in_(set(keys.values())))
+    ).all())
+
+    missing = {}
+    for name, key in keys.items():
+        if key not in ids:
+            missing.setdefault(key, name.strip())
+
+    if missing:
+        db.execute(
+            insert_locations_stmt(db.get_bind() if isinstance(db, Session) else db),
+            [{"key": key, "name": name} for key, name in missing.items()],
+        )
+        ids.update(db.execute(
+            select(Location.key, Location.id).where(Location.key.in_(missing))
+        ).all())
+
+    return {name: ids[key] for name, key in keys.items()}
+
+
+def get_location_id(db, name):
+    return get_location_ids(db, [name]).get(name)
+
+
+def location_names(db, ids) -> dict:
+    ids = set(ids) - {None}
+    if not ids:
+        return {}
+    return dict(db.execute(select(Location.id, Location.name).where(Location.id.in_(ids))).all())
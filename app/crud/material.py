@@ -6,6 +6,8 @@ def add_materials(
     materials: list,   # you can type as list[BatchMaterialInput] if imported
     batch_id: int,
 ):
+    batch_materials = []
+
     for material_data in materials:
 
         material_name = material_data.name
@@ -27,12 +29,14 @@ def add_materials(
             db.add(material)
             db.flush()  # Ensure material.id is available
 
-        db.add(
-            BatchMaterial(
-                batch_id=batch_id,
-                material_id=material.id,
-                percentage=percentage,
-                source_info_provided=source_info_provided,
-                source=source,
-            )
-        )
\ No newline at end of file
+        batch_material = BatchMaterial(
+            batch_id=batch_id,
+            material_id=material.id,
+            percentage=percentage,
+            source_info_provided=source_info_provided,
+            source=source,
+        )
+        db.add(batch_material)
+        batch_materials.append(batch_material)
+
+    return batch_materials
\ No newline at end of file
@@ -0,0 +1,138 @@
+from sqlalchemy.orm import Session, selectinload
+from app.models.batch import Batch
+from app.models.product import Product
+from app.models.lab_report import LabReport
+from app.models.transport import Transport
+from app.models.material import BatchMaterial
+from app.services.report_bodies import prefetch_bodies
+from app.schemas.passport import (
+    BatchPassport,
+    PassportProduct,
+    PassportBatch,
+    PassportMaterial,
+    PassportTransport,
+    PassportLabReport,
+    PassportAIScore,
+)
+
+
+def _enum_value(value):
+    return value.value if hasattr(value, "value") else value
+
+
+# ============================================================
+# PUBLIC PASSPORT
+# ============================================================
+def _passport_query(db: Session):
+    return db.query(Batch).options(
+        selectinload(Batch.product).selectinload(Product.manufacturer),
+        selectinload(Batch.materials).selectinload(BatchMaterial.material),
+        selectinload(Batch.lab_reports).selectinload(LabReport.lab),
+        selectinload(Batch.ai_scores),
+        selectinload(Batch.transports).selectinload(Transport.transporter)
+    )
+
+
+def get_batch_passport(db: Session, batch_id: int) -> BatchPassport | None:
+    batch = _passport_query(db).filter(Batch.id == batch_id).first()
+
+    if not batch:
+        return None
+
+    prefetch_bodies(db, batch.lab_reports)
+
+    return build_passport(batch)
+
+
+def get_batch_passports(db: Session, batch_ids: list) -> dict:
+    """
+    Passports for many batches with one round of selectin queries.
+    Missing batches are absent from the result.
+    """
+    batches = _passport_query(db).filter(Batch.id.in_(batch_ids)).all()
+
+    prefetch_bodies(db, [l for b in batches for l in b.lab_reports])
+
+    return {batch.id: build_passport(batch) for batch in batches}
+
+
+def build_passport(batch: Batch) -> BatchPassport:
+    """
+    Build the typed passport from a fully loaded batch.
+    Enums are flattened here once; the model serializes straight to JSON.
+    """
+    product = batch.product
+    ai_score = batch.ai_scores[0] if batch.ai_scores else None
+
+    return BatchPassport(
+        product=PassportProduct(
+            id=product.id,
+            name=product.name,
+            brand=product.brand,
+            category=product.category,
+            description=product.description,
+        ),
+        batch=PassportBatch(
+            id=batch.id,
+            manufacturer_name=product.manufacturer.name if product.manufacturer else None,
+            code=batch.batch_code,
+            manufacture_date=batch.manufacture_date,
+            expiry_date=batch.expiry_date,
+            manufacturing_location=batch.manufacturing_location,
+            base_carbon_footprint=batch.base_carbon_footprint,
+            status=_enum_value(batch.status),
+            validation_status=_enum_value(batch.validation_status),
+            created_at=batch.created_at,
+        ),
+        materials=[
+            PassportMaterial(
+                material_id=bm.material.id,
+                name=bm.material.name,
+                common_name=bm.material.common_name,
+                risk_level=bm.material.risk_level,
+                description=bm.material.description,
+                percentage=bm.percentage,
+                source_info_provided=bm.source_info_provided,
+                source=bm.source,
+            )
+            for bm in batch.materials
+        ],
+        transports=[
+            PassportTransport(
+                id=t.id,
+                transporter_name=t.transporter.name if t.transporter else None,
+                origin=t.origin,
+                destination=t.destination,
+                distance_km=t.distance_km,
+                fuel_type=t.fuel_type,
+                vehicle_type=t.vehicle_type,
+                transport_emission=t.transport_emission,
+                notes=t.notes,
+                created_at=t.created_at,
+            )
+            for t in batch.transports
+        ],
+        lab_reports=[
+            PassportLabReport(
+                id=l.id,
+                lab_name=l.lab.name if l.lab else None,
+                analysis=l.analysis_data,
+                certifications=l.certifications,
+                safety_status=_enum_value(l.safety_status),
+                notes=l.notes,
+                lab_score=l.lab_score,
+                verified=l.verified,
+                created_at=l.created_at,
+            )
+            for l in batch.lab_reports
+        ],
+        ai_score=PassportAIScore(
+            rating=ai_score.rating,
+            reasoning=ai_score.reasoning,
+            source=ai_score.source,
+            confidence=ai_score.confidence,
+            generated_at=ai_score.generated_at,
+        )
+        if ai_score
+        else None,
+    )
@@ -1,7 +1,16 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+import os
+
+from sqlalchemy import func, select
 from app.models.product import Product
 from app.models.batch import Batch
+from app.utils.ttl_cache import TTLCache
+
+# Per-manufacturer dashboard cache; writes in this process invalidate it
+# directly, other workers' writes through the outbox (app.services.subscribers),
+# and the TTL bounds staleness if the dispatcher falls behind
+DASHBOARD_CACHE_SECONDS = float(os.getenv("DASHBOARD_CACHE_SECONDS", "60"))
+dashboard_cache = TTLCache(DASHBOARD_CACHE_SECONDS)
 
 
 # CREATE (Manufacturer)
@@ -14,6 +23,7 @@ def create_product(db: Session, data, manufacturer_id: int):
     db.add(product)
     db.commit()
     db.refresh(product)
+    invalidate_manufacturer_dashboard(manufacturer_id)
     return product
 
 
@@ -56,91 +66,78 @@ def update_product(db: Session, product: Product, data):
 
     db.commit()
     db.refresh(product)
+    invalidate_manufacturer_dashboard(product.manufacturer_id)
     return product
 
 
 # DELETE (Admin only)
 def delete_product(db: Session, product: Product):
+    manufacturer_id = product.manufacturer_id
     db.delete(product)
     db.commit()
+    invalidate_manufacturer_dashboard(manufacturer_id)
 
 
 # MANUFACTURER DASHBOARD
-def get_manufacturer_dashboard(db: Session, manufacturer_id: int):
-
-    total_products = db.query(func.count(Product.id))\
-        .filter(Product.manufacturer_id == manufacturer_id)\
-        .scalar() or 0
-
-    total_batches = (
-        db.query(func.count(Batch.id))
-        .join(Product)
-        .filter(Product.manufacturer_id == manufacturer_id)
-        .scalar()
-    ) or 0
-
-    # Batch count per product
-    rows = (
-        db.query(
+def _dashboard_query(manufacturer_id: int):
+    """
+    One statement: every product of the manufacturer with its batch count
+    and newest batch. ROW_NUMBER (ties broken by id) picks exactly one
+    latest batch even when two share a created_at; products without
+    batches come through the outer join as a single row of NULLs.
+    """
+    ranked = (
+        select(
             Product.id,
             Product.name,
-            func.count(Batch.id).label("batch_count")
-        )
-        .outerjoin(Batch)
-        .filter(Product.manufacturer_id == manufacturer_id)
-        .group_by(Product.id)
-        .all()
-    )
-
-    # Latest batch per product
-    subq = (
-        db.query(
-            Batch.product_id,
-            func.max(Batch.created_at).label("max_created")
+            Batch.id.label("last_batch_id"),
+            Batch.batch_code.label("last_batch_code"),
+            Batch.created_at.label("last_batch_created_at"),
+            func.row_number().over(
+                partition_by=Product.id,
+                order_by=(Batch.created_at.desc(), Batch.id.desc()),
+            ).label("rn"),
+            func.count(Batch.id).over(partition_by=Product.id).label("batch_count"),
         )
-        .join(Product)
-        .filter(Product.manufacturer_id == manufacturer_id)
-        .group_by(Batch.product_id)
+        .outerjoin(Batch, Batch.product_id == Product.id)
+        .where(Product.manufacturer_id == manufacturer_id)
         .subquery()
     )
 
-    latest = (
-        db.query(Batch)
-        .join(
-            subq,
-            (Batch.product_id == subq.c.product_id) &
-            (Batch.created_at == subq.c.max_created)
-        )
-        .all()
+    return (
+        select(ranked)
+        .where(ranked.c.rn == 1)
+        .order_by(ranked.c.id)
     )
 
-    latest_map = {
-        b.product_id: {
-            "last_batch_id": b.id,
-            "last_batch_code": b.batch_code,
-            "last_batch_created_at": b.created_at,
-        }
-        for b in latest
-    }
 
-    products = []
-    for r in rows:
-        prod = {
+def _build_dashboard(db: Session, manufacturer_id: int):
+    products = [
+        {
             "id": r.id,
             "name": r.name,
             "batch_count": int(r.batch_count),
-            "last_batch_id": None,
-            "last_batch_code": None,
-            "last_batch_created_at": None,
+            "last_batch_id": r.last_batch_id,
+            "last_batch_code": r.last_batch_code,
+            "last_batch_created_at": r.last_batch_created_at,
         }
-
-        if r.id in latest_map:
-            prod.update(latest_map[r.id])
-
-        products.append(prod)
+        for r in db.execute(_dashboard_query(manufacturer_id))
+    ]
 
     return {
-        "total_products": int(total_products),
-        "total_batches": int(total_batches),
+        "total_products": len(products),
+        "total_batches": sum(p["batch_count"] for p in products),
         "products": products
-    }
\ No newline at end of file
+    }
+
+
+def get_manufacturer_dashboard(db: Session, manufacturer_id: int):
+    return dashboard_cache.get_or_compute(
+        manufacturer_id,
+        lambda: _build_dashboard(db, manufacturer_id),
+    )
+
+
+def invalidate_manufacturer_dashboard(manufacturer_id: int):
+    """Call after committing a batch or product create/update/delete."""
+    dashboard_cache.invalidate(manufacturer_id)
@@ -1,9 +1,14 @@
+from collections import defaultdict
+
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import or_, func
 from app.models.transport import Transport
 from app.models.batch import Batch
 from app.services.carbon_engine import calculate_transport_emission
+from app.services.gazetteer import leg_distance
 from app.models.product import Product
+from app.crud.location import find_location_id, get_location_ids, location_names
+from app.services import emission_buckets
 
 
 # =====================================================
@@ -13,19 +18,19 @@ from app.models.product import Product
 def _route_exists(
     db: Session,
     batch_id: int,
-    origin: str,
-    destination: str,
+    origin_id: int,
+    destination_id: int,
     exclude_id: int | None = None,
 ) -> bool:
     """
-    Check whether a transport route already exists for a batch.
-    Case-insensitive comparison.
+    Check whether a transport route already exists for a batch, comparing
+    normalized locations (served by ix_transports_batch_route).
     Optionally exclude a specific transport ID (for updates).
     """
     query = db.query(Transport).filter(
         Transport.batch_id == batch_id,
-        func.lower(Transport.origin) == origin.lower(),
-        func.lower(Transport.destination) == destination.lower(),
+        Transport.origin_id == origin_id,
+        Transport.destination_id == destination_id,
     )
 
     if exclude_id:
@@ -34,17 +39,57 @@ def _route_exists(
     return db.query(query.exists()).scalar()
 
 
-def _validate_origin(db: Session, batch_id: int, origin: str) -> None:
+def _computed_distance(origin: str, destination: str, vehicle_type: str | None) -> float:
+    distance = leg_distance(origin, destination, vehicle_type)
+    if distance is None:
+        raise ValueError(
+            f"Could not locate '{origin}' or '{destination}'; enter distance_km"
+        )
+    if distance <= 0:
+        raise ValueError("Origin and destination are the same place")
+    return distance
+
+
+def _validate_origin(db: Session, batch: Batch, origin: str) -> int:
     """
-    Ensure the given origin is valid according to the chain rules.
+    Ensure the given origin is valid according to the chain rules
+    and return its location id.
     """
-    data = get_available_origins(db, batch_id)
-    if not data:
-        raise ValueError("Batch not found")
+    origin_id = find_location_id(db, origin)
 
-    if origin not in data["origins"]:
+    if origin_id is None or origin_id not in _available_origin_ids(db, batch):
         raise ValueError("Invalid origin for this batch")
 
+    return origin_id
+
+
+def _available_origin_ids(db: Session, batch: Batch) -> list:
+    """
+    The manufacturing location, then every location with more incoming
+    than outgoing transports for the batch.
+    """
+    source = batch.manufacturing_location_id
+    balances = defaultdict(int)
+
+    for loc, count in (
+        db.query(Transport.destination_id, func.count(Transport.id))
+        .filter(Transport.batch_id == batch.id)
+        .group_by(Transport.destination_id)
+    ):
+        balances[loc] += count
+
+    for loc, count in (
+        db.query(Transport.origin_id, func.count(Transport.id))
+        .filter(Transport.batch_id == batch.id)
+        .group_by(Transport.origin_id)
+    ):
+        balances[loc] -= count
+
+    return [source] + [
+        loc for loc, bal in balances.items()
+        if loc != source and loc is not None and bal > 0
+    ]
+
 
 # =====================================================
 # CREATE
@@ -64,18 +109,32 @@ def create_transport(db: Session, data, transporter_id: int):
         raise ValueError("Batch not found")
 
     # Validate chain integrity
-    _validate_origin(db, data.batch_id, data.origin)
+    origin_id = _validate_origin(db, batch, data.origin)
 
-    # Prevent duplicate route
-    if _route_exists(db, data.batch_id, data.origin, data.destination):
+    # Prevent duplicate route (an unknown destination has no routes yet)
+    destination_id = find_location_id(db, data.destination)
+    if destination_id is not None and _route_exists(db, data.batch_id, origin_id, destination_id):
         raise ValueError(
             f"Transport already exists from '{data.origin}' to '{data.destination}' for this batch"
         )
 
-    emission = calculate_transport_emission(data.distance_km, data.fuel_type, data.vehicle_type, data.notes)
+    values = data.model_dump()
+    if values["distance_km"] is None:
+        values["distance_km"] = _computed_distance(data.origin, data.destination, data.vehicle_type)
+        values["distance_source"] = "gazetteer"
+    else:
+        values["distance_source"] = "entered"
+
+    emission = calculate_transport_emission(values["distance_km"], data.fuel_type, data.vehicle_type, data.notes)
+
+    # Created only now, so no write is pending during the estimate above
+    if destination_id is None:
+        destination_id = get_location_ids(db, [data.destination]).get(data.destination)
 
     transport = Transport(
-        **data.model_dump(),
+        **values,
+        origin_id=origin_id,
+        destination_id=destination_id,
         transporter_id=transporter_id,
         transport_emission=emission,
     )
@@ -116,39 +175,12 @@ def get_available_origins(db: Session, batch_id: int):
     if not batch:
         return None
 
-    source = batch.manufacturing_location
-
-    incoming = dict(
-        db.query(Transport.destination, func.count(Transport.id))
-        .filter(Transport.batch_id == batch_id)
-        .group_by(Transport.destination)
-        .all()
-    )
-
-    outgoing = dict(
-        db.query(Transport.origin, func.count(Transport.id))
-        .filter(Transport.batch_id == batch_id)
-        .group_by(Transport.origin)
-        .all()
-    )
-
-    balances = {}
-
-    for loc, count in incoming.items():
-        balances[loc] = balances.get(loc, 0) + count
-
-    for loc, count in outgoing.items():
-        balances[loc] = balances.get(loc, 0) - count
-
-    available = [source]
-
-    for loc, bal in balances.items():
-        if loc != source and bal > 0:
-            available.append(loc)
+    available = _available_origin_ids(db, batch)
+    names = location_names(db, available)
 
     return {
-        "manufactured_at": source,
-        "origins": available,
+        "manufactured_at": batch.manufacturing_location,
+        "origins": [batch.manufacturing_location] + [names[loc] for loc in available[1:]],
     }
 
 
@@ -244,26 +276,51 @@ def update_transport(db: Session, transport: Transport, data):
     new_origin = update_data.get("origin", transport.origin)
     new_destination = update_data.get("destination", transport.destination)
 
+    route_changed = bool({"origin", "destination"} & update_data.keys())
+    if route_changed:
+        origin_id = find_location_id(db, new_origin)
+        destination_id = find_location_id(db, new_destination)
+    else:
+        origin_id, destination_id = transport.origin_id, transport.destination_id
+
     # Prevent duplicate route
-    if _route_exists(
+    if origin_id is not None and destination_id is not None and _route_exists(
         db,
         transport.batch_id,
-        new_origin,
-        new_destination,
+        origin_id,
+        destination_id,
         exclude_id=transport.id,
     ):
         raise ValueError(
             f"Transport already exists from '{new_origin}' to '{new_destination}' for this batch"
         )
 
+    # Keep a computed distance in step with the route
+    if update_data.get("distance_km") is not None:
+        update_data["distance_source"] = "entered"
+    else:
+        update_data.pop("distance_km", None)
+        if transport.distance_source == "gazetteer" and {"origin", "destination", "vehicle_type"} & update_data.keys():
+            update_data["distance_km"] = _computed_distance(
+                new_origin,
+                new_destination,
+                update_data.get("vehicle_type", transport.vehicle_type),
+            )
+
     # Recalculate emission if necessary
-    if "distance_km" in update_data or "fuel_type" in update_data:
-        distance = update_data.get("distance_km", transport.distance_km)
-        fuel = update_data.get("fuel_type", transport.fuel_type)
+    if {"distance_km", "fuel_type", "vehicle_type"} & update_data.keys():
         update_data["transport_emission"] = calculate_transport_emission(
-            distance, fuel
+            update_data.get("distance_km", transport.distance_km),
+            update_data.get("fuel_type", transport.fuel_type),
+            update_data.get("vehicle_type", transport.vehicle_type),
+            update_data.get("notes", transport.notes),
         )
 
+    if route_changed:
+        location_ids = get_location_ids(db, {new_origin, new_destination})
+        update_data["origin_id"] = location_ids.get(new_origin)
+        update_data["destination_id"] = location_ids.get(new_destination)
+
     for key, value in update_data.items():
         setattr(transport, key, value)
 
@@ -314,4 +371,13 @@ def get_transport_stats(db: Session, transporter_id: int):
         "avg_emission_per_km": round(
             (total_emission / total_distance), 4
         ) if total_distance else 0,
-    }
\ No newline at end of file
+    }
+
+
+def get_transport_series(db: Session, transporter_id: int, **filters):
+    """
+    Time-series counterpart of get_transport_stats: a transporter's
+    transports, distance and emissions per day, week or month, summed from
+    the daily emission buckets (see emission_buckets.series for filters).
+    """
+    return emission_buckets.series(db, transporter_id=transporter_id, **filters)
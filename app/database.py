@@ -1,9 +1,15 @@
 import os
+from contextlib import contextmanager
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.utils.logger import get_logger
 
+try:
+    import fcntl
+except ImportError:  # Windows; single-process dev server only
+    fcntl = None
+
 logger = get_logger("database")
 
 # Load .env only for local development
@@ -36,10 +42,30 @@ connect_args = {}
 if DATABASE_URL.startswith("sqlite"):
     connect_args = {"check_same_thread": False}
 
+# Total connections this deployment may open (e.g. the Postgres plan's
+# limit minus headroom). Split across WEB_CONCURRENCY worker processes,
+# keeping DB_CONNECTION_RESERVE for scripts and admin sessions.
+DB_CONNECTION_BUDGET = int(os.getenv("DB_CONNECTION_BUDGET", "0"))
+DB_CONNECTION_RESERVE = int(os.getenv("DB_CONNECTION_RESERVE", "2"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+
+def pool_settings() -> dict:
+    """pool_size / max_overflow for one worker; SQLAlchemy defaults if no budget."""
+    if DATABASE_URL.startswith("sqlite") or DB_CONNECTION_BUDGET <= 0:
+        return {}
+
+    per_worker = max(2, (DB_CONNECTION_BUDGET - DB_CONNECTION_RESERVE) // max(1, WEB_CONCURRENCY))
+    pool_size = max(1, per_worker * 3 // 4)
+
+    return {"pool_size": pool_size, "max_overflow": per_worker - pool_size}
+
+
 engine = create_engine(
     DATABASE_URL,
     connect_args=connect_args,
     pool_pre_ping=True,  # prevents stale connection errors
+    **pool_settings(),
 )
 
 SessionLocal = sessionmaker(
@@ -48,4 +74,53 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+def init_db():
+    """
+    Create missing tables. Called from the application startup hook
+    (not at import time) so importing the app never touches the database.
+    """
+    # Register all models on Base.metadata
+    import app.models  # noqa: F401
+
+    from app.migrations import run_migrations
+
+    # Every worker runs this at boot; only one at a time touches the schema
+    with schema_lock():
+        Base.metadata.create_all(bind=engine)
+        run_migrations(engine)
+    logger.info("Database tables created/verified")
+
+
+# Arbitrary constant shared by every process of this app
+SCHEMA_LOCK_KEY = 0x65636F74
+
+
+@contextmanager
+def schema_lock():
+    """
+    Serialize schema bootstrap across processes: a session-level advisory
+    lock on PostgreSQL, an exclusive file lock next to the SQLite database.
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SCHEMA_LOCK_KEY})
+                conn.commit()
+        return
+
+    database = engine.url.database
+    if fcntl is None or not database or database == ":memory:":
+        yield
+        return
+
+    with open(f"{database}.schema-lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
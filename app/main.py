@@ -1,9 +1,13 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database import engine, Base
-from app.models import *
-from app.routes import auth, admin, users, products, batches, public, transport, ai, lab_reports, lab,reviews
+from app.database import init_db
+from app.routes import auth, admin, users, products, batches, public, transport, ai, lab_reports, lab,reviews, exports
+from app.core.middleware import RequestIdMiddleware, ActorMiddleware
+from app.core.static_files import PrecompressedStaticFiles
+from app.services import passport_files, content_versions, scheduler, outbox
 from app.utils.logger import get_logger
 import dotenv
 import os
@@ -13,7 +17,40 @@ logger = get_logger("main")
 dotenv.load_dotenv()
 logger.info("FastAPI application starting...")
 
-app = FastAPI(title="EcoTrace")
+# Set DB_AUTO_CREATE=false where the schema is managed out of band
+DB_AUTO_CREATE = os.getenv("DB_AUTO_CREATE", "true").lower() == "true"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if DB_AUTO_CREATE:
+        try:
+            init_db()
+        except Exception as e:
+            # Keep the worker up; requests will fail until the DB is reachable
+            logger.error(f"Failed to create database tables: {str(e)}")
+    if passport_files.PASSPORT_PRERENDER:
+        passport_files.start_prerender()
+    if scheduler.SCHEDULER_ENABLED:
+        scheduler.runner.start()
+    if outbox.OUTBOX_ENABLED:
+        outbox.dispatcher.start()
+    yield
+    if outbox.OUTBOX_ENABLED:
+        outbox.dispatcher.stop()
+    if scheduler.SCHEDULER_ENABLED:
+        scheduler.runner.stop()
+    if passport_files.PASSPORT_PRERENDER:
+        passport_files.stop_prerender()
+
+
+app = FastAPI(title="EcoTrace", lifespan=lifespan)
+
+# Version counters behind the ETag / Last-Modified of public read endpoints
+content_versions.install()
+# Change events for caches and derived tables, written in the same transaction
+if outbox.OUTBOX_ENABLED:
+    outbox.install()
 logger.info("FastAPI app initialized")
 
 # CORS CONFIGURATION (ADD THIS)
@@ -40,39 +77,32 @@ app.add_middleware(
 
 logger.info("CORS middleware added")
 
+app.add_middleware(ActorMiddleware)
+app.add_middleware(RequestIdMiddleware)
+
 # ROUTES
 app.include_router(auth.router, prefix="/auth")
-logger.info("Auth router loaded")
 app.include_router(admin.router)
-logger.info("Admin router loaded")
 app.include_router(users.router, prefix="/api")
-logger.info("Users router loaded")
 app.include_router(products.router, prefix="/api/products", tags=["Products"])
-logger.info("Products router loaded")
 app.include_router(batches.router, prefix="/api/batches", tags=["Batches"])
-logger.info("Batches router loaded")
 app.include_router(transport.router, prefix="/api/transports", tags=["Transport"])
-logger.info("Transport router loaded")
 app.include_router(ai.router, prefix="/api/ai", tags=["AI"])
-logger.info("AI router loaded")
 app.include_router(lab.router, prefix="/api/labs", tags=["Labs"])
-logger.info("Labs router loaded")
 app.include_router(lab_reports.router, prefix="/api/lab-reports", tags=["LabReports"])
-logger.info("Lab reports router loaded")
 app.include_router(public.router, prefix="/api", tags=["public"])
-logger.info("Public router loaded")
 app.include_router(reviews.router, prefix="/api/reviews", tags=["Reviews"])
-logger.info("Reviews router loaded")
+app.include_router(exports.router, prefix="/api/exports", tags=["Exports"])
+
+# Pre-rendered passports; a proxy in front can serve the same directory directly
+if passport_files.PASSPORT_PRERENDER:
+    os.makedirs(passport_files.PASSPORT_STATIC_DIR, exist_ok=True)
+    app.mount("/passports", PrecompressedStaticFiles(directory=passport_files.PASSPORT_STATIC_DIR), name="passports")
 
-try:
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created/verified")
-except Exception as e:
-    logger.error(f"Failed to create database tables: {str(e)}")
-    raise
+logger.debug(f"{len(app.routes)} routes registered")
 
 @app.get("/")
 def root():
-    logger.info("Root endpoint accessed")
+    logger.debug("Root endpoint accessed")
     return {"message": "EcoTrace backend running"}
 
@@ -0,0 +1,365 @@
+"""
+Lightweight schema migrations.
+
+create_all() only creates missing tables, so columns added to existing
+models are applied here. Every step checks the live schema first and is
+safe to run on each startup.
+"""
+
+from collections import defaultdict
+
+from sqlalchemy import inspect, text, select, update, bindparam, null, exists, or_
+from app.models.batch import Batch, ValidationStatus
+from app.models.transport import Transport
+from app.models.lab_report import LabReport, LabReportBody, LabMeasurement
+from app.models.lab_queue import LabQueueItem
+from app.crud.lab_queue import queue_risk, queue_priority, purge_orphans
+from app.crud.location import get_location_ids
+from app.services.lab_analysis import extract_measurements
+from app.services.composition import composition_vector, composition_fingerprint
+from app.services.report_bodies import body_hash, insert_bodies_stmt
+from app.services import emission_buckets
+from app.utils.logger import get_logger
+
+logger = get_logger("migrations")
+
+# (table, column, column DDL)
+ADD_COLUMNS = [
+    ("ai_scores", "source", "VARCHAR(20) DEFAULT 'llm'"),
+    ("ai_scores", "confidence", "FLOAT"),
+    ("batches", "composition_vector", "VARCHAR"),
+    ("batches", "composition_fingerprint", "VARCHAR(64)"),
+    ("batches", "version", "INTEGER NOT NULL DEFAULT 1"),
+    ("batches", "updated_at", "TIMESTAMP"),
+    ("batches", "review_version", "INTEGER NOT NULL DEFAULT 0"),
+    ("batches", "reviews_updated_at", "TIMESTAMP"),
+    ("lab_reports", "body_hash", "VARCHAR(64)"),
+    ("lab_report_bodies", "parameter_count", "INTEGER"),
+    ("transports", "distance_source", "VARCHAR(12)"),
+    ("transports", "origin_id", "INTEGER"),
+    ("transports", "destination_id", "INTEGER"),
+    ("batches", "manufacturing_location_id", "INTEGER"),
+    ("outbox_cursors", "skipped_ids", "TEXT"),
+]
+
+# (index name, table, columns) for indexes on tables that may predate them
+CREATE_INDEXES = [
+    ("ix_batches_composition_vector", "batches", "composition_vector"),
+    ("ix_batches_product_fingerprint", "batches", "product_id, composition_fingerprint"),
+    ("ix_batches_product_created", "batches", "product_id, created_at"),
+    ("ix_products_manufacturer_id", "products", "manufacturer_id"),
+    ("ix_lab_reports_body_hash", "lab_reports", "body_hash"),
+    ("ix_transports_batch_id", "transports", "batch_id, id"),
+    ("ix_transports_batch_route", "transports", "batch_id, origin_id, destination_id"),
+]
+
+BACKFILL_CHUNK = 1000
+
+
+def _add_columns(conn, inspector):
+    tables = set(inspector.get_table_names())
+
+    for table, column, ddl in ADD_COLUMNS:
+        if table not in tables:
+            continue
+
+        existing = {c["name"] for c in inspector.get_columns(table)}
+        if column in existing:
+            continue
+
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+        logger.info(f"Added column {table}.{column}")
+
+
+def _create_indexes(conn, inspector):
+    tables = set(inspector.get_table_names())
+
+    for name, table, columns in CREATE_INDEXES:
+        if table in tables:
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+
+
+def _backfill_composition(conn):
+    """Fingerprint batches created before composition columns existed."""
+    batch_ids = conn.execute(text(
+        "SELECT DISTINCT b.id FROM batches b "
+        "JOIN batch_materials bm ON bm.batch_id = b.id "
+        "WHERE b.composition_fingerprint IS NULL ORDER BY b.id"
+    )).scalars().all()
+
+    for start in range(0, len(batch_ids), BACKFILL_CHUNK):
+        chunk = batch_ids[start:start + BACKFILL_CHUNK]
+        params = {f"id{i}": batch_id for i, batch_id in enumerate(chunk)}
+        placeholders = ", ".join(f":{key}" for key in params)
+
+        compositions = defaultdict(list)
+        for batch_id, material_id, percentage in conn.execute(
+            text(
+                "SELECT batch_id, material_id, percentage FROM batch_materials "
+                f"WHERE batch_id IN ({placeholders})"
+            ),
+            params,
+        ):
+            compositions[batch_id].append((material_id, percentage))
+
+        updates = []
+        for batch_id, items in compositions.items():
+            vector = composition_vector(items)
+            updates.append({
+                "id": batch_id,
+                "vector": vector,
+                "fingerprint": composition_fingerprint(vector),
+            })
+
+        conn.execute(
+            text(
+                "UPDATE batches SET composition_vector = :vector, "
+                "composition_fingerprint = :fingerprint WHERE id = :id"
+            ),
+            updates,
+        )
+
+    if batch_ids:
+        logger.info(f"Backfilled composition fingerprints for {len(batch_ids)} batches")
+
+
+def _backfill_report_bodies(conn):
+    """Move inline lab report analysis into shared lab_report_bodies rows."""
+    reports = LabReport.__table__
+    inline = reports.c.analysis_data
+    moved = 0
+
+    while True:
+        rows = conn.execute(
+            select(reports.c.id, inline)
+            .where(reports.c.body_hash.is_(None), inline.isnot(None))
+            .order_by(reports.c.id)
+            .limit(BACKFILL_CHUNK)
+        ).all()
+
+        if not rows:
+            break
+
+        bodies = {}
+        updates = []
+        for report_id, analysis_data in rows:
+            key = body_hash(analysis_data)
+            bodies[key] = analysis_data
+            updates.append({"report_id": report_id, "key": key})
+
+        conn.execute(
+            insert_bodies_stmt(conn),
+            [{"hash": key, "analysis_data": data} for key, data in bodies.items()],
+        )
+        conn.execute(
+            update(reports)
+            .where(reports.c.id == bindparam("report_id"))
+            .values({reports.c.body_hash: bindparam("key"), inline: null()}),
+            updates,
+        )
+        moved += len(rows)
+
+    if moved:
+        logger.info(f"Moved {moved} inline lab report bodies to lab_report_bodies")
+
+
+def _backfill_measurements(conn):
+    """Extract lab_measurements for bodies stored before they existed."""
+    bodies = LabReportBody.__table__
+    indexed = 0
+
+    while True:
+        rows = conn.execute(
+            select(bodies.c.hash, bodies.c.analysis_data)
+            .where(bodies.c.parameter_count.is_(None))
+            .limit(BACKFILL_CHUNK)
+        ).all()
+
+        if not rows:
+            break
+
+        measurements = []
+        counts = []
+        for key, analysis_data in rows:
+            extracted = extract_measurements(analysis_data)
+            measurements.extend({"body_hash": key, **m} for m in extracted)
+            counts.append({"key": key, "count": len(extracted)})
+
+        if measurements:
+            conn.execute(LabMeasurement.__table__.insert(), measurements)
+        conn.execute(
+            update(bodies)
+            .where(bodies.c.hash == bindparam("key"))
+            .values(parameter_count=bindparam("count")),
+            counts,
+        )
+        indexed += len(rows)
+
+    if indexed:
+        logger.info(f"Extracted lab measurements for {indexed} report bodies")
+
+
+def _backfill_lab_queue(conn):
+    """Queue lab_required batches that have no report and no queue item yet."""
+    batches = Batch.__table__
+    reports = LabReport.__table__
+    queue = LabQueueItem.__table__
+
+    pending = conn.execute(
+        select(batches.c.id, batches.c.created_at)
+        .where(
+            batches.c.validation_status == ValidationStatus.lab_required,
+            ~exists().where(reports.c.batch_id == batches.c.id),
+            ~exists().where(queue.c.batch_id == batches.c.id),
+        )
+        .order_by(batches.c.id)
+    ).all()
+
+    for start in range(0, len(pending), BACKFILL_CHUNK):
+        chunk = pending[start:start + BACKFILL_CHUNK]
+        params = {f"id{i}": batch_id for i, (batch_id, _) in enumerate(chunk)}
+        placeholders = ", ".join(f":{key}" for key in params)
+
+        risk_levels = defaultdict(list)
+        for batch_id, risk_level in conn.execute(
+            text(
+                "SELECT bm.batch_id, m.risk_level FROM batch_materials bm "
+                "JOIN materials m ON m.id = bm.material_id "
+                f"WHERE bm.batch_id IN ({placeholders})"
+            ),
+            params,
+        ):
+            risk_levels[batch_id].append(risk_level)
+
+        items = []
+        for batch_id, created_at in chunk:
+            risk = queue_risk(risk_levels[batch_id])
+            items.append({
+                "batch_id": batch_id,
+                "risk_level": risk,
+                "priority_at": queue_priority(created_at, risk),
+                "attempts": 0,
+            })
+
+        conn.execute(LabQueueItem.__table__.insert(), items)
+
+    if pending:
+        logger.info(f"Queued {len(pending)} pending lab_required batches")
+
+
+def _backfill_location_ids(conn, table, columns: dict) -> int:
+    """
+    Set location ids for rows that have a name but no id yet, one chunk of
+    rows at a time; names that normalize to the same key share a location.
+    columns maps each name column to its id column.
+    """
+    filled = 0
+    last_id = 0
+    pending = or_(*(table.c[name].isnot(None) & table.c[id_column].is_(None) for name, id_column in columns.items()))
+
+    while True:
+        rows = conn.execute(
+            select(table.c.id, *(table.c[name] for name in columns), *(table.c[c] for c in columns.values()))
+            .where(pending, table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(BACKFILL_CHUNK)
+        ).all()
+
+        if not rows:
+            break
+
+        # In row order, so a location is named after its earliest spelling
+        names = dict.fromkeys(row._mapping[name] for row in rows for name in columns)
+        ids = get_location_ids(conn, [name for name in names if name is not None])
+
+        updates = []
+        for row in rows:
+            values = {id_column: row._mapping[id_column] or ids.get(row._mapping[name]) for name, id_column in columns.items()}
+            # Blank names stay unlinked
+            if any(values[c] is not None and row._mapping[c] is None for c in columns.values()):
+                updates.append({"row_id": row.id, **{f"new_{c}": v for c, v in values.items()}})
+
+        if updates:
+            conn.execute(
+                update(table)
+                .where(table.c.id == bindparam("row_id"))
+                .values({c: bindparam(f"new_{c}") for c in columns.values()}),
+                updates,
+            )
+        filled += len(updates)
+        last_id = rows[-1][0]
+
+    return filled
+
+
+def _backfill_locations(conn):
+    """Deduplicate free-text places of existing transports and batches into locations."""
+    transports = _backfill_location_ids(
+        conn, Transport.__table__, {"origin": "origin_id", "destination": "destination_id"}
+    )
+    batches = _backfill_location_ids(
+        conn, Batch.__table__, {"manufacturing_location": "manufacturing_location_id"}
+    )
+
+    if transports or batches:
+        locations = conn.execute(text("SELECT COUNT(*) FROM locations")).scalar()
+        logger.info(f"Linked {transports} transports and {batches} batches to {locations} locations")
+
+
+def _backfill_emission_buckets(conn):
+    """Build the daily emission buckets once, when the table is new."""
+    if conn.execute(text("SELECT 1 FROM emission_buckets LIMIT 1")).first():
+        return
+    if not conn.execute(text("SELECT 1 FROM transports LIMIT 1")).first():
+        return
+
+    buckets = emission_buckets.rebuild(conn)
+    logger.info(f"Built {buckets} daily emission buckets from existing transports")
+
+
+def _postgres_jsonb(conn, inspector):
+    """jsonb + GIN (jsonb_path_ops) for containment queries on analysis sections."""
+    if conn.dialect.name != "postgresql":
+        return
+
+    columns = {c["name"]: c["type"] for c in inspector.get_columns("lab_report_bodies")}
+    if type(columns["analysis_data"]).__name__ != "JSONB":
+        conn.execute(text(
+            "ALTER TABLE lab_report_bodies "
+            "ALTER COLUMN analysis_data TYPE jsonb USING analysis_data::jsonb"
+        ))
+        logger.info("Converted lab_report_bodies.analysis_data to jsonb")
+
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_lab_report_bodies_analysis_gin "
+        "ON lab_report_bodies USING gin (analysis_data jsonb_path_ops)"
+    ))
+
+
+def run_migrations(engine):
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        _add_columns(conn, inspector)
+        _create_indexes(conn, inspector)
+
+        tables = set(inspector.get_table_names())
+
+        if "batches" in tables:
+            _backfill_composition(conn)
+
+        if "locations" in tables:
+            _backfill_locations(conn)
+
+        if "emission_buckets" in tables:
+            _backfill_emission_buckets(conn)
+
+        if "lab_reports" in tables:
+            _backfill_report_bodies(conn)
+            purged = purge_orphans(conn)
+            if purged:
+                logger.info(f"Removed {purged} lab queue items of deleted batches")
+            _backfill_lab_queue(conn)
+
+        if "lab_report_bodies" in tables:
+            _backfill_measurements(conn)
+            _postgres_jsonb(conn, inspector)
@@ -1,9 +1,15 @@
 from .user import User, UserRole
 from .product import Product
 from .batch import Batch, BatchStatus, ValidationStatus
-from .lab_report import LabReport, SafetyStatus
+from .lab_report import LabReport, LabReportBody, LabMeasurement, SafetyStatus
+from .location import Location
 from .transport import Transport
 from .review import Review
 from .ai_score import AIScore
 from .audit_log import AuditLog
-from .material import BatchMaterial, Material, RiskLevel
\ No newline at end of file
+from .material import BatchMaterial, Material, RiskLevel
+from .lab_queue import LabQueueItem
+from .scheduled_job import ScheduledJob
+from .outbox import OutboxEvent, OutboxCursor
+from .emission_recalc import EmissionRecalcRun, EmissionRecalcBatch
+from .emission_bucket import EmissionBucket
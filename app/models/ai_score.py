@@ -13,6 +13,10 @@ class AIScore(Base):
 
     reasoning = Column(String)
 
+    # "llm" (Gemini) or "rules" (local fast-path scorer)
+    source = Column(String(20), default="llm")
+    confidence = Column(Float, nullable=True)
+
     generated_at = Column(DateTime, default=datetime.utcnow)
 
     batch = relationship("Batch", back_populates="ai_scores")
\ No newline at end of file
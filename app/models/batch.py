@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Enum, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Enum, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import datetime
@@ -27,10 +27,23 @@ class Batch(Base):
     manufacture_date = Column(DateTime)
     expiry_date = Column(DateTime)
     manufacturing_location = Column(String)
+    manufacturing_location_id = Column(Integer, ForeignKey("locations.id"), nullable=True)
     base_carbon_footprint = Column(Float)
 
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # Canonical "material_id:percentage" list and its sha256, set on create;
+    # identical compositions of a product share a fingerprint
+    composition_vector = Column(String, nullable=True, index=True)
+    composition_fingerprint = Column(String(64), nullable=True)
+
+    # Bumped by app.services.content_versions whenever the passport or the
+    # reviews change; read endpoints derive ETag / Last-Modified from these
+    version = Column(Integer, default=1, nullable=False, server_default="1")
+    updated_at = Column(DateTime, nullable=True)
+    review_version = Column(Integer, default=0, nullable=False, server_default="0")
+    reviews_updated_at = Column(DateTime, nullable=True)
+
     status = Column(Enum(BatchStatus), default=BatchStatus.pending)
     validation_status = Column(Enum(ValidationStatus), default=ValidationStatus.auto_verified)
 
@@ -39,6 +52,13 @@ class Batch(Base):
     lab_reports = relationship("LabReport", back_populates="batch")
     ai_scores = relationship("AIScore", back_populates="batch")
     transports = relationship("Transport", back_populates="batch")
+    # Removed with the batch by the ORM; SQLite does not enforce ON DELETE CASCADE
+    lab_queue_item = relationship(
+        "LabQueueItem",
+        back_populates="batch",
+        cascade="all, delete-orphan",
+        uselist=False,
+    )
 
     materials = relationship(
         "BatchMaterial",
@@ -48,4 +68,6 @@ class Batch(Base):
 
     __table_args__ = (
         UniqueConstraint('product_id', 'batch_code', name='uq_product_batch_code'),
+        Index('ix_batches_product_fingerprint', 'product_id', 'composition_fingerprint'),
+        Index('ix_batches_product_created', 'product_id', 'created_at'),
     )
\ No newline at end of file
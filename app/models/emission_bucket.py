@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Index
+from app.database import Base
+from datetime import datetime
+
+
+class EmissionBucket(Base):
+    """
+    Transport totals per UTC day, product, transporter and fuel type
+    (see app.services.emission_buckets). Carbon analytics sum these rows
+    instead of grouping transports.
+    """
+    __tablename__ = "emission_buckets"
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    transporter_id = Column(Integer, primary_key=True)
+    # Normalized like emission_factors.normalize ("Natural Gas" -> "natural_gas")
+    fuel_type = Column(String, primary_key=True)
+
+    transports = Column(Integer, nullable=False, default=0)
+    distance_km = Column(Float, nullable=False, default=0.0)
+    emission = Column(Float, nullable=False, default=0.0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_emission_buckets_product_day", "product_id", "day"),
+        Index("ix_emission_buckets_transporter_day", "transporter_id", "day"),
+    )
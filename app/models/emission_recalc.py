@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, JSON, ForeignKey
+from app.database import Base
+from datetime import datetime
+
+
+class EmissionRecalcRun(Base):
+    """
+    One bulk recalculation of transport emissions (see
+    app.services.emission_recalc). Transports are processed in batch-id
+    order and last_batch_id is saved with every chunk, so an interrupted
+    run resumes where it stopped if the factor table is unchanged.
+    """
+    __tablename__ = "emission_recalc_runs"
+
+    id = Column(Integer, primary_key=True)
+    factors_version = Column(String(16), nullable=False)
+    status = Column(String(20), default="running", nullable=False)  # running / completed / failed / superseded
+
+    last_batch_id = Column(Integer, default=0, nullable=False)
+    total_transports = Column(Integer, default=0, nullable=False)
+    processed_transports = Column(Integer, default=0, nullable=False)
+    changed_transports = Column(Integer, default=0, nullable=False)
+    changed_batches = Column(Integer, default=0, nullable=False)
+    emission_before = Column(Float, default=0, nullable=False)
+    emission_after = Column(Float, default=0, nullable=False)
+
+    error = Column(String, nullable=True)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class EmissionRecalcBatch(Base):
+    """Diff row: a batch whose transport emission total a run changed."""
+    __tablename__ = "emission_recalc_batches"
+
+    run_id = Column(Integer, ForeignKey("emission_recalc_runs.id", ondelete="CASCADE"), primary_key=True)
+    batch_id = Column(Integer, primary_key=True)
+    transports_changed = Column(Integer, nullable=False)
+    total_before = Column(Float, nullable=False)
+    total_after = Column(Float, nullable=False)
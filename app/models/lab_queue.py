@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from app.database import Base
+from datetime import datetime
+
+
+class LabQueueItem(Base):
+    """
+    One lab_required batch waiting for (or being) tested.
+
+    A lab claims items for a lease period; unfinished claims become
+    claimable again once lease_expires_at passes. priority_at is the
+    batch's creation time moved earlier by its material risk, so ordering
+    by it mixes age and risk with one index.
+    """
+    __tablename__ = "lab_queue"
+
+    id = Column(Integer, primary_key=True, index=True)
+    batch_id = Column(Integer, ForeignKey("batches.id", ondelete="CASCADE"), unique=True, nullable=False)
+
+    risk_level = Column(String(20), nullable=True)
+    priority_at = Column(DateTime, nullable=False)
+
+    claimed_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    claim_token = Column(String(32), nullable=True, index=True)
+    claimed_at = Column(DateTime, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+
+    completed_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    batch = relationship("Batch", back_populates="lab_queue_item")
+    lab = relationship("User")
+
+    __table_args__ = (
+        Index("ix_lab_queue_open_priority", "completed_at", "priority_at"),
+    )
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Float, Enum, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Float, Enum, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship, object_session
 from app.database import Base
 from datetime import datetime
 import enum
@@ -10,6 +11,43 @@ class SafetyStatus(enum.Enum):
     unsafe = "unsafe"
 
 
+class LabReportBody(Base):
+    """
+    Analysis content stored once per distinct body, keyed by its sha256.
+    Rows are immutable and shared by every report with the same content.
+    """
+    __tablename__ = "lab_report_bodies"
+
+    hash = Column(String(64), primary_key=True)
+    # JSONB on Postgres so section containment queries can use a GIN index
+    analysis_data = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+    # Number of lab_measurements rows extracted; NULL = not indexed yet
+    parameter_count = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class LabMeasurement(Base):
+    """
+    One numeric "parameter: value unit" line of a report body, written
+    together with the body so reports can be filtered by value ranges.
+    """
+    __tablename__ = "lab_measurements"
+
+    id = Column(Integer, primary_key=True)
+    body_hash = Column(String(64), ForeignKey("lab_report_bodies.hash", ondelete="CASCADE"), nullable=False, index=True)
+
+    section = Column(String, nullable=True)
+    parameter = Column(String, nullable=False)
+    parameter_key = Column(String, nullable=False)
+    value = Column(Float, nullable=False)
+    unit = Column(String, nullable=True)
+
+    __table_args__ = (
+        Index("ix_lab_measurements_param_value", "parameter_key", "value"),
+        Index("ix_lab_measurements_section", "section"),
+    )
+
+
 class LabReport(Base):
     __tablename__ = "lab_reports"
 
@@ -18,7 +56,10 @@ class LabReport(Base):
     batch_id = Column(Integer, ForeignKey("batches.id"))
     lab_id = Column(Integer, ForeignKey("users.id"))
 
-    analysis_data = Column(JSON)
+    # New reports reference a shared body; inline_analysis only holds
+    # rows written before lab_report_bodies existed
+    body_hash = Column(String(64), ForeignKey("lab_report_bodies.hash"), nullable=True, index=True)
+    inline_analysis = Column("analysis_data", JSON)
     certifications = Column(String)
 
     safety_status = Column(Enum(SafetyStatus))
@@ -32,4 +73,14 @@ class LabReport(Base):
 
     #  Relationships
     batch = relationship("Batch", back_populates="lab_reports")
-    lab = relationship("User")
\ No newline at end of file
+    lab = relationship("User")
+
+    @property
+    def analysis_data(self):
+        """Resolved through the body cache (see app.services.report_bodies)."""
+        if self.body_hash is None:
+            return self.inline_analysis
+
+        from app.services.report_bodies import get_body
+
+        return get_body(object_session(self), self.body_hash)
\ No newline at end of file
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.database import Base
+from datetime import datetime
+
+
+class Location(Base):
+    """
+    One row per distinct place name. key is the normalized name (see
+    app.crud.location.location_key), so "Mumbai" and "mumbai " are the same
+    location; name keeps the first spelling seen.
+    """
+    __tablename__ = "locations"
+
+    id = Column(Integer, primary_key=True)
+    key = Column(String, unique=True, nullable=False)
+    name = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
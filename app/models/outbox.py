@@ -0,0 +1,49 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index
+from app.database import Base
+from datetime import datetime
+
+
+class OutboxEvent(Base):
+    """
+    One domain change, written by the flush that made it (see
+    app.services.outbox), so an event exists if and only if its change
+    committed.
+
+    Events are compact: the names of changed columns plus a few state
+    values (statuses, ratings) listed in outbox.STATE_FIELDS, never
+    arbitrary column contents.
+    """
+    __tablename__ = "outbox_events"
+
+    id = Column(Integer, primary_key=True)
+    entity = Column(String(32), nullable=False)
+    entity_id = Column(Integer, nullable=True)
+    action = Column(String(10), nullable=False)  # created / updated / deleted
+
+    # Routing keys so subscribers rarely need to load the entity
+    batch_id = Column(Integer, nullable=True)
+    product_id = Column(Integer, nullable=True)
+    actor_id = Column(Integer, nullable=True)
+
+    fields = Column(JSON, nullable=True)
+    state = Column(JSON, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_outbox_events_created", "created_at"),
+        Index("ix_outbox_events_batch", "batch_id", "id"),
+    )
+
+
+class OutboxCursor(Base):
+    """Delivery position of one shared subscriber; advanced in its handler's transaction."""
+    __tablename__ = "outbox_cursors"
+
+    subscriber = Column(String(64), primary_key=True)
+    last_event_id = Column(Integer, default=0, nullable=False)
+    delivered_count = Column(Integer, default=0, nullable=False)
+    # JSON [[event id, unix time], ...] of ids stepped over unproven; rescanned
+    # until OUTBOX_RESCAN_SECONDS in case their transaction commits late
+    skipped_ids = Column(Text, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
@@ -11,7 +11,7 @@ class Product(Base):
     brand = Column(String)
     category = Column(String)
     description = Column(String)
-    manufacturer_id = Column(Integer, ForeignKey("users.id"))
+    manufacturer_id = Column(Integer, ForeignKey("users.id"), index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     batches = relationship("Batch", back_populates="product")
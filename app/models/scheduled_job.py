@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean
+from app.database import Base
+from datetime import datetime
+
+
+class ScheduledJob(Base):
+    """
+    Persistent state of one periodic job (see app.services.scheduler).
+
+    Any process may run the scheduler loop; a run is claimed by moving
+    locked_until forward with a conditional UPDATE, so each due run
+    executes exactly once across workers.
+    """
+    __tablename__ = "scheduled_jobs"
+
+    name = Column(String(64), primary_key=True)
+    interval_seconds = Column(Integer, nullable=False)
+    jitter_seconds = Column(Integer, default=0, nullable=False)
+    enabled = Column(Boolean, default=True, nullable=False)
+
+    next_run_at = Column(DateTime, nullable=False, index=True)
+    locked_by = Column(String(64), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+
+    last_started_at = Column(DateTime, nullable=True)
+    last_finished_at = Column(DateTime, nullable=True)
+    last_status = Column(String(20), nullable=True)
+    last_error = Column(String, nullable=True)
+    last_result = Column(String, nullable=True)
+    last_duration_ms = Column(Float, nullable=True)
+
+    run_count = Column(Integer, default=0, nullable=False)
+    failure_count = Column(Integer, default=0, nullable=False)
+    total_duration_ms = Column(Float, default=0, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -14,7 +14,12 @@ class Transport(Base):
 
     origin = Column(String, nullable=False)
     destination = Column(String, nullable=False)
+    # Normalized places; route and chain checks compare these, not the text
+    origin_id = Column(Integer, ForeignKey("locations.id"), nullable=True)
+    destination_id = Column(Integer, ForeignKey("locations.id"), nullable=True)
     distance_km = Column(Float, nullable=False)
+    # "entered" by the transporter or computed from the "gazetteer"
+    distance_source = Column(String(12), nullable=True)
 
     fuel_type = Column(String, nullable=False)
     vehicle_type = Column(String, nullable=True)
@@ -24,4 +29,11 @@ class Transport(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     batch = relationship("Batch", back_populates="transports")
-    transporter = relationship("User", foreign_keys=[transporter_id])
\ No newline at end of file
+    transporter = relationship("User", foreign_keys=[transporter_id])
+
+    __table_args__ = (
+        # Per-batch lookups and the batch-ordered emission recalculation scan
+        Index("ix_transports_batch_id", "batch_id", "id"),
+        # Duplicate-route checks and origin balances of a batch
+        Index("ix_transports_batch_route", "batch_id", "origin_id", "destination_id"),
+    )
\ No newline at end of file
@@ -1,4 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.schemas.user import UserCreate, UserOut
 from app.crud.user import create_user
@@ -7,6 +10,12 @@ from app.core.roles import require_role
 from app.models.user import UserRole
 from app.crud.lab_report import get_all_reports_admin, get_lab_report_by_id, verify_lab_report, reject_lab_report
 from app.crud.admin import get_admin_dashboard
+from app.services.llm_client import get_llm_metrics
+from app.services import scheduler, outbox, emission_recalc, emission_buckets
+from app.models.emission_recalc import EmissionRecalcRun
+from app.schemas.scheduler import ScheduledJobResponse, JobRunResponse
+from app.schemas.transport import EmissionSeriesResponse
+from app.schemas.lab_report import LabReportAdminItem, LabReportAdminListResponse
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -28,7 +37,7 @@ def admin_dashboard(
     return get_admin_dashboard(db)
 
 
-@router.get("/reports")
+@router.get("/reports", response_model=LabReportAdminListResponse)
 def list_reports(
     skip: int = 0,
     limit: int = 10,
@@ -44,7 +53,7 @@ def list_reports(
     }
 
 
-@router.get("/reports/{report_id}")
+@router.get("/reports/{report_id}", response_model=LabReportAdminItem)
 def get_report(
     report_id: int,
     db: Session = Depends(get_db),
@@ -58,7 +67,7 @@ def get_report(
     return report
 
 
-@router.post("/reports/{report_id}/verify")
+@router.post("/reports/{report_id}/verify", response_model=LabReportAdminItem)
 def verify_report(
     report_id: int,
     db: Session = Depends(get_db),
@@ -67,11 +76,170 @@ def verify_report(
     return verify_lab_report(db, report_id)
 
 
-@router.post("/reports/{report_id}/reject")
+@router.post("/reports/{report_id}/reject", response_model=LabReportAdminItem)
 def reject_report(
     report_id: int,
     reason: str | None = None,
     db: Session = Depends(get_db),
     user = Depends(require_role(UserRole.admin))
 ):
-    return reject_lab_report(db, report_id, reason)
\ No newline at end of file
+    return reject_lab_report(db, report_id, reason)
+
+
+@router.get("/llm/metrics")
+def llm_metrics(
+    user = Depends(require_role(UserRole.admin))
+):
+    """Deadline, concurrency, rate-limit and circuit-breaker metrics for LLM calls."""
+    return get_llm_metrics()
+
+
+@router.get("/outbox")
+def outbox_status(
+    db: Session = Depends(get_db),
+    user = Depends(require_role(UserRole.admin))
+):
+    """Change-event outbox: newest event id and each subscriber's position and lag."""
+    return outbox.outbox_stats(db)
+
+
+# ==========================================================
+# EMISSION RECALCULATION
+# ==========================================================
+
+def _recalc_run_out(run):
+    return {
+        "id": run.id,
+        "factors_version": run.factors_version,
+        "status": run.status,
+        "progress": round(run.processed_transports / run.total_transports, 3) if run.total_transports else None,
+        "processed_transports": run.processed_transports,
+        "total_transports": run.total_transports,
+        "changed_transports": run.changed_transports,
+        "changed_batches": run.changed_batches,
+        "emission_before": round(run.emission_before, 2),
+        "emission_after": round(run.emission_after, 2),
+        "error": run.error,
+        "started_at": run.started_at,
+        "finished_at": run.finished_at,
+    }
+
+
+@router.get("/emission-recalcs")
+def list_emission_recalcs(
+    db: Session = Depends(get_db),
+    user = Depends(require_role(UserRole.admin))
+):
+    """Recent bulk emission recalculation runs (scripts/recalculate_emissions.py) with progress."""
+    runs = db.query(EmissionRecalcRun).order_by(EmissionRecalcRun.id.desc()).limit(20).all()
+    return [_recalc_run_out(run) for run in runs]
+
+
+@router.get("/emission-recalcs/{run_id}")
+def get_emission_recalc(
+    run_id: int,
+    top: int = 50,
+    db: Session = Depends(get_db),
+    user = Depends(require_role(UserRole.admin))
+):
+    """One run plus the batches whose emission totals it changed most."""
+    run = db.get(EmissionRecalcRun, run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+
+    return {
+        **_recalc_run_out(run),
+        "top_changes": [
+            {
+                "batch_id": row.batch_id,
+                "transports_changed": row.transports_changed,
+                "total_before": row.total_before,
+                "total_after": row.total_after,
+                "delta": round(row.total_after - row.total_before, 2),
+            }
+            for row in emission_recalc.top_changes(db, run.id, min(top, 500))
+        ],
+    }
+
+
+# ==========================================================
+# CARBON ANALYTICS
+# ==========================================================
+
+@router.get("/analytics/emissions", response_model=EmissionSeriesResponse)
+def emission_analytics(
+    interval: Literal["day", "week", "month"] = "day",
+    start: date | None = None,
+    end: date | None = None,
+    group_by: Literal["product", "transporter", "fuel_type"] | None = None,
+    manufacturer_id: int | None = None,
+    product_id: int | None = None,
+    transporter_id: int | None = None,
+    fuel_type: str | None = None,
+    max_points: int = Query(emission_buckets.ANALYTICS_MAX_POINTS, ge=1, le=3660),
+    db: Session = Depends(get_db),
+    user = Depends(require_role(UserRole.admin))
+):
+    """Platform-wide transport emissions over time, from daily buckets."""
+    try:
+        return emission_buckets.series(
+            db,
+            start=start,
+            end=end,
+            interval=interval,
+            group_by=group_by,
+            manufacturer_id=manufacturer_id,
+            product_id=product_id,
+            transporter_id=transporter_id,
+            fuel_type=fuel_type,
+            max_points=max_points,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ==========================================================
+# SCHEDULED JOBS
+# ==========================================================
+
+@router.get("/jobs", response_model=list[ScheduledJobResponse])
+def list_jobs(
+    db: Session = Depends(get_db),
+    user = Depends(require_role(UserRole.admin))
+):
+    """Periodic jobs with their schedule, last run and run-time metrics."""
+    return [ScheduledJobResponse.model_validate(row) for row in scheduler.job_states(db)]
+
+
+@router.post("/jobs/{name}/run")
+def run_job(
+    name: str,
+    wait: bool = False,
+    db: Session = Depends(get_db),
+    user = Depends(require_role(UserRole.admin))
+):
+    """
+    Make a job due now (picked up by the next scheduler pass), or with
+    wait=true run it in this request and return the outcome.
+    """
+    scheduler.ensure_jobs(db)
+
+    try:
+        if not wait:
+            scheduler.trigger(db, name)
+            return {"name": name, "status": "scheduled"}
+
+        outcome = scheduler.run_now(db, name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if outcome is None:
+        raise HTTPException(status_code=409, detail="Job is running or disabled")
+
+    status, result, error = outcome
+    return JobRunResponse(
+        name=name,
+        status=status,
+        result=str(result) if result is not None else None,
+        error=error,
+    )
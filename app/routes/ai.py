@@ -6,6 +6,7 @@ from app.models.user import UserRole
 from app.models.ai_score import AIScore
 from app.models.batch import Batch
 from app.services.ai_engine import generate_ai_rating, analyze_batch_materials
+from app.core.rate_limit import rate_limit
 
 router = APIRouter()
 
@@ -63,7 +64,10 @@ def analyze_batch_material_info(
     }
 
 # Generate new AI score
-@router.post("/batch/{batch_id}/generate-score")
+@router.post(
+    "/batch/{batch_id}/generate-score",
+    dependencies=[Depends(rate_limit("ai_generate_score"))],
+)
 def regenerate_ai_score(
     batch_id: int,
     db: Session = Depends(get_db),
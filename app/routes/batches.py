@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from math import ceil
 from app.schemas.batch import (
@@ -13,6 +15,10 @@ from app.models.user import UserRole
 import app.crud.batch as batch_crud
 from app.models.batch import Batch
 from app.models.material import BatchMaterial
+from app.core.http_cache import make_etag, cache_headers, is_not_modified, not_modified
+from app.core.rate_limit import rate_limit
+from app.database import SessionLocal
+from app.services import event_stream, outbox
 
 router = APIRouter()
 
@@ -50,19 +56,27 @@ def list_my_batches(
 # GET LATEST MATERIALS BY PRODUCT
 # ============================================================
 @router.get("/product/{product_id}/latest-materials")
-def get_latest_materials(product_id: int, db: Session = Depends(get_db)):
-
-    #  Step 1: Get latest batch
-    latest_batch = (
-        db.query(Batch)
-        .filter(Batch.product_id == product_id)
-        .order_by(Batch.created_at.desc())
-        .first()
-    )
+def get_latest_materials(
+    product_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+):
+
+    #  Step 1: Get latest batch (id + version only)
+    latest_batch = batch_crud.get_latest_batch_version(db, product_id)
 
     if not latest_batch:
         raise HTTPException(status_code=404, detail="No batch found")
 
+    etag = make_etag("latest-materials", product_id, latest_batch.id, latest_batch.version)
+    headers = cache_headers("latest_materials", etag, latest_batch.modified_at)
+
+    if is_not_modified(request, etag, latest_batch.modified_at):
+        return not_modified(headers)
+
+    response.headers.update(headers)
+
     #  Step 2: Get materials using batch_id
     batch_materials = (
         db.query(BatchMaterial)
@@ -83,6 +97,81 @@ def get_latest_materials(product_id: int, db: Session = Depends(get_db)):
         ]
     }
 
+# ============================================================
+# EVENT STREAMS (Server-Sent Events)
+# ============================================================
+def _last_event_id(request: Request) -> int:
+    value = request.headers.get("last-event-id") or request.query_params.get("last_event_id")
+    try:
+        return max(int(value), 0) if value else 0
+    except ValueError:
+        return 0
+
+
+def _in_session(fn, *args):
+    # Streams outlive any request-scoped session; use short-lived ones
+    def run():
+        db = SessionLocal()
+        try:
+            return fn(db, *args)
+        finally:
+            db.close()
+    return run_in_threadpool(run)
+
+
+def _event_stream_response(request: Request, topic: str, batch_ids) -> StreamingResponse:
+    if not outbox.OUTBOX_ENABLED:
+        raise HTTPException(status_code=503, detail="Event streams are disabled")
+    if event_stream.broker.connections() >= event_stream.SSE_MAX_CONNECTIONS:
+        raise HTTPException(status_code=503, detail="Too many open event streams", headers={"Retry-After": "30"})
+
+    last_event_id = _last_event_id(request)
+    backlog = None
+    if last_event_id:
+        backlog = lambda: _in_session(event_stream.replay, batch_ids, last_event_id)
+
+    return StreamingResponse(
+        event_stream.stream(request, [topic], last_event_id, backlog),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/my/events")
+async def stream_my_batch_events(
+    request: Request,
+    user=Depends(require_role(UserRole.manufacturer)),
+):
+    """
+    Status changes of all the manufacturer's batches, as Server-Sent Events:
+    batch_created / batch_status / batch_deleted, ai_score,
+    lab_report_submitted / lab_report_reviewed, transport_added / transport_removed.
+    Reconnect with Last-Event-ID to replay missed events.
+    """
+    return _event_stream_response(
+        request,
+        event_stream.manufacturer_topic(user.id),
+        event_stream.manufacturer_batches(user.id),
+    )
+
+
+@router.get("/{batch_id}/events")
+async def stream_batch_events(
+    batch_id: int,
+    request: Request,
+    user=Depends(require_role(UserRole.manufacturer)),
+):
+    """
+    Status changes of one of the manufacturer's batches (see /my/events);
+    admins may follow any batch.
+    """
+    owned = await _in_session(batch_crud.get_batch_owner, batch_id)
+    if owned is None or (owned != user.id and user.role != UserRole.admin):
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    return _event_stream_response(request, event_stream.batch_topic(batch_id), [batch_id])
+
+
 # ============================================================
 # GET SINGLE
 # ============================================================
@@ -103,7 +192,11 @@ def get_batch(
 # ============================================================
 # CREATE
 # ============================================================
-@router.post("/{product_id}", response_model=BatchResponse)
+@router.post(
+    "/{product_id}",
+    response_model=BatchResponse,
+    dependencies=[Depends(rate_limit("batch_create"))],
+)
 def create_batch(
     product_id: int,
     data: BatchCreate,
@@ -0,0 +1,111 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from app.database import SessionLocal
+from app.core.roles import require_role
+from app.models.user import UserRole
+from app.utils.export import iter_csv, iter_ndjson
+from app.crud.export import (
+    iter_batches,
+    iter_transports,
+    iter_lab_reports,
+    iter_users,
+    BATCH_COLUMNS,
+    TRANSPORT_COLUMNS,
+    LAB_REPORT_COLUMNS,
+    USER_COLUMNS,
+)
+
+router = APIRouter()
+
+EXPORT_FORMAT = Query("csv", pattern="^(csv|ndjson)$")
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _scope(user) -> int | None:
+    """Admins export everything; other roles only their own rows."""
+    return None if user.role == UserRole.admin else user.id
+
+
+def _export(rows_fn, columns: list, fmt: str, filename: str) -> StreamingResponse:
+    """
+    Stream rows_fn(db) as CSV/NDJSON. The generator owns its session so it
+    stays open for the whole body, independent of request dependencies.
+    """
+    def generate():
+        db = SessionLocal()
+        try:
+            rows = rows_fn(db)
+            if fmt == "csv":
+                yield from iter_csv(rows, columns)
+            else:
+                yield from iter_ndjson(rows)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        generate(),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
+
+
+@router.get("/batches")
+def export_batches(
+    format: str = EXPORT_FORMAT,
+    user=Depends(require_role(UserRole.manufacturer)),
+):
+    """
+    Export all batches (with materials) of the logged-in manufacturer.
+    """
+    manufacturer_id = _scope(user)
+    return _export(
+        lambda db: iter_batches(db, manufacturer_id),
+        BATCH_COLUMNS, format, "batches",
+    )
+
+
+@router.get("/transports")
+def export_transports(
+    format: str = EXPORT_FORMAT,
+    user=Depends(require_role(UserRole.transporter)),
+):
+    """
+    Export all transport legs (with emissions) of the logged-in transporter.
+    """
+    transporter_id = _scope(user)
+    return _export(
+        lambda db: iter_transports(db, transporter_id),
+        TRANSPORT_COLUMNS, format, "transports",
+    )
+
+
+@router.get("/lab-reports")
+def export_lab_reports(
+    format: str = EXPORT_FORMAT,
+    verified: bool | None = Query(None),
+    user=Depends(require_role(UserRole.lab)),
+):
+    """
+    Export all lab reports of the logged-in lab.
+    """
+    lab_id = _scope(user)
+    return _export(
+        lambda db: iter_lab_reports(db, lab_id, verified),
+        LAB_REPORT_COLUMNS, format, "lab_reports",
+    )
+
+
+@router.get("/users")
+def export_users(
+    format: str = EXPORT_FORMAT,
+    user=Depends(require_role(UserRole.admin)),
+):
+    """
+    Export all users (admin only).
+    """
+    return _export(iter_users, USER_COLUMNS, format, "users")
@@ -6,10 +6,27 @@ from app.models.batch import Batch, ValidationStatus
 from app.models.user import UserRole
 from app.models.product import Product
 from app.core.roles import require_role
+from app.core.responses import ModelResponse
+from app.schemas.lab_queue import (
+    LabQueueItemResponse,
+    LabClaimResponse,
+    LabQueueStats,
+    PendingLabTestsResponse,
+)
+from app.crud.lab_queue import (
+    claim_items,
+    get_my_claims,
+    renew_claim,
+    release_claim,
+    claimed_by_others,
+    queue_stats,
+    LAB_LEASE_MINUTES,
+    LAB_CLAIM_MAX,
+)
 
 router = APIRouter()
 
-@router.get("/pending-tests")
+@router.get("/pending-tests", response_model=PendingLabTestsResponse)
 def pending_lab_tests(
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
@@ -24,7 +41,8 @@ def pending_lab_tests(
         .options(joinedload(Batch.product))
         .filter(
             Batch.validation_status == ValidationStatus.lab_required,
-            ~Batch.lab_reports.any()  #  No lab report exists
+            ~Batch.lab_reports.any(),  #  No lab report exists
+            ~Batch.id.in_(claimed_by_others(user.id)),  #  Not leased by another lab
         )
     )
 
@@ -47,9 +65,63 @@ def pending_lab_tests(
         .all()
     )
 
-    return {
-        "items": items,
-        "total": total,
-        "page": page,
-        "limit": limit
-    }
\ No newline at end of file
+    return ModelResponse(PendingLabTestsResponse(
+        items=items,
+        total=total,
+        page=page,
+        limit=limit,
+    ))
+
+
+# ==========================================================
+# WORK QUEUE (claim -> test -> file report)
+# ==========================================================
+
+@router.post("/queue/claim", response_model=LabClaimResponse)
+def claim_lab_work(
+    count: int = Query(5, ge=1, le=LAB_CLAIM_MAX),
+    db: Session = Depends(get_db),
+    user = Depends(require_role(UserRole.lab))
+):
+    """
+    Lease up to `count` pending batches, highest risk / oldest first.
+    Filing a report for a batch completes its item; unfinished leases
+    return to the queue after the lease expires.
+    """
+    items = claim_items(db, user.id, count)
+    return ModelResponse(LabClaimResponse(items=items, lease_minutes=LAB_LEASE_MINUTES))
+
+
+@router.get("/queue/mine", response_model=list[LabQueueItemResponse])
+def my_lab_claims(
+    db: Session = Depends(get_db),
+    user = Depends(require_role(UserRole.lab))
+):
+    return [LabQueueItemResponse.model_validate(item) for item in get_my_claims(db, user.id)]
+
+
+@router.post("/queue/{item_id}/renew", response_model=LabQueueItemResponse)
+def renew_lab_claim(
+    item_id: int,
+    db: Session = Depends(get_db),
+    user = Depends(require_role(UserRole.lab))
+):
+    return LabQueueItemResponse.model_validate(renew_claim(db, item_id, user.id))
+
+
+@router.post("/queue/{item_id}/release")
+def release_lab_claim(
+    item_id: int,
+    db: Session = Depends(get_db),
+    user = Depends(require_role(UserRole.lab))
+):
+    release_claim(db, item_id, user.id)
+    return {"message": "Claim released"}
+
+
+@router.get("/queue/stats", response_model=LabQueueStats)
+def lab_queue_stats(
+    db: Session = Depends(get_db),
+    user = Depends(require_role(UserRole.lab))
+):
+    return queue_stats(db)
@@ -13,7 +13,11 @@ from app.schemas.lab_report import (
     LabReportCreate,
     LabReportUpdate,
     LabReportResponse,
+    LabReportListResponse,
+    LabDashboardResponse,
+    LabParameterSummary,
 )
+from app.core.responses import ModelResponse
 
 from app.crud.lab_report import (
     create_lab_report,
@@ -22,6 +26,8 @@ from app.crud.lab_report import (
     get_lab_report_by_id,
     get_reports_by_lab_paginated,
     get_all_reports_paginated,
+    search_reports,
+    list_parameters,
 )
 
 router = APIRouter()
@@ -30,7 +36,7 @@ router = APIRouter()
 # 1️⃣ LAB DASHBOARD
 # ==========================================================
 
-@router.get("/my/stats")
+@router.get("/my/stats", response_model=LabDashboardResponse)
 def lab_dashboard(
     db: Session = Depends(get_db),
     user = Depends(require_role(UserRole.lab))
@@ -67,13 +73,13 @@ def lab_dashboard(
         .all()
     )
 
-    return {
-        "total_batches_tested": total_batches_tested,
-        "unique_products_tested": unique_products_tested,
-        "verified_reports": verified_reports,
-        "pending_reports": pending_reports,
-        "recent_reports": recent_reports
-    }
+    return ModelResponse(LabDashboardResponse(
+        total_batches_tested=total_batches_tested or 0,
+        unique_products_tested=unique_products_tested or 0,
+        verified_reports=verified_reports or 0,
+        pending_reports=pending_reports or 0,
+        recent_reports=recent_reports,
+    ))
 
 
 # ==========================================================
@@ -127,7 +133,7 @@ def delete_report(
 # 5️⃣ GET MY REPORTS (LAB - PAGINATED)
 # ==========================================================
 
-@router.get("/my")
+@router.get("/my", response_model=LabReportListResponse)
 def get_my_reports(
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
@@ -147,12 +153,12 @@ def get_my_reports(
         verified=verified
     )
 
-    return {
-        "items": items,
-        "total": total,
-        "page": page,
-        "limit": limit
-    }
+    return ModelResponse(LabReportListResponse(
+        items=items,
+        total=total,
+        page=page,
+        limit=limit,
+    ))
 
 
 # ==========================================================
@@ -183,7 +189,62 @@ def get_all_reports(
 
 
 # ==========================================================
-# 7️⃣ GET SINGLE REPORT (PUBLIC)
+# 7️⃣ SEARCH BY ANALYSIS VALUES (LAB / ADMIN)
+# ==========================================================
+
+@router.get("/search", response_model=LabReportListResponse)
+def search_by_analysis(
+    parameter: str | None = Query(None, description="Measured parameter, e.g. Lead"),
+    min_value: float | None = Query(None),
+    max_value: float | None = Query(None),
+    section: str | None = Query(None, description="Exact analysis section title"),
+    verified: bool | None = Query(None),
+    page: int = Query(1, ge=1),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    user = Depends(require_role(UserRole.lab))
+):
+    """
+    Filter reports by measured values, e.g. `?parameter=Lead&min_value=0.5`.
+    Labs search their own reports; admins search all.
+    """
+    if parameter is None and section is None:
+        raise HTTPException(status_code=400, detail="Provide parameter and/or section")
+
+    items, total = search_reports(
+        db=db,
+        lab_id=None if user.role == UserRole.admin else user.id,
+        skip=(page - 1) * limit,
+        limit=limit,
+        parameter=parameter,
+        min_value=min_value,
+        max_value=max_value,
+        section=section,
+        verified=verified,
+    )
+
+    return ModelResponse(LabReportListResponse(
+        items=items,
+        total=total,
+        page=page,
+        limit=limit,
+    ))
+
+
+@router.get("/parameters", response_model=list[LabParameterSummary])
+def get_measured_parameters(
+    db: Session = Depends(get_db),
+    user = Depends(require_role(UserRole.lab))
+):
+    """
+    Parameters found in analysis data, with units and value ranges.
+    """
+    rows = list_parameters(db, None if user.role == UserRole.admin else user.id)
+    return [LabParameterSummary.model_validate(row) for row in rows]
+
+
+# ==========================================================
+# 8️⃣ GET SINGLE REPORT (PUBLIC)
 # ==========================================================
 
 @router.get("/{report_id}", response_model=LabReportResponse)
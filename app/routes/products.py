@@ -1,3 +1,6 @@
+from datetime import date
+from typing import Literal
+
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.schemas.product import (
@@ -6,6 +9,8 @@ from app.schemas.product import (
     ProductResponse,
     ProductWithBatches
 )
+from app.schemas.transport import EmissionSeriesResponse
+from app.services import emission_buckets
 from app.crud.product import (
     create_product,
     get_product_by_id,
@@ -54,6 +59,38 @@ def get_my_products_stats(
     return get_manufacturer_dashboard(db, user.id)
 
 
+@router.get("/my-products/emissions", response_model=EmissionSeriesResponse)
+def get_my_products_emissions(
+    interval: Literal["day", "week", "month"] = "day",
+    start: date | None = None,
+    end: date | None = None,
+    group_by: Literal["product", "transporter", "fuel_type"] | None = None,
+    product_id: int | None = None,
+    fuel_type: str | None = None,
+    max_points: int = Query(emission_buckets.ANALYTICS_MAX_POINTS, ge=1, le=3660),
+    db: Session = Depends(get_db),
+    user=Depends(require_role(UserRole.manufacturer))
+):
+    """
+    Transport emissions of the manufacturer's products per day, week or
+    month (coarsened to fit max_points), from daily buckets.
+    """
+    try:
+        return emission_buckets.series(
+            db,
+            start=start,
+            end=end,
+            interval=interval,
+            group_by=group_by,
+            manufacturer_id=user.id,
+            product_id=product_id,
+            fuel_type=fuel_type,
+            max_points=max_points,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/{product_id}", response_model=ProductWithBatches)
 def get_product(
     product_id: int,
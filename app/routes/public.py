@@ -1,13 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, selectinload
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
 
 from app.database import SessionLocal
-from app.models.batch import Batch
-from app.models.product import Product
-from app.models.lab_report import LabReport
-from app.models.transport import Transport
-from app.models.ai_score import AIScore
-from app.models.material import Material, BatchMaterial
+from app.crud.passport import get_batch_passport
+from app.crud.batch import get_batch_version
+from app.core.http_cache import make_etag, cache_headers, is_not_modified, not_modified
+from app.schemas.passport import BatchPassport
+from app.core.responses import ModelResponse
+from app.core.rate_limit import rate_limit
 
 router = APIRouter()
 
@@ -20,98 +20,27 @@ def get_db():
         db.close()
 
 
-@router.get("/batch/{batch_id}")
-def view_batch(batch_id: int, db: Session = Depends(get_db)):
+@router.get(
+    "/batch/{batch_id}",
+    response_model=BatchPassport,
+    dependencies=[Depends(rate_limit("passport_view"))],
+)
+def view_batch(batch_id: int, request: Request, db: Session = Depends(get_db)):
 
-    batch = (
-        db.query(Batch)
-        .options(
-            selectinload(Batch.product),
-            selectinload(Batch.materials).selectinload(BatchMaterial.material),
-            selectinload(Batch.lab_reports).selectinload(LabReport.lab),
-            selectinload(Batch.ai_scores),
-            selectinload(Batch.transports).selectinload(Transport.transporter)
-        )
-        .filter(Batch.id == batch_id)
-        .first()
-    )
+    version = get_batch_version(db, batch_id)
 
-    if not batch:
+    if not version:
         raise HTTPException(status_code=404, detail="Batch not found")
 
-    ai_score = batch.ai_scores[0] if batch.ai_scores else None
+    etag = make_etag("passport", batch_id, version.version)
+    headers = cache_headers("passport", etag, version.modified_at)
 
-    return {
-        "product": {
-            "id": batch.product.id,
-            "name": batch.product.name,
-            "brand": batch.product.brand,
-            "category": batch.product.category,
-            "description": batch.product.description,
-        },
-        "batch": {
-            "id": batch.id,
-            "manufacturer_name": batch.product.manufacturer.name if batch.product.manufacturer else None,
-            "code": batch.batch_code,
-            "manufacture_date": batch.manufacture_date,
-            "expiry_date": batch.expiry_date,
-            "manufacturing_location": batch.manufacturing_location,
-            "base_carbon_footprint": batch.base_carbon_footprint,
-            "status": batch.status.value if batch.status else None,
-            "validation_status": batch.validation_status.value if batch.validation_status else None,
-            "created_at": batch.created_at,
-        },
-        "materials": [
-            {
-                "material_id": bm.material.id,
-                "name": bm.material.name,
-                "common_name": bm.material.common_name,
-                "risk_level": bm.material.risk_level,
-                "description": bm.material.description,
-                "percentage": bm.percentage,
-                "source_info_provided": bm.source_info_provided,
-                "source": bm.source,
-            }
-            for bm in batch.materials
-        ],
-        "transports": [
-            {
-                "id": t.id,
-                "transporter_name": t.transporter.name if t.transporter else None,
-                "origin": t.origin,
-                "destination": t.destination,
-                "distance_km": t.distance_km,
-                "fuel_type": t.fuel_type,
-                "vehicle_type": t.vehicle_type,
-                "transport_emission": t.transport_emission,
-                "notes": t.notes,
-                "created_at": t.created_at,
-            }
-            for t in batch.transports
-        ],
-        "lab_reports": [
-            {
-                "id": l.id,
-                "lab_name": l.lab.name if l.lab else None,
-                "analysis": l.analysis_data,
-                "certifications": l.certifications,
-                "safety_status": (
-                    l.safety_status.value
-                    if hasattr(l.safety_status, "value")
-                    else l.safety_status
-                ),
-                "notes": l.notes,
-                "lab_score": l.lab_score,
-                "verified": l.verified,
-                "created_at": l.created_at,
-            }
-            for l in batch.lab_reports
-        ],
-        "ai_score": {
-            "rating": ai_score.rating,
-            "reasoning": ai_score.reasoning,
-            "generated_at": ai_score.generated_at,
-        }
-        if ai_score
-        else None,
-    }
\ No newline at end of file
+    if is_not_modified(request, etag, version.modified_at):
+        return not_modified(headers)
+
+    passport = get_batch_passport(db, batch_id)
+
+    if not passport:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    return ModelResponse(passport, headers=headers)
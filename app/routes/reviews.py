@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 from app.routes.auth import get_db
 from app.core.roles import require_role
 from app.models.user import UserRole
-from app.schemas.review import ReviewCreate
+from app.schemas.review import ReviewCreate, ConsumerDashboard
+from app.core.responses import ModelResponse
 from app.crud.review import create_or_update_review, get_consumer_dashboard, get_reviews_by_batch_paginated, get_reviews_by_product_paginated, get_review_summary, delete_review, get_user_reviews_paginated
 from app.core.security import get_current_user_optional
+from app.core.http_cache import make_etag, cache_headers, is_not_modified, not_modified
+from app.crud.batch import get_batch_version
 
 router = APIRouter()
 
@@ -22,6 +25,8 @@ def create_review(
 @router.get("/batch/{batch_id}")
 def list_batch_reviews(
     batch_id: int,
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 10,
     db: Session = Depends(get_db),
@@ -29,6 +34,22 @@ def list_batch_reviews(
 ):
     user_id = user.id if user else None  #  FIX HERE
 
+    # is_mine and first-page ordering depend on the caller
+    version = get_batch_version(db, batch_id)
+    if version:
+        etag = make_etag("reviews", batch_id, version.review_version, user_id or 0, skip, limit)
+        headers = cache_headers(
+            "reviews_private" if user_id else "reviews",
+            etag,
+            version.reviews_modified_at,
+            vary="Authorization",
+        )
+
+        if is_not_modified(request, etag, version.reviews_modified_at):
+            return not_modified(headers)
+
+        response.headers.update(headers)
+
     items, total = get_reviews_by_batch_paginated(
         db,
         batch_id,
@@ -62,8 +83,20 @@ def list_product_reviews(
 @router.get("/batch/{batch_id}/summary")
 def summary(
     batch_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
+    version = get_batch_version(db, batch_id)
+    if version:
+        etag = make_etag("review-summary", batch_id, version.review_version)
+        headers = cache_headers("review_summary", etag, version.reviews_modified_at)
+
+        if is_not_modified(request, etag, version.reviews_modified_at):
+            return not_modified(headers)
+
+        response.headers.update(headers)
+
     return get_review_summary(db, batch_id)
 
 
@@ -76,12 +109,12 @@ def delete(
     return delete_review(db, review_id, user.id)
 
 
-@router.get("/dashboard")
+@router.get("/dashboard", response_model=ConsumerDashboard)
 def consumer_dashboard(
     db: Session = Depends(get_db),
     user = Depends(require_role(UserRole.consumer))
 ):
-    return get_consumer_dashboard(db, user.id)
+    return ModelResponse(ConsumerDashboard(**get_consumer_dashboard(db, user.id)))
 
 
 @router.get("/me")
@@ -1,19 +1,29 @@
+from datetime import date
+from typing import Literal
+
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.routes.auth import get_db
 from app.core.roles import require_role
+from app.core.rate_limit import rate_limit
 from app.models.user import UserRole
 
 from app.schemas.transport import (
     TransportCreate,
     TransportUpdate,
     TransportResponse,
-    TransportListResponse
+    TransportListResponse,
+    PlaceResponse,
+    LegDistanceResponse,
+    EmissionSeriesResponse,
 )
+from app.services import gazetteer
+from app.services.emission_buckets import ANALYTICS_MAX_POINTS
 
 from app.crud.transport import (
     get_transport_stats,
+    get_transport_series,
     get_my_transports,
     get_available_origins,
     get_batch_transports,
@@ -36,6 +46,38 @@ def transport_stats(
     return get_transport_stats(db, user.id)
 
 
+@router.get("/my/stats/series", response_model=EmissionSeriesResponse)
+def transport_stats_series(
+    interval: Literal["day", "week", "month"] = "day",
+    start: date | None = None,
+    end: date | None = None,
+    group_by: Literal["product", "fuel_type"] | None = None,
+    product_id: int | None = None,
+    fuel_type: str | None = None,
+    max_points: int = Query(ANALYTICS_MAX_POINTS, ge=1, le=3660),
+    db: Session = Depends(get_db),
+    user=Depends(require_role(UserRole.transporter))
+):
+    """
+    Transports, distance and emissions of the logged-in transporter per
+    day, week or month (coarsened to fit max_points), from daily buckets.
+    """
+    try:
+        return get_transport_series(
+            db,
+            user.id,
+            start=start,
+            end=end,
+            interval=interval,
+            group_by=group_by,
+            product_id=product_id,
+            fuel_type=fuel_type,
+            max_points=max_points,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/my", response_model=TransportListResponse)
 def list_my_transports(
     skip: int = Query(0, ge=0),
@@ -52,6 +94,45 @@ def list_my_transports(
     return {"total": total, "items": items}
 
 
+@router.get("/places", response_model=list[PlaceResponse])
+def search_places(
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    user=Depends(require_role(UserRole.transporter))
+):
+    """
+    Gazetteer places whose name or alias starts with q, for origin and
+    destination autocomplete.
+    """
+    return gazetteer.get_gazetteer().search(q, limit)
+
+
+@router.get("/distance", response_model=LegDistanceResponse)
+def leg_distance(
+    origin: str = Query(min_length=2, max_length=100),
+    destination: str = Query(min_length=2, max_length=100),
+    vehicle_type: str | None = None,
+    user=Depends(require_role(UserRole.transporter))
+):
+    """
+    Distance a transport from origin to destination would be created with
+    when distance_km is omitted: great-circle km x the vehicle's circuity.
+    """
+    start, end = gazetteer.resolve(origin), gazetteer.resolve(destination)
+    if start is None or end is None:
+        raise HTTPException(status_code=404, detail="Origin or destination not in gazetteer")
+
+    great_circle = gazetteer.great_circle_km(start, end)
+    circuity = gazetteer.circuity(vehicle_type)
+    return {
+        "origin": start,
+        "destination": end,
+        "great_circle_km": round(great_circle, 1),
+        "circuity": circuity,
+        "distance_km": round(great_circle * circuity, 1),
+    }
+
+
 @router.get("/batch/{batch_id}/available-origins")
 def available_origins(
     batch_id: int,
@@ -83,7 +164,11 @@ def list_batch_transports(
     return {"total": total, "items": items}
 
 
-@router.post("/", response_model=TransportResponse)
+@router.post(
+    "/",
+    response_model=TransportResponse,
+    dependencies=[Depends(rate_limit("transport_create"))],
+)
 def create_new_transport(
     data: TransportCreate,
     db: Session = Depends(get_db),
@@ -138,7 +223,10 @@ def update_transport_info(
     if transport.transporter_id != user.id:
         raise HTTPException(status_code=403, detail="Not allowed")
 
-    return update_transport(db, transport_id, data)
+    try:
+        return update_transport(db, transport, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.delete("/{transport_id}")
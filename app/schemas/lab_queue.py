@@ -0,0 +1,64 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from typing import Optional, List
+from app.models.batch import BatchStatus, ValidationStatus
+from app.schemas.batch import ProductMini
+
+
+class QueueBatch(BaseModel):
+    id: int
+    batch_code: str
+    manufacturing_location: Optional[str] = None
+    created_at: datetime
+    product: ProductMini
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PendingLabBatch(BaseModel):
+    id: int
+    product_id: int
+    batch_code: str
+    manufacture_date: Optional[datetime] = None
+    expiry_date: Optional[datetime] = None
+    manufacturing_location: Optional[str] = None
+    base_carbon_footprint: Optional[float] = None
+    status: BatchStatus
+    validation_status: ValidationStatus
+    created_at: datetime
+    product: ProductMini
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PendingLabTestsResponse(BaseModel):
+    items: List[PendingLabBatch]
+    total: int
+    page: int
+    limit: int
+
+
+class LabQueueItemResponse(BaseModel):
+    id: int
+    batch_id: int
+    risk_level: Optional[str] = None
+    priority_at: datetime
+    claimed_at: Optional[datetime] = None
+    lease_expires_at: Optional[datetime] = None
+    attempts: int
+
+    batch: QueueBatch
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class LabClaimResponse(BaseModel):
+    items: List[LabQueueItemResponse]
+    lease_minutes: int
+
+
+class LabQueueStats(BaseModel):
+    open: int
+    available: int
+    claimed: int
+    expired_leases: int
@@ -1,6 +1,8 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
 from typing import Optional, List
+from app.models.lab_report import SafetyStatus
+from app.models.batch import BatchStatus
 
 class BatchMini(BaseModel):
     id: int
@@ -46,4 +48,89 @@ class LabReportResponse(BaseModel):
     batch: BatchMini
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# =========================
+# LEAN LIST / DASHBOARD MODELS
+# =========================
+
+class LabReportBatchMini(BaseModel):
+    id: int
+    batch_code: str
+    product_id: Optional[int] = None
+    manufacturing_location: Optional[str] = None
+    expiry_date: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class LabReportListItem(BaseModel):
+    id: int
+    batch_id: int
+    lab_id: int
+    analysis_data: Optional[List[AnalysisSection]] = None
+    certifications: Optional[str] = None
+    safety_status: Optional[SafetyStatus] = None
+    notes: Optional[str] = None
+    lab_score: float
+    verified: bool
+    created_at: datetime
+
+    batch: Optional[LabReportBatchMini] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class LabReportListResponse(BaseModel):
+    items: List[LabReportListItem]
+    total: int
+    page: int
+    limit: int
+
+
+# =========================
+# ADMIN REVIEW MODELS
+# =========================
+
+class LabReportAdminBatch(LabReportBatchMini):
+    status: BatchStatus
+
+
+class LabReportAdminItem(LabReportListItem):
+    # analysis_data resolves body_hash through app.services.report_bodies
+    batch: Optional[LabReportAdminBatch] = None
+
+
+class LabReportAdminListResponse(BaseModel):
+    total: int
+    items: List[LabReportAdminItem]
+
+
+class LabReportSummary(BaseModel):
+    id: int
+    batch_id: int
+    certifications: Optional[str] = None
+    safety_status: Optional[SafetyStatus] = None
+    lab_score: float
+    verified: bool
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class LabDashboardResponse(BaseModel):
+    total_batches_tested: int
+    unique_products_tested: int
+    verified_reports: int
+    pending_reports: int
+    recent_reports: List[LabReportSummary]
+
+
+class LabParameterSummary(BaseModel):
+    parameter: str
+    unit: Optional[str] = None
+    reports: int
+    min_value: float
+    max_value: float
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,82 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Optional, List
+from app.models.material import RiskLevel
+
+
+# =========================
+# PUBLIC BATCH PASSPORT
+# =========================
+
+class PassportProduct(BaseModel):
+    id: int
+    name: str
+    brand: Optional[str] = None
+    category: Optional[str] = None
+    description: Optional[str] = None
+
+
+class PassportBatch(BaseModel):
+    id: int
+    manufacturer_name: Optional[str] = None
+    code: str
+    manufacture_date: Optional[datetime] = None
+    expiry_date: Optional[datetime] = None
+    manufacturing_location: Optional[str] = None
+    base_carbon_footprint: Optional[float] = None
+    status: Optional[str] = None
+    validation_status: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+class PassportMaterial(BaseModel):
+    material_id: int
+    name: str
+    common_name: Optional[str] = None
+    risk_level: Optional[RiskLevel] = None
+    description: Optional[str] = None
+    percentage: Optional[float] = None
+    source_info_provided: Optional[bool] = None
+    source: Optional[str] = None
+
+
+class PassportTransport(BaseModel):
+    id: int
+    transporter_name: Optional[str] = None
+    origin: str
+    destination: str
+    distance_km: float
+    fuel_type: str
+    vehicle_type: Optional[str] = None
+    transport_emission: float
+    notes: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+class PassportLabReport(BaseModel):
+    id: int
+    lab_name: Optional[str] = None
+    analysis: Optional[Any] = None
+    certifications: Optional[str] = None
+    safety_status: Optional[str] = None
+    notes: Optional[str] = None
+    lab_score: Optional[float] = None
+    verified: Optional[bool] = None
+    created_at: Optional[datetime] = None
+
+
+class PassportAIScore(BaseModel):
+    rating: Optional[float] = None
+    reasoning: Optional[str] = None
+    source: Optional[str] = None
+    confidence: Optional[float] = None
+    generated_at: Optional[datetime] = None
+
+
+class BatchPassport(BaseModel):
+    product: PassportProduct
+    batch: PassportBatch
+    materials: List[PassportMaterial]
+    transports: List[PassportTransport]
+    lab_reports: List[PassportLabReport]
+    ai_score: Optional[PassportAIScore] = None
@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
 
 
 class ReviewCreate(BaseModel):
@@ -7,4 +8,31 @@ class ReviewCreate(BaseModel):
 
 class ReviewSummary(BaseModel):
     total_reviews: int
-    average_rating: float | None = None
\ No newline at end of file
+    average_rating: float | None = None
+
+
+class ReviewBatchMini(BaseModel):
+    id: int
+    batch_code: str
+    product_id: int | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ReviewWithBatch(BaseModel):
+    id: int
+    batch_id: int
+    user_id: int
+    rating: int
+    comment: str | None = None
+    created_at: datetime
+
+    batch: ReviewBatchMini | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ConsumerDashboard(BaseModel):
+    total_reviews: int
+    ratings: dict[str, int]
+    recent_reviews: list[ReviewWithBatch]
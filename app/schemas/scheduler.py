@@ -0,0 +1,31 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from typing import Optional
+
+
+class ScheduledJobResponse(BaseModel):
+    name: str
+    interval_seconds: int
+    jitter_seconds: int
+    enabled: bool
+    next_run_at: datetime
+    locked_by: Optional[str] = None
+    locked_until: Optional[datetime] = None
+    last_started_at: Optional[datetime] = None
+    last_finished_at: Optional[datetime] = None
+    last_status: Optional[str] = None
+    last_error: Optional[str] = None
+    last_result: Optional[str] = None
+    last_duration_ms: Optional[float] = None
+    run_count: int
+    failure_count: int
+    avg_duration_ms: Optional[float] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class JobRunResponse(BaseModel):
+    name: str
+    status: str
+    result: Optional[str] = None
+    error: Optional[str] = None
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field, ConfigDict
-from datetime import datetime
+from datetime import date, datetime
+from typing import Literal
 
 class BatchMini(BaseModel):
     id: int
@@ -11,7 +12,8 @@ class TransportCreate(BaseModel):
     batch_id: int
     origin: str = Field(min_length=2, max_length=100)
     destination: str = Field(min_length=2, max_length=100)
-    distance_km: float = Field(gt=0)
+    # Omit to compute it from the gazetteer (app.services.gazetteer)
+    distance_km: float | None = Field(default=None, gt=0)
     fuel_type: str
     vehicle_type: str | None = None
     notes: str | None = None
@@ -34,6 +36,7 @@ class TransportResponse(BaseModel):
     origin: str
     destination: str
     distance_km: float
+    distance_source: str | None = None
     fuel_type: str
     vehicle_type: str | None
     transport_emission: float
@@ -43,6 +46,53 @@ class TransportResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class PlaceResponse(BaseModel):
+    name: str
+    country: str
+    kind: str
+    lat: float
+    lon: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class LegDistanceResponse(BaseModel):
+    origin: PlaceResponse
+    destination: PlaceResponse
+    great_circle_km: float
+    circuity: float
+    distance_km: float
+
+
+class EmissionPoint(BaseModel):
+    period: date   # first day of the day / week / month
+    transports: int
+    distance_km: float
+    emission: float
+
+
+class EmissionSeries(BaseModel):
+    key: int | str | None = None   # product id, transporter id or fuel type
+    label: str | None = None
+    points: list[EmissionPoint]
+
+
+class EmissionTotals(BaseModel):
+    transports: int
+    distance_km: float
+    emission: float
+    avg_emission_per_km: float
+
+
+class EmissionSeriesResponse(BaseModel):
+    interval: Literal["day", "week", "month"]
+    start: date
+    end: date
+    group_by: str | None = None
+    totals: EmissionTotals
+    series: list[EmissionSeries]
+
+
 class TransportListResponse(BaseModel):
     total: int
     items: list[TransportResponse]
@@ -1,11 +1,6 @@
-import os
 import json
-import google.generativeai as genai
 import random
-
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-
-model = genai.GenerativeModel("gemini-2.5-flash")
+from app.services.llm_client import generate_text, coalesce, canonical_key, LLMUnavailable
 
 
 def generate_ai_rating(product, batch, materials):
@@ -52,16 +47,26 @@ def generate_ai_rating(product, batch, materials):
         "reasoning": "short clear explanation"
         }}
         """
+
+    # Batches with the same product and composition share one in-flight call
+    key = canonical_key(
+        "ai_rating",
+        product,
+        sorted(materials, key=lambda m: json.dumps(m, sort_keys=True, default=str)),
+    )
+
+    return dict(coalesce(key, lambda: _rate(prompt)))
+
+
+def _rate(prompt: str) -> dict:
     try:
-        response = model.generate_content(
+        text = generate_text(
             prompt,
             generation_config={
                 "temperature": 0.2,
                 "response_mime_type": "application/json"
             }
-        )
-
-        text = response.text.strip()
+        ).strip()
 
         # Remove markdown code blocks if Gemini adds them
         if text.startswith("```"):
@@ -76,6 +81,12 @@ def generate_ai_rating(product, batch, materials):
             "reasoning": data.get("reasoning", "")
         }
 
+    except LLMUnavailable as e:
+        return {
+            "rating": None,
+            "reasoning": f"AI analysis unavailable: {str(e)}"
+        }
+
     except json.JSONDecodeError:
         return {
             "rating": None,
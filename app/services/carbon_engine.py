@@ -1,11 +1,6 @@
-import os
 import json
-import google.generativeai as genai
-
-
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-
-model = genai.GenerativeModel("gemini-2.5-flash")
+from app.services.llm_client import generate_text, coalesce, canonical_key
+from app.services.emission_factors import emission_factor
 
 
 def calculate_transport_emission(distance: float, fuel_type: str, vehicle_type: str, notes: str | None) -> float:
@@ -46,15 +41,27 @@ def calculate_transport_emission(distance: float, fuel_type: str, vehicle_type:
     }}
     """
 
+    # Identical legs posted concurrently share one in-flight call
+    key = canonical_key(
+        "transport_emission",
+        float(distance),
+        (fuel_type or "").strip().lower(),
+        (vehicle_type or "").strip().lower(),
+        notes,
+    )
+
+    return coalesce(key, lambda: _estimate(prompt, distance, emission_factor(fuel_type, vehicle_type)))
+
+
+def _estimate(prompt: str, distance: float, fallback_factor: float) -> float:
     try:
-        response = model.generate_content(prompt)
-        text = response.text.strip()
+        text = generate_text(prompt).strip()
 
         data = json.loads(text)
 
         return round(float(data["carbon_emission_kg"]), 2)
 
     except Exception:
-        # fallback estimation if model response fails
-        fallback_factor = 0.25
+        # fallback estimation if model response fails or the LLM is
+        # shed by the governor (timeout, saturation, rate limit, open circuit)
         return round(distance * fallback_factor, 2)
\ No newline at end of file
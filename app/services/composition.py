@@ -0,0 +1,39 @@
+import hashlib
+
+# Percentages are rounded before hashing so float noise does not split
+# otherwise identical compositions
+PERCENT_DECIMALS = 2
+
+
+def composition_vector(items) -> str | None:
+    """
+    Canonical text form of a composition: (material_id, percentage) pairs
+    sorted by material id, e.g. "3:60.00;7:40.00". None when empty.
+    """
+    pairs = sorted(
+        (int(material_id), round(float(percentage or 0), PERCENT_DECIMALS) + 0.0)
+        for material_id, percentage in items
+    )
+
+    if not pairs:
+        return None
+
+    return ";".join(f"{material_id}:{percentage:.{PERCENT_DECIMALS}f}" for material_id, percentage in pairs)
+
+
+def composition_fingerprint(vector: str | None) -> str | None:
+    if vector is None:
+        return None
+    return hashlib.sha256(vector.encode("utf-8")).hexdigest()
+
+
+def parse_vector(vector: str | None) -> list:
+    """Vector back to the [{"material_id", "percentage"}] shape classify_change expects."""
+    if not vector:
+        return []
+
+    materials = []
+    for pair in vector.split(";"):
+        material_id, percentage = pair.split(":")
+        materials.append({"material_id": int(material_id), "percentage": float(percentage)})
+    return materials
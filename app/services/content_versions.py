@@ -0,0 +1,121 @@
+"""
+Per-batch content version counters.
+
+Every flush that changes what a batch's passport or reviews show bumps
+batches.version / batches.review_version (and the matching timestamp), so
+read endpoints can build ETag / Last-Modified from one primary-key lookup
+instead of re-running their queries.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import event, update, select, union, inspect
+
+from app.database import SessionLocal
+
+# Models whose rows appear in a batch passport via their batch_id
+PASSPORT_CHILDREN = ("BatchMaterial", "Transport", "LabReport", "AIScore")
+
+
+def passport_target(obj):
+    """(batch_id, product_id) whose passport depends on this object."""
+    name = type(obj).__name__
+
+    if name == "Batch":
+        return obj.id, None
+    if name in PASSPORT_CHILDREN:
+        return obj.batch_id, None
+    if name == "Product":
+        return None, obj.id
+    return None, None
+
+
+def _renamed_batches(material_ids: set, user_ids: set):
+    """Batches whose passport shows one of these materials or users by name."""
+    from app.models.material import BatchMaterial
+    from app.models.product import Product
+    from app.models.batch import Batch
+    from app.models.transport import Transport
+    from app.models.lab_report import LabReport
+
+    return union(
+        select(BatchMaterial.batch_id).where(BatchMaterial.material_id.in_(material_ids)),
+        select(Batch.id).join(Product, Product.id == Batch.product_id).where(Product.manufacturer_id.in_(user_ids)),
+        select(Transport.batch_id).where(Transport.transporter_id.in_(user_ids)),
+        select(LabReport.batch_id).where(LabReport.lab_id.in_(user_ids)),
+    )
+
+
+def _after_flush(session, flush_context):
+    from app.models.batch import Batch
+
+    batch_ids, product_ids, review_batch_ids = set(), set(), set()
+    material_ids, user_ids = set(), set()
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        name = type(obj).__name__
+
+        if name == "Review":
+            review_batch_ids.add(obj.batch_id)
+            continue
+        if name == "Batch" and obj in session.new:
+            continue  # starts at version 1
+        if name in ("Batch", "Product") and obj in session.dirty and not session.is_modified(obj):
+            continue
+        if name in ("Material", "User"):
+            # Only their names appear in passports
+            if obj in session.dirty and inspect(obj).attrs.name.history.has_changes():
+                (material_ids if name == "Material" else user_ids).add(obj.id)
+            continue
+
+        batch_id, product_id = passport_target(obj)
+        if batch_id is not None:
+            batch_ids.add(batch_id)
+        if product_id is not None:
+            product_ids.add(product_id)
+
+    if not (batch_ids or product_ids or review_batch_ids or material_ids or user_ids):
+        return
+
+    now = datetime.utcnow()
+    batches = Batch.__table__
+    conn = session.connection()
+
+    if batch_ids:
+        bump_batches(conn, batch_ids, now)
+    if product_ids:
+        conn.execute(
+            update(batches)
+            .where(batches.c.product_id.in_(product_ids))
+            .values(version=batches.c.version + 1, updated_at=now)
+        )
+    if material_ids or user_ids:
+        conn.execute(
+            update(batches)
+            .where(batches.c.id.in_(_renamed_batches(material_ids, user_ids)))
+            .values(version=batches.c.version + 1, updated_at=now)
+        )
+    if review_batch_ids:
+        conn.execute(
+            update(batches)
+            .where(batches.c.id.in_(review_batch_ids))
+            .values(review_version=batches.c.review_version + 1, reviews_updated_at=now)
+        )
+
+
+def bump_batches(conn, batch_ids, now=None):
+    """Bump passport versions directly, for bulk writes that bypass the flush."""
+    from app.models.batch import Batch
+
+    batches = Batch.__table__
+    conn.execute(
+        update(batches)
+        .where(batches.c.id.in_(batch_ids))
+        .values(version=batches.c.version + 1, updated_at=now or datetime.utcnow())
+    )
+
+
+def install():
+    """Bump version counters on every SessionLocal flush (idempotent)."""
+    if not event.contains(SessionLocal, "after_flush", _after_flush):
+        event.listen(SessionLocal, "after_flush", _after_flush)
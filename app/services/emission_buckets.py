@@ -0,0 +1,264 @@
+"""
+Daily emission buckets behind the carbon analytics endpoints.
+
+emission_buckets holds one row per (UTC day, product, transporter, fuel
+type) with the transport count, distance and emission of that cell. The
+shared "emission_buckets" outbox subscriber recomputes the (product, day)
+cells a transport event touches, so the table commits in step with its
+cursor; rebuild() recomputes a whole day range from transports (first
+migration, seed script).
+
+series() answers range queries by summing day buckets into day, week or
+month periods, coarsening the interval when the range would exceed
+max_points.
+"""
+
+import os
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Date, select, delete, insert, func, literal
+
+from app.models.batch import Batch
+from app.models.emission_bucket import EmissionBucket
+from app.models.product import Product
+from app.models.transport import Transport
+from app.models.user import User
+from app.services.emission_factors import normalize
+
+ANALYTICS_MAX_POINTS = int(os.getenv("ANALYTICS_MAX_POINTS", "366"))
+ANALYTICS_DEFAULT_DAYS = int(os.getenv("ANALYTICS_DEFAULT_DAYS", "90"))
+
+INTERVALS = ("day", "week", "month")
+
+GROUPS = {
+    "product": EmissionBucket.product_id,
+    "transporter": EmissionBucket.transporter_id,
+    "fuel_type": EmissionBucket.fuel_type,
+}
+
+BUCKET_COLUMNS = ("day", "product_id", "transporter_id", "fuel_type", "transports", "distance_km", "emission", "updated_at")
+
+
+# =====================================================
+# MAINTENANCE
+# =====================================================
+
+def transport_day(column=Transport.created_at):
+    return func.date(column, type_=Date)
+
+
+def fuel_key(column=Transport.fuel_type):
+    """SQL twin of emission_factors.normalize."""
+    return func.replace(func.replace(func.lower(func.trim(column)), " ", "_"), "-", "_")
+
+
+def _aggregate(*conditions):
+    """Bucket rows for the transports matching conditions, in BUCKET_COLUMNS order."""
+    day, fuel = transport_day(), fuel_key()
+    return (
+        select(
+            day,
+            Batch.product_id,
+            Transport.transporter_id,
+            fuel,
+            func.count(Transport.id),
+            func.sum(Transport.distance_km),
+            func.sum(Transport.transport_emission),
+            literal(datetime.utcnow()),
+        )
+        .join(Batch, Batch.id == Transport.batch_id)
+        .where(Batch.product_id.isnot(None), *conditions)
+        .group_by(day, Batch.product_id, Transport.transporter_id, fuel)
+    )
+
+
+def refresh_cells(conn, cells) -> int:
+    """Recompute the buckets of each (product_id, day) in cells."""
+    days_by_product = defaultdict(set)
+    for product_id, day in cells:
+        if product_id is not None and day is not None:
+            days_by_product[product_id].add(day)
+
+    buckets = EmissionBucket.__table__
+    for product_id, days in days_by_product.items():
+        conn.execute(
+            delete(buckets).where(buckets.c.product_id == product_id, buckets.c.day.in_(days))
+        )
+        conn.execute(
+            insert(buckets).from_select(
+                BUCKET_COLUMNS,
+                _aggregate(Batch.product_id == product_id, transport_day().in_(days)),
+            )
+        )
+    return sum(len(days) for days in days_by_product.values())
+
+
+def rebuild(conn, start: date | None = None, end: date | None = None) -> int:
+    """Recompute every bucket from start to end (inclusive; default all)."""
+    buckets = EmissionBucket.__table__
+    dropped, selected = [], []
+
+    if start is not None:
+        dropped.append(buckets.c.day >= start)
+        selected.append(Transport.created_at >= datetime.combine(start, datetime.min.time()))
+    if end is not None:
+        dropped.append(buckets.c.day <= end)
+        selected.append(Transport.created_at < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+
+    conn.execute(delete(buckets).where(*dropped))
+    conn.execute(insert(buckets).from_select(BUCKET_COLUMNS, _aggregate(*selected)))
+    return conn.execute(select(func.count()).select_from(buckets).where(*dropped)).scalar()
+
+
+# =====================================================
+# RANGE QUERIES
+# =====================================================
+
+def period_start(day: date, interval: str) -> date:
+    if interval == "week":
+        return day - timedelta(days=day.weekday())  # ISO weeks start on Monday
+    if interval == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_period(start: date, interval: str) -> date:
+    if interval == "week":
+        return start + timedelta(days=7)
+    if interval == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def periods(start: date, end: date, interval: str) -> list:
+    current, result = period_start(start, interval), []
+    while current <= end:
+        result.append(current)
+        current = next_period(current, interval)
+    return result
+
+
+def effective_interval(start: date, end: date, interval: str, max_points: int) -> str:
+    """interval, or the first coarser one that fits in max_points periods."""
+    for candidate in INTERVALS[INTERVALS.index(interval):]:
+        if len(periods(start, end, candidate)) <= max_points:
+            return candidate
+    return INTERVALS[-1]
+
+
+def _labels(db, group_by: str, keys) -> dict:
+    keys = [k for k in keys if k is not None]
+    if group_by == "product" and keys:
+        return dict(db.execute(select(Product.id, Product.name).where(Product.id.in_(keys))).all())
+    if group_by == "transporter" and keys:
+        return dict(db.execute(select(User.id, User.name).where(User.id.in_(keys))).all())
+    return {k: k for k in keys}
+
+
+def series(
+    db,
+    start: date | None = None,
+    end: date | None = None,
+    interval: str = "day",
+    group_by: str | None = None,
+    manufacturer_id: int | None = None,
+    product_id: int | None = None,
+    transporter_id: int | None = None,
+    fuel_type: str | None = None,
+    max_points: int = ANALYTICS_MAX_POINTS,
+) -> dict:
+    """
+    Transport count, distance and emission per period from start to end
+    (default: the last ANALYTICS_DEFAULT_DAYS days), optionally one series
+    per product, transporter or fuel type. Empty periods are zero-filled.
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"interval must be one of {', '.join(INTERVALS)}")
+    if group_by is not None and group_by not in GROUPS:
+        raise ValueError(f"group_by must be one of {', '.join(GROUPS)}")
+
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=ANALYTICS_DEFAULT_DAYS - 1)
+    if start > end:
+        raise ValueError("start must not be after end")
+
+    interval = effective_interval(start, end, interval, max(1, max_points))
+
+    keys = [EmissionBucket.day] + ([GROUPS[group_by]] if group_by else [])
+    query = (
+        select(
+            *keys,
+            func.sum(EmissionBucket.transports),
+            func.sum(EmissionBucket.distance_km),
+            func.sum(EmissionBucket.emission),
+        )
+        .where(EmissionBucket.day >= start, EmissionBucket.day <= end)
+        .group_by(*keys)
+    )
+
+    if manufacturer_id is not None:
+        query = query.where(EmissionBucket.product_id.in_(
+            select(Product.id).where(Product.manufacturer_id == manufacturer_id)
+        ))
+    if product_id is not None:
+        query = query.where(EmissionBucket.product_id == product_id)
+    if transporter_id is not None:
+        query = query.where(EmissionBucket.transporter_id == transporter_id)
+    if fuel_type:
+        query = query.where(EmissionBucket.fuel_type == normalize(fuel_type))
+
+    # group key -> period -> [transports, distance, emission]
+    folded = defaultdict(lambda: defaultdict(lambda: [0, 0.0, 0.0]))
+    for row in db.execute(query):
+        day, key = row[0], row[1] if group_by else None
+        transports, distance, emission = row[-3:]
+        cell = folded[key][period_start(day, interval)]
+        cell[0] += transports
+        cell[1] += distance or 0.0
+        cell[2] += emission or 0.0
+
+    timeline = periods(start, end, interval)
+    labels = _labels(db, group_by, folded)
+
+    series_list = []
+    total = [0, 0.0, 0.0]
+    for key in sorted(folded, key=lambda k: (k is None, str(labels.get(k, k)))):
+        points = []
+        for period in timeline:
+            transports, distance, emission = folded[key].get(period, (0, 0.0, 0.0))
+            total[0] += transports
+            total[1] += distance
+            total[2] += emission
+            points.append({
+                "period": period,
+                "transports": transports,
+                "distance_km": round(distance, 2),
+                "emission": round(emission, 2),
+            })
+        series_list.append({"key": key, "label": labels.get(key), "points": points})
+
+    if not series_list and group_by is None:
+        # Zero-filled line for an empty range
+        series_list.append({
+            "key": None,
+            "label": None,
+            "points": [
+                {"period": period, "transports": 0, "distance_km": 0.0, "emission": 0.0}
+                for period in timeline
+            ],
+        })
+
+    return {
+        "interval": interval,
+        "start": start,
+        "end": end,
+        "group_by": group_by,
+        "totals": {
+            "transports": total[0],
+            "distance_km": round(total[1], 2),
+            "emission": round(total[2], 2),
+            "avg_emission_per_km": round(total[2] / total[1], 4) if total[1] else 0,
+        },
+        "series": series_list,
+    }
@@ -0,0 +1,83 @@
+"""
+Transport emission factors in kg CO2 per km.
+
+Transports are estimated by the LLM when logged (see carbon_engine); this
+table is the reference used for its fallback and for bulk recalculation
+(scripts/recalculate_emissions.py). Corrections go in EMISSION_FACTORS_FILE,
+a JSON file of the form
+
+    {"fuel": {"diesel": 0.27}, "pairs": {"diesel/truck": 0.9}, "default": 0.25}
+
+whose entries override the built-in values below.
+"""
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+EMISSION_FACTORS_FILE = os.getenv("EMISSION_FACTORS_FILE")
+
+DEFAULT_FACTOR = 0.25
+
+# Typical light road vehicle per fuel
+FUEL_FACTORS = {
+    "diesel": 0.27,
+    "petrol": 0.24,
+    "electric": 0.05,
+    "lpg": 0.21,
+    "natural_gas": 0.19,
+}
+
+# (fuel, vehicle) pairs that differ markedly from the fuel's default
+PAIR_FACTORS = {
+    ("diesel", "truck"): 0.9,
+    ("diesel", "van"): 0.3,
+    ("diesel", "bus"): 1.1,
+    ("diesel", "ship"): 0.6,
+    ("diesel", "rail"): 0.4,
+    ("petrol", "car"): 0.19,
+    ("petrol", "van"): 0.28,
+    ("electric", "truck"): 0.15,
+    ("electric", "rail"): 0.03,
+    ("natural_gas", "truck"): 0.75,
+}
+
+
+def normalize(value) -> str:
+    return (value or "").strip().lower().replace(" ", "_").replace("-", "_")
+
+
+@lru_cache(maxsize=1)
+def load_table() -> dict:
+    """Built-in factors merged with EMISSION_FACTORS_FILE, if set."""
+    table = {
+        "default": DEFAULT_FACTOR,
+        "fuel": dict(FUEL_FACTORS),
+        "pairs": {f"{fuel}/{vehicle}": factor for (fuel, vehicle), factor in PAIR_FACTORS.items()},
+    }
+
+    if EMISSION_FACTORS_FILE:
+        with open(EMISSION_FACTORS_FILE) as f:
+            overrides = json.load(f)
+        table["default"] = float(overrides.get("default", table["default"]))
+        for section in ("fuel", "pairs"):
+            table[section].update({normalize(k).replace("_/_", "/"): float(v) for k, v in overrides.get(section, {}).items()})
+
+    return table
+
+
+def version() -> str:
+    """Short hash of the table; recalculation runs resume only under the same one."""
+    canonical = json.dumps(load_table(), sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def emission_factor(fuel_type, vehicle_type) -> float:
+    table = load_table()
+    fuel, vehicle = normalize(fuel_type), normalize(vehicle_type)
+
+    pair = table["pairs"].get(f"{fuel}/{vehicle}")
+    if pair is not None:
+        return pair
+    return table["fuel"].get(fuel, table["default"])
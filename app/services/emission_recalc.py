@@ -0,0 +1,227 @@
+"""
+Bulk recalculation of Transport.transport_emission from the emission
+factor table (app.services.emission_factors), without the LLM.
+
+Transports are streamed in chunks ordered by (batch_id, id); each chunk is
+computed with NumPy (distance_km x factor per fuel/vehicle pair), written
+back with one executemany UPDATE and committed together with the run's
+checkpoint and diff rows, so a crash loses at most the chunk in progress.
+"""
+
+import os
+import time
+from datetime import datetime
+
+from sqlalchemy import select, update, func
+
+from app.models.emission_recalc import EmissionRecalcRun, EmissionRecalcBatch
+from app.models.transport import Transport
+from app.services import content_versions, emission_factors, outbox
+from app.utils.logger import get_logger
+
+logger = get_logger("emission_recalc")
+
+EMISSION_RECALC_CHUNK = int(os.getenv("EMISSION_RECALC_CHUNK", "5000"))
+
+# Stored emissions are rounded to 2 decimals; smaller differences are noise
+TOLERANCE = 0.005
+
+COLUMNS = (
+    Transport.id,
+    Transport.batch_id,
+    Transport.distance_km,
+    Transport.fuel_type,
+    Transport.vehicle_type,
+    Transport.transport_emission,
+)
+
+
+def compute_emissions(distances, fuel_types, vehicle_types):
+    """Vectorized distance x factor; the factor is looked up once per distinct pair."""
+    # Imported here: this module sits on the request import path (admin routes)
+    import numpy as np
+
+    pairs = np.array(
+        [f"{emission_factors.normalize(f)}/{emission_factors.normalize(v)}" for f, v in zip(fuel_types, vehicle_types)],
+        dtype=object,
+    )
+    unique_pairs, inverse = np.unique(pairs, return_inverse=True)
+    factors = np.array([emission_factors.emission_factor(*pair.split("/", 1)) for pair in unique_pairs])
+
+    return np.round(np.asarray(distances, dtype=float) * factors[inverse], 2)
+
+
+def _next_chunk(db, after_batch_id: int, limit: int) -> list:
+    """Up to limit transports after after_batch_id, extended so the last batch is whole."""
+    rows = db.execute(
+        select(*COLUMNS)
+        .where(Transport.batch_id > after_batch_id)
+        .order_by(Transport.batch_id, Transport.id)
+        .limit(limit)
+    ).all()
+
+    if len(rows) == limit:
+        last = rows[-1]
+        rows += db.execute(
+            select(*COLUMNS)
+            .where(Transport.batch_id == last.batch_id, Transport.id > last.id)
+            .order_by(Transport.id)
+        ).all()
+    return rows
+
+
+def diff_chunk(rows: list):
+    """
+    (new emissions, changed mask, per-batch diff) for one chunk. The diff
+    lists (batch_id, transports_changed, total_before, total_after) for
+    batches with at least one changed transport.
+    """
+    import numpy as np
+
+    _, batch_ids, distances, fuels, vehicles, old = zip(*rows)
+    old = np.asarray(old, dtype=float)
+    new = compute_emissions(distances, fuels, vehicles)
+    changed = np.abs(new - old) >= TOLERANCE
+
+    unique_batches, inverse = np.unique(np.asarray(batch_ids), return_inverse=True)
+    before = np.bincount(inverse, weights=old)
+    after = np.bincount(inverse, weights=new)
+    counts = np.bincount(inverse, weights=changed)
+
+    diff = [
+        (int(batch_id), int(count), round(float(b), 2), round(float(a), 2))
+        for batch_id, count, b, a in zip(unique_batches, counts, before, after)
+        if count
+    ]
+    return new, changed, diff
+
+
+def _write_chunk(db, rows, new, changed, diff, run):
+    changed_rows = [(row.id, row.batch_id, float(value)) for row, value, hit in zip(rows, new, changed) if hit]
+
+    if changed_rows:
+        # ORM bulk UPDATE by primary key: one executemany, no objects loaded
+        db.execute(
+            update(Transport),
+            [{"id": tid, "transport_emission": value} for tid, _, value in changed_rows],
+        )
+        db.add_all(
+            EmissionRecalcBatch(
+                run_id=run.id,
+                batch_id=batch_id,
+                transports_changed=count,
+                total_before=before,
+                total_after=after,
+            )
+            for batch_id, count, before, after in diff
+        )
+        # The flush listeners never see bulk updates
+        content_versions.bump_batches(db.connection(), [d[0] for d in diff])
+        outbox.record(db, "transport", "updated", [(tid, bid) for tid, bid, _ in changed_rows], ["transport_emission"])
+
+
+def start_run(db, resume: bool = True) -> EmissionRecalcRun:
+    """Resume the unfinished run for the current factor table, or start one."""
+    factors_version = emission_factors.version()
+    unfinished = (
+        db.query(EmissionRecalcRun)
+        .filter(EmissionRecalcRun.status.in_(("running", "failed")))
+        .order_by(EmissionRecalcRun.id.desc())
+        .all()
+    )
+
+    current = None
+    for run in unfinished:
+        if resume and run.factors_version == factors_version and current is None:
+            current = run
+        else:
+            # Factors changed since it started (or a fresh run was asked for)
+            run.status = "superseded"
+            run.finished_at = datetime.utcnow()
+
+    if current is None:
+        current = EmissionRecalcRun(
+            factors_version=factors_version,
+            total_transports=db.query(func.count(Transport.id)).scalar(),
+        )
+        db.add(current)
+
+    db.commit()
+    return current
+
+
+def recalculate(db, run=None, resume: bool = True, dry_run: bool = False,
+                chunk_size: int = EMISSION_RECALC_CHUNK, progress=None) -> EmissionRecalcRun:
+    """
+    Recompute every transport's emission, continuing run (default: from
+    start_run). With dry_run nothing is written; the returned run is
+    transient and its diff rows are in run.diff. progress(run) is called
+    after each chunk.
+    """
+    if dry_run:
+        run = EmissionRecalcRun(
+            factors_version=emission_factors.version(),
+            total_transports=db.query(func.count(Transport.id)).scalar(),
+            last_batch_id=0, processed_transports=0, changed_transports=0,
+            changed_batches=0, emission_before=0.0, emission_after=0.0,
+        )
+        run.diff = []
+    elif run is None:
+        run = start_run(db, resume=resume)
+
+    started = time.perf_counter()
+    try:
+        while True:
+            rows = _next_chunk(db, run.last_batch_id, chunk_size)
+            if not rows:
+                break
+
+            new, changed, diff = diff_chunk(rows)
+
+            if dry_run:
+                run.diff.extend(diff)
+            else:
+                _write_chunk(db, rows, new, changed, diff, run)
+
+            run.last_batch_id = rows[-1].batch_id
+            run.processed_transports += len(rows)
+            run.changed_transports += int(changed.sum())
+            run.changed_batches += len(diff)
+            run.emission_before += float(sum(row.transport_emission for row in rows))
+            run.emission_after += float(new.sum())
+
+            if not dry_run:
+                db.commit()
+            if progress:
+                progress(run)
+
+        run.status = "completed"
+        run.finished_at = datetime.utcnow()
+        if not dry_run:
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        if not dry_run:
+            run.status = "failed"
+            run.error = f"{type(e).__name__}: {e}"[:2000]
+            db.commit()
+        raise
+
+    logger.info(
+        f"Emission recalculation {'(dry run) ' if dry_run else ''}processed {run.processed_transports} "
+        f"transports in {time.perf_counter() - started:.1f}s; {run.changed_transports} changed "
+        f"across {run.changed_batches} batches"
+    )
+    return run
+
+
+def top_changes(db, run_id: int, limit: int = 20) -> list:
+    """Batches of a run with the largest absolute change in total emission."""
+    delta = EmissionRecalcBatch.total_after - EmissionRecalcBatch.total_before
+    return (
+        db.query(EmissionRecalcBatch)
+        .filter(EmissionRecalcBatch.run_id == run_id)
+        .order_by(func.abs(delta).desc())
+        .limit(limit)
+        .all()
+    )
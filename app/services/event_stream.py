@@ -0,0 +1,215 @@
+"""
+Server-Sent Events for batch status changes.
+
+Live events come from the outbox: the event_stream subscriber (see
+app.services.subscribers) runs in every worker's dispatcher thread and
+publishes to this process's Broker, so a client connected to any worker
+sees writes made in any other. Each SSE id is the outbox event id; a client
+reconnecting with Last-Event-ID is first replayed what it missed from
+outbox_events, then switched to live delivery.
+"""
+
+import asyncio
+import json
+import os
+import threading
+from collections import defaultdict
+
+from sqlalchemy import select
+
+from app.models.batch import Batch
+from app.models.outbox import OutboxEvent
+from app.models.product import Product
+
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+# Open streams per worker; each is an idle coroutine, not a thread
+SSE_MAX_CONNECTIONS = int(os.getenv("SSE_MAX_CONNECTIONS", "1000"))
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "100"))
+SSE_REPLAY_LIMIT = int(os.getenv("SSE_REPLAY_LIMIT", "500"))
+SSE_RETRY_MS = 3000
+
+STATUS_FIELDS = {"status", "validation_status"}
+LAB_FIELDS = {"verified", "safety_status"}
+
+
+def batch_topic(batch_id: int) -> str:
+    return f"batch:{batch_id}"
+
+
+def manufacturer_topic(manufacturer_id: int) -> str:
+    return f"manufacturer:{manufacturer_id}"
+
+
+# =====================================================
+# EVENTS
+# =====================================================
+
+def event_type(row):
+    """SSE event name for an outbox row, or None if clients don't care."""
+    if row.batch_id is None:
+        return None
+    changed = set(row.fields or ())
+
+    if row.entity == "batch":
+        if row.action == "updated":
+            return "batch_status" if changed & STATUS_FIELDS else None
+        return f"batch_{row.action}"
+    if row.entity == "ai_score" and row.action != "deleted":
+        return "ai_score"
+    if row.entity == "lab_report":
+        if row.action == "created":
+            return "lab_report_submitted"
+        if row.action == "updated" and changed & LAB_FIELDS:
+            return "lab_report_reviewed"
+    if row.entity == "transport" and row.action in ("created", "deleted"):
+        return "transport_added" if row.action == "created" else "transport_removed"
+    return None
+
+
+def to_message(row):
+    name = event_type(row)
+    if name is None:
+        return None
+
+    data = {
+        "batch_id": row.batch_id,
+        "entity": row.entity,
+        "entity_id": row.entity_id,
+        "action": row.action,
+        **(row.state or {}),
+        "at": row.created_at.isoformat(),
+    }
+    return row.id, name, data
+
+
+def format_message(message) -> str:
+    event_id, name, data = message
+    return f"id: {event_id}\nevent: {name}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def replay(db, batch_ids_query, after_id: int):
+    """
+    (messages, resume_id) after Last-Event-ID for the selected batches.
+    resume_id is the last row read when SSE_REPLAY_LIMIT cut the replay
+    short, else None.
+    """
+    events = OutboxEvent.__table__
+    rows = db.execute(
+        select(events)
+        .where(events.c.batch_id.in_(batch_ids_query), events.c.id > after_id)
+        .order_by(events.c.id)
+        .limit(SSE_REPLAY_LIMIT)
+    ).all()
+
+    messages = [m for m in map(to_message, rows) if m is not None]
+    return messages, rows[-1].id if len(rows) == SSE_REPLAY_LIMIT else None
+
+
+def manufacturer_batches(manufacturer_id: int):
+    return (
+        select(Batch.id)
+        .join(Product, Product.id == Batch.product_id)
+        .where(Product.manufacturer_id == manufacturer_id)
+    )
+
+
+# =====================================================
+# PUB/SUB
+# =====================================================
+
+class Subscription:
+    def __init__(self, topics, loop):
+        self.topics = topics
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+        # Set when the client fell too far behind; the stream then ends and
+        # the client's reconnect replays from Last-Event-ID
+        self.overflowed = False
+
+    def offer(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class Broker:
+    """Topic fan-out from the dispatcher thread to streams on the event loop."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.topics = defaultdict(set)
+
+    def subscribe(self, topics: list) -> Subscription:
+        subscription = Subscription(topics, asyncio.get_running_loop())
+        with self.lock:
+            for topic in topics:
+                self.topics[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self.lock:
+            for topic in subscription.topics:
+                self.topics[topic].discard(subscription)
+                if not self.topics[topic]:
+                    del self.topics[topic]
+
+    def has_prefix(self, prefix: str) -> bool:
+        with self.lock:
+            return any(topic.startswith(prefix) for topic in self.topics)
+
+    def connections(self) -> int:
+        with self.lock:
+            return len({s for subs in self.topics.values() for s in subs})
+
+    def publish(self, topic: str, message):
+        with self.lock:
+            subscriptions = list(self.topics.get(topic, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, message)
+            except RuntimeError:
+                pass  # loop closed during shutdown
+
+
+broker = Broker()
+
+
+async def stream(request, topics: list, last_event_id: int, backlog=None):
+    """
+    SSE body: the replay from await backlog(), then live messages for
+    topics, with a comment line every SSE_HEARTBEAT_SECONDS so proxies keep
+    the connection open. The backlog is loaded after subscribing, so a
+    change committed in between is never lost, only skipped if seen twice.
+    """
+    subscription = broker.subscribe(topics)
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+
+        last_id = last_event_id
+        if backlog is not None:
+            messages, resume_id = await backlog()
+            for message in messages:
+                yield format_message(message)
+                last_id = message[0]
+            if resume_id is not None:
+                # Long replay: end here and let the client reconnect from resume_id
+                yield f"id: {resume_id}\n\n"
+                return
+
+        while not subscription.overflowed:
+            try:
+                message = await asyncio.wait_for(subscription.queue.get(), SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": ping\n\n"
+                continue
+
+            # The same change can reach both the backlog and the live queue
+            if message[0] <= last_id:
+                continue
+            last_id = message[0]
+            yield format_message(message)
+    finally:
+        broker.unsubscribe(subscription)
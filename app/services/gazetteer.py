@@ -0,0 +1,199 @@
+"""
+Offline gazetteer of cities and ports for transport legs.
+
+The bundled list (app/data/gazetteer.csv, plus rows from GAZETTEER_FILE in
+the same format) is loaded on first use into NumPy coordinate arrays and a
+dict of normalized names and aliases; NumPy is imported with it, never at
+app startup. Free-text origins such as "Factory A, Mumbai"
+resolve by trying the whole text, then each comma-separated part.
+
+Distances are great-circle (haversine) kilometres, optionally scaled by a
+circuity factor for the vehicle type to approximate the route actually
+travelled. Single lookups are cached per location pair; leg_distances()
+computes many legs in one vectorized pass for imports.
+"""
+
+import csv
+import os
+import re
+import unicodedata
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+
+GAZETTEER_FILE = os.getenv("GAZETTEER_FILE")
+GAZETTEER_CACHE_SIZE = int(os.getenv("GAZETTEER_CACHE_SIZE", "65536"))
+
+BUNDLED_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "gazetteer.csv")
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Route length / great-circle length by vehicle type; unknown types get 1.0
+CIRCUITY = {
+    "truck": 1.3,
+    "van": 1.3,
+    "car": 1.3,
+    "bus": 1.3,
+    "rail": 1.25,
+    "train": 1.25,
+    "ship": 1.15,
+    "vessel": 1.15,
+    "aircraft": 1.05,
+    "plane": 1.05,
+}
+
+NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+@dataclass(frozen=True)
+class Place:
+    index: int
+    name: str
+    country: str
+    kind: str
+    lat: float
+    lon: float
+
+
+def normalize_place(text) -> str:
+    """Accent-, case-, punctuation- and whitespace-insensitive key."""
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode("ascii")
+    return NON_WORD.sub(" ", text.lower()).strip()
+
+
+class Gazetteer:
+    def __init__(self, rows: list):
+        import numpy as np
+
+        self.names = [row["name"] for row in rows]
+        self.countries = [row["country"] for row in rows]
+        self.kinds = [row["kind"] for row in rows]
+        # Radians, ready for haversine
+        self.lat = np.radians(np.array([float(row["lat"]) for row in rows]))
+        self.lon = np.radians(np.array([float(row["lon"]) for row in rows]))
+
+        self.keys = {}
+        for index, row in enumerate(rows):
+            aliases = [a for a in (row.get("aliases") or "").split("|") if a]
+            for key in [row["name"], *aliases]:
+                self.keys.setdefault(normalize_place(key), index)
+            self.keys.setdefault(normalize_place(f"{row['name']} {row['country']}"), index)
+
+    def __len__(self):
+        return len(self.names)
+
+    def place(self, index: int) -> Place:
+        return Place(
+            index=index,
+            name=self.names[index],
+            country=self.countries[index],
+            kind=self.kinds[index],
+            lat=round(math.degrees(self.lat[index]), 4),
+            lon=round(math.degrees(self.lon[index]), 4),
+        )
+
+    def lookup(self, text):
+        """Index of the place text names, or None."""
+        key = normalize_place(text)
+        if key in self.keys:
+            return self.keys[key]
+
+        for part in str(text).split(","):
+            key = normalize_place(part)
+            if key in self.keys:
+                return self.keys[key]
+        return None
+
+    def search(self, prefix: str, limit: int = 10) -> list:
+        key = normalize_place(prefix)
+        if not key:
+            return []
+        matches = sorted({index for name, index in self.keys.items() if name.startswith(key)})
+        return [self.place(index) for index in matches[:limit]]
+
+
+def _read(path: str) -> list:
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer() -> Gazetteer:
+    rows = _read(BUNDLED_FILE)
+    if GAZETTEER_FILE:
+        # Local additions first so they win name clashes
+        rows = _read(GAZETTEER_FILE) + rows
+    return Gazetteer(rows)
+
+
+def resolve(text):
+    """Place for free-text origin/destination, or None if unknown."""
+    gazetteer = get_gazetteer()
+    index = gazetteer.lookup(text)
+    return gazetteer.place(index) if index is not None else None
+
+
+# =====================================================
+# DISTANCES
+# =====================================================
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance for scalars or arrays of coordinates in radians."""
+    import numpy as np
+
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def circuity(vehicle_type) -> float:
+    return CIRCUITY.get(normalize_place(vehicle_type), 1.0)
+
+
+@lru_cache(maxsize=GAZETTEER_CACHE_SIZE)
+def _pair_km(i: int, j: int) -> float:
+    g = get_gazetteer()
+    return float(haversine_km(g.lat[i], g.lon[i], g.lat[j], g.lon[j]))
+
+
+def great_circle_km(origin: Place, destination: Place) -> float:
+    # Symmetric, so one cache entry serves both directions
+    i, j = sorted((origin.index, destination.index))
+    return _pair_km(i, j)
+
+
+def leg_distance(origin: str, destination: str, vehicle_type=None):
+    """
+    Route distance in km (great-circle x circuity for the vehicle type),
+    rounded to 0.1, or None if either end is not in the gazetteer.
+    """
+    start, end = resolve(origin), resolve(destination)
+    if start is None or end is None:
+        return None
+    return round(great_circle_km(start, end) * circuity(vehicle_type), 1)
+
+
+def leg_distances(origins, destinations, vehicle_types=None):
+    """
+    Vectorized leg_distance for many legs; NaN where either end is unknown.
+    Names are resolved once per distinct string.
+    """
+    import numpy as np
+
+    gazetteer = get_gazetteer()
+    names = {name: gazetteer.lookup(name) for name in {*origins, *destinations}}
+
+    start = np.array([-1 if names[o] is None else names[o] for o in origins])
+    end = np.array([-1 if names[d] is None else names[d] for d in destinations])
+    known = (start >= 0) & (end >= 0)
+
+    km = np.full(len(start), np.nan)
+    km[known] = haversine_km(
+        gazetteer.lat[start[known]], gazetteer.lon[start[known]],
+        gazetteer.lat[end[known]], gazetteer.lon[end[known]],
+    )
+
+    if vehicle_types is not None:
+        km *= np.array([circuity(v) for v in vehicle_types])
+    return np.round(km, 1)
@@ -0,0 +1,163 @@
+"""
+Periodic jobs. Each takes a session and returns a short summary that is
+stored as the run's last_result.
+"""
+
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update, delete, exists, func
+from sqlalchemy.orm import selectinload
+
+from app.models.ai_score import AIScore
+from app.models.batch import Batch
+from app.models.lab_queue import LabQueueItem
+from app.models.lab_report import LabReport
+from app.models.material import BatchMaterial
+from app.models.outbox import OutboxEvent, OutboxCursor
+from app.models.scheduled_job import ScheduledJob
+from app.services.scheduler import scheduled
+
+LAB_QUEUE_RETENTION_DAYS = int(os.getenv("LAB_QUEUE_RETENTION_DAYS", "30"))
+AI_REFRESH_LIMIT = int(os.getenv("AI_REFRESH_LIMIT", "20"))
+OUTBOX_RETENTION_HOURS = int(os.getenv("OUTBOX_RETENTION_HOURS", "72"))
+
+
+@scheduled("lab_queue_reconcile", every="10m", jitter="1m")
+def reconcile_lab_queue(db):
+    """
+    Close items whose batch already has a report, drop items whose batch
+    is gone and queue any batch missed.
+    """
+    from app.migrations import _backfill_lab_queue
+    from app.crud.lab_queue import purge_orphans
+
+    closed = db.execute(
+        update(LabQueueItem)
+        .where(
+            LabQueueItem.completed_at.is_(None),
+            exists().where(LabReport.batch_id == LabQueueItem.batch_id),
+        )
+        .values(completed_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    # Before the backfill: an orphan may hold the unique batch_id of a new batch
+    purged = purge_orphans(db.connection())
+
+    before = db.query(func.count(LabQueueItem.id)).scalar()
+    _backfill_lab_queue(db.connection())
+    queued = db.query(func.count(LabQueueItem.id)).scalar() - before
+
+    db.commit()
+    return {"closed": closed, "purged": purged, "queued": queued}
+
+
+@scheduled("lab_queue_archive", every="1d", align=True, jitter="10m")
+def archive_lab_queue(db):
+    """Drop queue items completed more than LAB_QUEUE_RETENTION_DAYS ago."""
+    cutoff = datetime.utcnow() - timedelta(days=LAB_QUEUE_RETENTION_DAYS)
+
+    deleted = db.execute(
+        delete(LabQueueItem)
+        .where(LabQueueItem.completed_at < cutoff)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    db.commit()
+    return {"deleted": deleted}
+
+
+@scheduled("passport_snapshots", every="15m", jitter="2m", timeout="1h")
+def refresh_passport_snapshots(db):
+    """
+    Re-render passports of batches changed since the previous run. Catches
+    writes made outside app workers (scripts, other services), which the
+    in-process renderer never sees.
+    """
+    from app.services import passport_files
+
+    if not passport_files.PASSPORT_PRERENDER:
+        return "skipped: PASSPORT_PRERENDER is off"
+
+    previous = db.get(ScheduledJob, "passport_snapshots").last_finished_at
+    modified_at = func.coalesce(Batch.updated_at, Batch.created_at)
+
+    query = select(Batch.id)
+    if previous is not None:
+        # Margin covers writes committed while the previous run was rendering
+        query = query.where(modified_at >= previous - timedelta(minutes=5))
+
+    batch_ids = list(db.execute(query).scalars())
+    return {"rendered": passport_files.render_batches(db, batch_ids)}
+
+
+@scheduled("stale_ai_scores", every="1h", jitter="5m", timeout="30m")
+def refresh_stale_ai_scores(db):
+    """
+    Retry the LLM for scores that fell back to a low-confidence rule score
+    (model down or over quota at creation time), oldest first.
+    """
+    from app.crud.batch import extract_product_details
+    from app.services.ai_engine import generate_ai_rating
+    from app.services.rule_scorer import RULE_SCORER_MIN_CONFIDENCE
+
+    stale = (
+        db.query(AIScore)
+        .options(
+            selectinload(AIScore.batch).selectinload(Batch.product),
+            selectinload(AIScore.batch).selectinload(Batch.materials).selectinload(BatchMaterial.material),
+        )
+        .filter(
+            AIScore.source == "rules",
+            func.coalesce(AIScore.confidence, 0) < RULE_SCORER_MIN_CONFIDENCE,
+        )
+        .order_by(AIScore.generated_at)
+        .limit(AI_REFRESH_LIMIT)
+        .all()
+    )
+
+    refreshed = 0
+    for score in stale:
+        batch = score.batch
+        materials = [
+            {"name": bm.material.name, "percentage": bm.percentage, "source": bm.source}
+            for bm in batch.materials
+        ]
+
+        rating = generate_ai_rating(extract_product_details(batch.product), batch, materials)
+        if rating["rating"] is None:
+            continue
+
+        score.rating = rating["rating"]
+        score.reasoning = rating["reasoning"]
+        score.source = "llm"
+        score.confidence = None
+        score.generated_at = datetime.utcnow()
+        db.commit()
+        refreshed += 1
+
+    return {"candidates": len(stale), "refreshed": refreshed}
+
+
+@scheduled("outbox_prune", every="1h", jitter="5m")
+def prune_outbox(db):
+    """
+    Drop events older than OUTBOX_RETENTION_HOURS that every shared
+    subscriber has consumed. The newest event is always kept so SQLite
+    never hands out its id again.
+    """
+    events = OutboxEvent.__table__
+    cutoff = datetime.utcnow() - timedelta(hours=OUTBOX_RETENTION_HOURS)
+
+    conditions = [
+        events.c.created_at < cutoff,
+        events.c.id < select(func.max(events.c.id)).scalar_subquery(),
+    ]
+    consumed = db.query(func.min(OutboxCursor.last_event_id)).scalar()
+    if consumed is not None:
+        conditions.append(events.c.id <= consumed)
+
+    deleted = db.execute(delete(events).where(*conditions)).rowcount
+    db.commit()
+    return {"deleted": deleted}
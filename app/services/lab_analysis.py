@@ -0,0 +1,45 @@
+import re
+
+# "Lead: 0.4 ppm", "pH = 6.8", "Cadmium: <0.01 mg/kg"
+MEASUREMENT_LINE = re.compile(
+    r"^\s*(?P<name>[^:=\n]{1,80}?)\s*[:=]\s*[<>≤≥~]?\s*"
+    r"(?P<value>[-+]?\d+(?:[.,]\d+)?(?:[eE][-+]?\d+)?)\s*(?P<unit>[^\s\d][^\n]{0,20})?\s*$"
+)
+
+
+def parameter_key(name: str) -> str:
+    """Case- and whitespace-insensitive lookup key for a parameter name."""
+    return " ".join(name.lower().split())
+
+
+def extract_measurements(analysis_data) -> list:
+    """
+    Numeric "name: value unit" lines of every analysis section, as dicts
+    with section, parameter, parameter_key, value and unit. Free-text lines
+    are skipped.
+    """
+    measurements = []
+
+    for section in analysis_data or []:
+        if not isinstance(section, dict):
+            continue
+
+        title = (section.get("title") or "").strip()
+
+        for line in (section.get("content") or "").splitlines():
+            match = MEASUREMENT_LINE.match(line)
+            if not match:
+                continue
+
+            name = match.group("name").strip()
+            unit = (match.group("unit") or "").strip() or None
+
+            measurements.append({
+                "section": title or None,
+                "parameter": name,
+                "parameter_key": parameter_key(name),
+                "value": float(match.group("value").replace(",", ".")),
+                "unit": unit,
+            })
+
+    return measurements
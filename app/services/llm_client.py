@@ -0,0 +1,372 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from app.utils.logger import get_logger
+
+logger = get_logger("llm_client")
+
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+
+# ---------- Governor settings ----------
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "20"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "1"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "2"))
+LLM_RATE_PER_MINUTE = float(os.getenv("LLM_RATE_PER_MINUTE", "60"))
+LLM_BURST = int(os.getenv("LLM_BURST", "10"))
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+
+_model = None
+_provider = None
+_lock = threading.Lock()
+
+
+def get_model():
+    """
+    Return the shared Gemini model, importing and configuring the SDK
+    on first use instead of at application import time.
+    """
+    global _model
+
+    if _model is not None:
+        return _model
+
+    with _lock:
+        if _model is None:
+            import google.generativeai as genai
+
+            genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+            _model = genai.GenerativeModel(GEMINI_MODEL)
+            logger.info(f"Gemini client initialized ({GEMINI_MODEL})")
+
+    return _model
+
+
+def get_provider():
+    """Return the configured LLM provider (see LLM_PROVIDER), created on first use."""
+    global _provider
+
+    if _provider is not None:
+        return _provider
+
+    with _lock:
+        if _provider is None:
+            from app.services.llm_providers import create_provider
+
+            _provider = create_provider()
+            logger.info(f"LLM provider: {_provider.name}")
+
+    return _provider
+
+
+def set_provider(provider):
+    """Swap the provider at runtime (benchmarks, load tests)."""
+    global _provider
+    _provider = provider
+
+
+class LLMUnavailable(Exception):
+    """Raised when a call is shed or fails; callers use their deterministic fallback."""
+
+
+# =====================================================
+# PRIMITIVES
+# =====================================================
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate if self.rate > 0 else timeout
+
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def available(self) -> float:
+        with self.lock:
+            self._refill(time.monotonic())
+            return self.tokens
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `threshold` consecutive failures; open -> half_open
+    after `cooldown` seconds; one probe call then closes or re-opens it.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.state == "closed":
+                return True
+
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = "half_open"
+                self.probing = False
+
+            if self.state == "half_open" and not self.probing:
+                self.probing = True
+                return True
+
+            return False
+
+    def release(self):
+        """Give back a half-open probe slot that was never used."""
+        with self.lock:
+            self.probing = False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.state = "closed"
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.threshold:
+                if self.state != "open":
+                    logger.warning(f"LLM circuit opened after {self.failures} failures")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self.probing = False
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key: the first caller runs the
+    function, later callers block on its future and share the result (or
+    exception). Keys are forgotten once the call finishes, so nothing is cached.
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key: str, fn):
+        with self.lock:
+            future = self.calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self.calls[key] = future
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                del self.calls[key]
+
+    def in_flight(self) -> int:
+        with self.lock:
+            return len(self.calls)
+
+
+def canonical_key(*parts) -> str:
+    """Stable hash of JSON-serializable inputs (dict key order does not matter)."""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# =====================================================
+# GOVERNED CLIENT
+# =====================================================
+
+class LLMGovernor:
+    """
+    Wraps every provider call with a per-call deadline, a bounded number of
+    in-flight calls, a token-bucket rate limit and a circuit breaker.
+    """
+
+    def __init__(self):
+        self.semaphore = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+        self.bucket = TokenBucket(LLM_RATE_PER_MINUTE / 60.0, LLM_BURST)
+        self.breaker = CircuitBreaker(LLM_BREAKER_THRESHOLD, LLM_BREAKER_COOLDOWN_SECONDS)
+
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.counters = {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "retries": 0,
+            "rejected_circuit_open": 0,
+            "rejected_concurrency": 0,
+            "rejected_rate_limit": 0,
+        }
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def _count(self, name: str, value: int = 1):
+        with self.lock:
+            self.counters[name] += value
+
+    def generate(self, prompt: str, generation_config: dict | None = None) -> str:
+        """
+        Return the model's response text or raise LLMUnavailable.
+        """
+        self._count("calls")
+
+        if not self.breaker.allow():
+            self._count("rejected_circuit_open")
+            raise LLMUnavailable("LLM circuit open")
+
+        if not self.semaphore.acquire(timeout=LLM_QUEUE_TIMEOUT_SECONDS):
+            self.breaker.release()
+            self._count("rejected_concurrency")
+            raise LLMUnavailable("Too many in-flight LLM calls")
+
+        try:
+            with self.lock:
+                self.in_flight += 1
+
+            deadline = time.monotonic() + LLM_TIMEOUT_SECONDS
+            last_error = None
+
+            for attempt in range(LLM_MAX_RETRIES + 1):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                if attempt:
+                    self._count("retries")
+
+                if not self.bucket.acquire(timeout=min(LLM_QUEUE_TIMEOUT_SECONDS, remaining)):
+                    self.breaker.release()
+                    self._count("rejected_rate_limit")
+                    raise LLMUnavailable("LLM rate limit reached")
+
+                try:
+                    return self._call(prompt, generation_config, deadline - time.monotonic())
+                except Exception as e:
+                    last_error = e
+                    self.breaker.record_failure()
+                    if not self.breaker.allow():
+                        break
+
+            raise LLMUnavailable(f"LLM call failed: {last_error}")
+
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+            self.semaphore.release()
+
+    def _call(self, prompt: str, generation_config: dict | None, timeout: float) -> str:
+        started = time.monotonic()
+
+        try:
+            text = get_provider().generate(prompt, generation_config, timeout)
+        except Exception as e:
+            if _is_timeout(e) or time.monotonic() - started >= timeout:
+                self._count("timeouts")
+            self._count("failures")
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            with self.lock:
+                self.latency_total += elapsed
+                self.latency_max = max(self.latency_max, elapsed)
+
+        self._count("successes")
+        self.breaker.record_success()
+        return text
+
+    def metrics(self) -> dict:
+        with self.lock:
+            counters = dict(self.counters)
+            in_flight = self.in_flight
+            completed = counters["successes"] + counters["failures"]
+            latency = {
+                "avg_seconds": round(self.latency_total / completed, 4) if completed else 0,
+                "max_seconds": round(self.latency_max, 4),
+            }
+
+        return {
+            **counters,
+            "in_flight": in_flight,
+            "max_concurrency": LLM_MAX_CONCURRENCY,
+            "rate_limit": {
+                "per_minute": LLM_RATE_PER_MINUTE,
+                "burst": LLM_BURST,
+                "tokens_available": round(self.bucket.available(), 2),
+            },
+            "circuit": {
+                "state": self.breaker.state,
+                "consecutive_failures": self.breaker.failures,
+            },
+            "latency": latency,
+            "timeout_seconds": LLM_TIMEOUT_SECONDS,
+        }
+
+
+def _is_timeout(error: Exception) -> bool:
+    return isinstance(error, TimeoutError) or "DeadlineExceeded" in type(error).__name__
+
+
+governor = LLMGovernor()
+single_flight = SingleFlight()
+
+
+def generate_text(prompt: str, generation_config: dict | None = None) -> str:
+    """Governed LLM call shared by the AI and carbon engines."""
+    return governor.generate(prompt, generation_config)
+
+
+def coalesce(key: str, fn):
+    """Run fn once per key across concurrent callers in this worker."""
+    return single_flight.do(key, fn)
+
+
+def get_llm_metrics() -> dict:
+    return {
+        **governor.metrics(),
+        "coalesced": single_flight.coalesced,
+        "coalescing_in_flight": single_flight.in_flight(),
+    }
@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+
+from app.utils.logger import get_logger
+
+logger = get_logger("llm_providers")
+
+# gemini (default) | fake | record | replay
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini").lower()
+LLM_CASSETTE = os.getenv("LLM_CASSETTE", "llm_cassette.jsonl")
+
+# Fake provider behaviour
+LLM_FAKE_LATENCY_MS = float(os.getenv("LLM_FAKE_LATENCY_MS", "800"))
+LLM_FAKE_JITTER_MS = float(os.getenv("LLM_FAKE_JITTER_MS", "200"))
+LLM_FAKE_ERROR_RATE = float(os.getenv("LLM_FAKE_ERROR_RATE", "0"))
+LLM_FAKE_SEED = os.getenv("LLM_FAKE_SEED")
+
+
+class LLMProvider:
+    """A text-in/text-out model backend used by the LLM governor."""
+
+    name = "base"
+
+    def generate(self, prompt: str, generation_config: dict | None = None, timeout: float | None = None) -> str:
+        raise NotImplementedError
+
+
+def cassette_key(prompt: str, generation_config: dict | None = None) -> str:
+    payload = json.dumps({"prompt": prompt, "config": generation_config or {}}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# =====================================================
+# GEMINI
+# =====================================================
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def generate(self, prompt, generation_config=None, timeout=None):
+        # Imported here so the SDK stays out of the import path
+        from app.services.llm_client import get_model
+
+        kwargs = {}
+        if timeout is not None:
+            kwargs["request_options"] = {"timeout": max(timeout, 0.1)}
+        if generation_config:
+            kwargs["generation_config"] = generation_config
+
+        return get_model().generate_content(prompt, **kwargs).text
+
+
+# =====================================================
+# FAKE (in-process, no network)
+# =====================================================
+
+class FakeProvider(LLMProvider):
+    """
+    Deterministic answers with configurable latency and error injection.
+    Responses depend only on the prompt, so repeated inputs agree.
+    """
+
+    name = "fake"
+
+    FUEL_FACTORS = {"diesel": 0.27, "petrol": 0.24, "electric": 0.05, "lpg": 0.21, "natural_gas": 0.19}
+
+    def __init__(self, latency_ms=LLM_FAKE_LATENCY_MS, jitter_ms=LLM_FAKE_JITTER_MS,
+                 error_rate=LLM_FAKE_ERROR_RATE, seed=LLM_FAKE_SEED):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def generate(self, prompt, generation_config=None, timeout=None):
+        with self.lock:
+            delay = max(0.0, self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            fail = self.rng.random() < self.error_rate
+
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError("Fake LLM deadline exceeded")
+
+        time.sleep(delay)
+
+        if fail:
+            raise RuntimeError("Fake LLM injected error")
+
+        digest = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+
+        if "carbon_emission_kg" in prompt:
+            distance = _match_float(r"Distance:\s*([\d.]+)", prompt, 0.0)
+            fuel = (_match(r"Fuel type:\s*(\S+)", prompt) or "").lower()
+            factor = self.FUEL_FACTORS.get(fuel, 0.25)
+            return json.dumps({
+                "emission_factor": factor,
+                "carbon_emission_kg": round(distance * factor, 2),
+            })
+
+        return json.dumps({
+            "rating": 30 + digest % 65,
+            "reasoning": "Fake provider assessment based on the supplied composition.",
+        })
+
+
+def _match(pattern: str, text: str):
+    found = re.search(pattern, text)
+    return found.group(1) if found else None
+
+
+def _match_float(pattern: str, text: str, default: float) -> float:
+    try:
+        return float(_match(pattern, text))
+    except (TypeError, ValueError):
+        return default
+
+
+# =====================================================
+# RECORD / REPLAY
+# =====================================================
+
+class RecordingProvider(LLMProvider):
+    """Pass calls through to `inner` and append each response to a cassette."""
+
+    name = "record"
+
+    def __init__(self, inner: LLMProvider, path: str = LLM_CASSETTE):
+        self.inner = inner
+        self.path = path
+        self.lock = threading.Lock()
+
+    def generate(self, prompt, generation_config=None, timeout=None):
+        started = time.monotonic()
+        text = self.inner.generate(prompt, generation_config, timeout)
+
+        entry = {
+            "key": cassette_key(prompt, generation_config),
+            "latency_ms": round((time.monotonic() - started) * 1000, 1),
+            "response": text,
+        }
+        with self.lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+        return text
+
+
+class ReplayProvider(LLMProvider):
+    """
+    Serve responses from a cassette. Unknown prompts raise, so callers take
+    their fallback path. With replay_latency the recorded latency is slept.
+    """
+
+    name = "replay"
+
+    def __init__(self, path: str = LLM_CASSETTE, replay_latency: bool = True):
+        self.replay_latency = replay_latency
+        self.entries = {}
+
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.entries[entry["key"]] = entry
+
+        logger.info(f"Loaded {len(self.entries)} LLM cassette entries from {path}")
+
+    def generate(self, prompt, generation_config=None, timeout=None):
+        entry = self.entries.get(cassette_key(prompt, generation_config))
+        if entry is None:
+            raise KeyError("Prompt not found in LLM cassette")
+
+        if self.replay_latency:
+            delay = entry.get("latency_ms", 0) / 1000
+            if timeout is not None and delay > timeout:
+                time.sleep(timeout)
+                raise TimeoutError("Replayed LLM deadline exceeded")
+            time.sleep(delay)
+
+        return entry["response"]
+
+
+# =====================================================
+# FACTORY
+# =====================================================
+
+def create_provider(name: str = LLM_PROVIDER) -> LLMProvider:
+    if name == "fake":
+        return FakeProvider()
+    if name == "record":
+        return RecordingProvider(GeminiProvider())
+    if name == "replay":
+        return ReplayProvider()
+    if name != "gemini":
+        logger.warning(f"Unknown LLM_PROVIDER '{name}', using gemini")
+    return GeminiProvider()
@@ -0,0 +1,543 @@
+"""
+Transactional outbox of domain change events.
+
+Every SessionLocal flush that inserts, changes or deletes a tracked entity
+also inserts one row per object into outbox_events, on the same connection
+and therefore in the same transaction: a rolled-back write leaves no event
+and a committed one always has its event. CRUD code does nothing special.
+
+A dispatcher thread in each process delivers committed events, in id order
+and in batches, to subscribers registered with @subscriber:
+
+- process subscribers (the default) run in every worker, starting from
+  the newest event at boot; use them for in-memory state such as caches.
+- shared subscribers run once across all processes; their position lives
+  in outbox_cursors and is advanced in the handler's own transaction, so
+  derived tables they maintain move in step with the cursor.
+
+Delivery is at-least-once: a position only moves after the handler returns,
+so a handler that raises sees the same events again on the next pass. A
+hole in the ids is never given up while its event may still commit: on
+Postgres delivery waits until the transactions that could own it have
+ended; elsewhere the ids stepped over are kept next to the position and
+rescanned (OUTBOX_GAP_SECONDS, OUTBOX_RESCAN_SECONDS).
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import event, inspect, insert, select, update, func, text
+from sqlalchemy.exc import IntegrityError
+
+from app.core.middleware import actor_var
+from app.database import SessionLocal
+from app.models.outbox import OutboxEvent, OutboxCursor
+from app.utils.logger import get_logger
+
+logger = get_logger("outbox")
+
+OUTBOX_ENABLED = os.getenv("OUTBOX_ENABLED", "true").lower() == "true"
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "1"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+# A hole in the id sequence is an earlier id still in flight in another
+# transaction, or rolled back for good. On Postgres the dispatcher waits
+# until every transaction that could own it has ended; elsewhere it waits
+# OUTBOX_GAP_SECONDS, steps over the hole and keeps rescanning the skipped
+# ids for OUTBOX_RESCAN_SECONDS in case they commit late
+OUTBOX_GAP_SECONDS = float(os.getenv("OUTBOX_GAP_SECONDS", "5"))
+OUTBOX_RESCAN_SECONDS = float(os.getenv("OUTBOX_RESCAN_SECONDS", "3600"))
+
+# Model class -> event entity name
+ENTITIES = {
+    "Batch": "batch",
+    "BatchMaterial": "batch_material",
+    "Material": "material",
+    "Transport": "transport",
+    "LabReport": "lab_report",
+    "Review": "review",
+    "AIScore": "ai_score",
+    "User": "user",
+    "Product": "product",
+}
+
+# Column values copied into event.state (everything else is names only)
+STATE_FIELDS = {
+    "Batch": ("status", "validation_status"),
+    "LabReport": ("verified", "safety_status"),
+    "AIScore": ("rating", "source"),
+    "Review": ("rating",),
+    "Product": ("manufacturer_id",),
+    "User": ("role",),
+    # Day of the emission bucket a deleted transport leaves
+    "Transport": ("created_at",),
+}
+
+# Bookkeeping columns written by other listeners, never worth an event
+IGNORED_FIELDS = {"version", "updated_at", "review_version", "reviews_updated_at"}
+
+
+# =====================================================
+# CAPTURE
+# =====================================================
+
+def _routing(obj, name: str):
+    """(batch_id, product_id) an event about obj is filed under."""
+    if name == "Batch":
+        return obj.id, obj.product_id
+    if name == "Product":
+        return None, obj.id
+    return getattr(obj, "batch_id", None), None
+
+
+def _state_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value.value if hasattr(value, "value") else value
+
+
+def _changed_fields(obj) -> list:
+    state = inspect(obj)
+    return sorted(
+        attr.key for attr in state.mapper.column_attrs
+        if attr.key not in IGNORED_FIELDS and state.attrs[attr.key].history.has_changes()
+    )
+
+
+def _event_row(obj, action: str, now: datetime, actor_id):
+    name = type(obj).__name__
+    fields = None
+
+    if action == "updated":
+        fields = _changed_fields(obj)
+        if not fields:
+            return None
+
+    batch_id, product_id = _routing(obj, name)
+    state = {key: _state_value(getattr(obj, key)) for key in STATE_FIELDS.get(name, ())}
+
+    return {
+        "entity": ENTITIES[name],
+        "entity_id": getattr(obj, "id", None),
+        "action": action,
+        "batch_id": batch_id,
+        "product_id": product_id,
+        "actor_id": actor_id,
+        "fields": fields,
+        "state": state or None,
+        "created_at": now,
+    }
+
+
+def _after_flush(session, flush_context):
+    now = datetime.utcnow()
+    actor_id = actor_var.get()
+    rows = []
+
+    for objects, action in (
+        (session.new, "created"),
+        (session.dirty, "updated"),
+        (session.deleted, "deleted"),
+    ):
+        for obj in objects:
+            if type(obj).__name__ not in ENTITIES:
+                continue
+            row = _event_row(obj, action, now, actor_id)
+            if row is not None:
+                rows.append(row)
+
+    if rows:
+        session.connection().execute(insert(OutboxEvent.__table__), rows)
+        session.info["outbox_pending"] = True
+
+
+def record(session, entity: str, action: str, rows: list, fields=None):
+    """
+    Events for bulk or Core writes that bypass the flush. rows are
+    (entity_id, batch_id) pairs; call inside the writing transaction.
+    """
+    if not rows or not OUTBOX_ENABLED:
+        return
+    now = datetime.utcnow()
+    actor_id = actor_var.get()
+
+    session.connection().execute(insert(OutboxEvent.__table__), [
+        {
+            "entity": entity,
+            "entity_id": entity_id,
+            "action": action,
+            "batch_id": batch_id,
+            "product_id": None,
+            "actor_id": actor_id,
+            "fields": fields,
+            "state": None,
+            "created_at": now,
+        }
+        for entity_id, batch_id in rows
+    ])
+    session.info["outbox_pending"] = True
+
+
+def _after_commit(session):
+    if session.info.pop("outbox_pending", False):
+        dispatcher.wake()
+
+
+def _after_rollback(session):
+    session.info.pop("outbox_pending", None)
+
+
+def install():
+    """Record outbox events on every SessionLocal flush (idempotent)."""
+    for name, listener in (
+        ("after_flush", _after_flush),
+        ("after_commit", _after_commit),
+        ("after_rollback", _after_rollback),
+    ):
+        if not event.contains(SessionLocal, name, listener):
+            event.listen(SessionLocal, name, listener)
+
+
+# =====================================================
+# SUBSCRIBERS
+# =====================================================
+
+@dataclass
+class Subscriber:
+    name: str
+    handler: Callable
+    entities: Optional[frozenset] = None
+    shared: bool = False
+    delivered: int = 0
+    failures: int = 0
+    last_error: Optional[str] = None
+
+    def wants(self, row) -> bool:
+        return self.entities is None or row.entity in self.entities
+
+
+SUBSCRIBERS: dict[str, Subscriber] = {}
+
+
+def subscriber(name: str, entities=None, shared: bool = False):
+    """Register handler(db, events) for committed events of these entities."""
+    def decorator(fn):
+        SUBSCRIBERS[name] = Subscriber(
+            name=name,
+            handler=fn,
+            entities=frozenset(entities) if entities else None,
+            shared=shared,
+        )
+        return fn
+    return decorator
+
+
+def load_subscribers():
+    import app.services.subscribers  # noqa: F401  (registers via @subscriber)
+    return SUBSCRIBERS
+
+
+# =====================================================
+# DISPATCH
+# =====================================================
+
+def _fetch(db, after_id: int, limit: int) -> list:
+    events = OutboxEvent.__table__
+    return db.execute(
+        select(events).where(events.c.id > after_id).order_by(events.c.id).limit(limit)
+    ).all()
+
+
+def _fetch_ids(db, ids) -> list:
+    if not ids:
+        return []
+    events = OutboxEvent.__table__
+    return db.execute(select(events).where(events.c.id.in_(ids)).order_by(events.c.id)).all()
+
+
+def latest_event_id(db) -> int:
+    return db.execute(select(func.max(OutboxEvent.__table__.c.id))).scalar() or 0
+
+
+def _snapshot_bound(db, bound: str):
+    """xmin or xmax of a fresh Postgres snapshot; None on other databases."""
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    return int(db.execute(text(f"SELECT pg_snapshot_{bound}(pg_current_snapshot())::text")).scalar())
+
+
+def _load_skipped(value) -> dict:
+    return {int(event_id): skipped_at for event_id, skipped_at in json.loads(value)} if value else {}
+
+
+def _dump_skipped(skipped: dict):
+    return json.dumps(sorted(skipped.items())) if skipped else None
+
+
+@dataclass
+class Gap:
+    seen: float
+    # Postgres: xmax of a snapshot taken after the hole was seen. Whatever
+    # transaction owns the missing id already had an xid below it, because
+    # outbox rows are written after the changes they describe
+    xmax: Optional[int] = None
+    warned: bool = False
+
+
+class Dispatcher:
+    def __init__(self, poll_seconds: float, batch_size: int):
+        self.poll_seconds = poll_seconds
+        self.batch_size = batch_size
+        # Process subscriber name -> last delivered event id
+        self.positions = {}
+        # First missing id -> Gap
+        self.gaps = {}
+        # Process subscriber name -> {skipped event id: unix time}
+        self.skipped = {}
+        self.stopped = threading.Event()
+        self.woken = threading.Event()
+        self.thread = None
+
+    def wake(self):
+        self.woken.set()
+
+    def _settled(self, db, missing: int, horizon) -> bool:
+        """Whether delivery may step over the hole starting at missing."""
+        gap = self.gaps.get(missing)
+        if gap is None:
+            gap = self.gaps[missing] = Gap(time.monotonic(), _snapshot_bound(db, "xmax"))
+
+        if gap.xmax is not None:
+            # Every transaction that could own the id ended before this
+            # pass's fetch, so an id still missing is proven absent
+            if horizon is not None and horizon >= gap.xmax:
+                return True
+            if not gap.warned and time.monotonic() - gap.seen >= OUTBOX_GAP_SECONDS:
+                gap.warned = True
+                logger.warning(f"Outbox event {missing} held back by a transaction open for over {OUTBOX_GAP_SECONDS}s")
+            return False
+
+        return time.monotonic() - gap.seen >= OUTBOX_GAP_SECONDS
+
+    def _contiguous(self, db, rows: list, after_id: int, horizon) -> tuple:
+        """
+        Leading run of rows with no unsettled hole before it, and the ids it
+        steps over without proof that they are absent (see _settled).
+        horizon is the Postgres snapshot xmin read before rows were fetched.
+        """
+        expected = after_id + 1
+        skipped = []
+        for index, row in enumerate(rows):
+            if row.id != expected:
+                if not self._settled(db, expected, horizon):
+                    return rows[:index], skipped
+                if horizon is None:
+                    skipped.extend(range(expected, row.id))
+                    logger.warning(
+                        f"Outbox events {expected}-{row.id - 1} missing for {OUTBOX_GAP_SECONDS}s; "
+                        f"rescanning them for {OUTBOX_RESCAN_SECONDS}s"
+                    )
+            expected = row.id + 1
+        return rows, skipped
+
+    def _rescan(self, db, skipped: dict) -> tuple:
+        """Late rows among skipped ids, and the ids still worth rescanning."""
+        cutoff = time.time() - OUTBOX_RESCAN_SECONDS
+        late = _fetch_ids(db, list(skipped))
+        found = {row.id for row in late}
+        remaining = {
+            event_id: skipped_at for event_id, skipped_at in skipped.items()
+            if event_id not in found and skipped_at >= cutoff
+        }
+        if late:
+            logger.info(f"Outbox delivering {len(late)} late event(s) from skipped ids")
+        return late, remaining
+
+    def _handle(self, db, sub: Subscriber, rows: list) -> bool:
+        events = [row for row in rows if sub.wants(row)]
+        try:
+            if events:
+                sub.handler(db, events)
+        except Exception as e:
+            db.rollback()
+            sub.failures += 1
+            sub.last_error = f"{type(e).__name__}: {e}"[:500]
+            logger.exception(f"Outbox subscriber {sub.name} failed at event {rows[0].id}")
+            return False
+        sub.delivered += len(events)
+        return True
+
+    def _deliver_process(self, db, subs: list) -> int:
+        after_id = min(self.positions[sub.name] for sub in subs)
+        horizon = _snapshot_bound(db, "xmin")
+        rows, skipped = self._contiguous(db, _fetch(db, after_id, self.batch_size), after_id, horizon)
+        now = time.time()
+
+        for sub in subs:
+            late, remaining = self._rescan(db, self.skipped.get(sub.name, {}))
+            pending = [row for row in rows if row.id > self.positions[sub.name]]
+            if (late or pending) and not self._handle(db, sub, late + pending):
+                continue
+            db.commit()
+            if pending:
+                position = self.positions[sub.name]
+                remaining.update((event_id, now) for event_id in skipped if event_id > position)
+                self.positions[sub.name] = pending[-1].id
+            self.skipped[sub.name] = remaining
+        return len(rows)
+
+    def _deliver_shared(self, db, sub: Subscriber) -> int:
+        cursors = OutboxCursor.__table__
+        cursor = db.execute(
+            select(cursors.c.last_event_id, cursors.c.skipped_ids).where(cursors.c.subscriber == sub.name)
+        ).first()
+        if cursor is None:
+            return 0
+        after_id = cursor.last_event_id
+
+        horizon = _snapshot_bound(db, "xmin")
+        rows, skipped = self._contiguous(db, _fetch(db, after_id, self.batch_size), after_id, horizon)
+        late, remaining = self._rescan(db, _load_skipped(cursor.skipped_ids))
+        remaining.update((event_id, time.time()) for event_id in skipped)
+
+        changed = bool(rows) or _dump_skipped(remaining) != cursor.skipped_ids
+        if not changed or not self._handle(db, sub, late + rows):
+            db.rollback()
+            return 0
+
+        # Compare-and-set: if another process delivered this range first,
+        # undo the handler's writes along with the cursor move
+        unchanged = (
+            cursors.c.skipped_ids.is_(None) if cursor.skipped_ids is None
+            else cursors.c.skipped_ids == cursor.skipped_ids
+        )
+        moved = db.execute(
+            update(cursors)
+            .where(cursors.c.subscriber == sub.name, cursors.c.last_event_id == after_id, unchanged)
+            .values(
+                last_event_id=rows[-1].id if rows else after_id,
+                skipped_ids=_dump_skipped(remaining),
+                delivered_count=cursors.c.delivered_count + len(late) + len(rows),
+                updated_at=datetime.utcnow(),
+            )
+        ).rowcount
+        if moved != 1:
+            db.rollback()
+            return 0
+
+        db.commit()
+        return len(rows)
+
+    def dispatch_once(self) -> int:
+        """Deliver up to one batch to every subscriber; returns events read."""
+        local = [sub for sub in SUBSCRIBERS.values() if not sub.shared]
+        shared = [sub for sub in SUBSCRIBERS.values() if sub.shared]
+        read = 0
+
+        db = SessionLocal()
+        try:
+            if local:
+                read += self._deliver_process(db, local)
+            for sub in shared:
+                read += self._deliver_shared(db, sub)
+        finally:
+            db.close()
+
+        if self.gaps:
+            # Holes that filled in (the transaction committed) are never popped
+            now = time.monotonic()
+            self.gaps = {key: gap for key, gap in self.gaps.items() if now - gap.seen < OUTBOX_GAP_SECONDS * 10}
+        return read
+
+    def prepare(self):
+        """Start process subscribers at the newest event; create shared cursors."""
+        load_subscribers()
+        db = SessionLocal()
+        try:
+            latest = latest_event_id(db)
+            for sub in SUBSCRIBERS.values():
+                if not sub.shared:
+                    self.positions.setdefault(sub.name, latest)
+
+            existing = set(db.execute(select(OutboxCursor.subscriber)).scalars())
+            for sub in SUBSCRIBERS.values():
+                if sub.shared and sub.name not in existing:
+                    db.add(OutboxCursor(subscriber=sub.name, last_event_id=latest))
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another worker created the same cursors at the same moment
+                db.rollback()
+        finally:
+            db.close()
+
+    def run_forever(self):
+        self.prepare()
+        logger.info(f"Outbox dispatcher running {sorted(SUBSCRIBERS)}")
+
+        while not self.stopped.is_set():
+            try:
+                # Keep going while full batches come back; then wait
+                if self.dispatch_once() >= self.batch_size:
+                    continue
+            except Exception:
+                logger.exception("Outbox dispatch pass failed")
+            self.woken.wait(self.poll_seconds)
+            self.woken.clear()
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run_forever, name="outbox", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.woken.set()
+        if self.thread is not None:
+            self.thread.join(timeout=30)
+            self.thread = None
+
+
+dispatcher = Dispatcher(OUTBOX_POLL_SECONDS, OUTBOX_BATCH_SIZE)
+
+
+def outbox_stats(db) -> dict:
+    """Per-subscriber position, lag and failures, for the admin endpoint."""
+    load_subscribers()
+    latest = latest_event_id(db)
+    cursors = {row.subscriber: row for row in db.query(OutboxCursor).all()}
+    subscribers = []
+
+    for sub in SUBSCRIBERS.values():
+        if sub.shared:
+            cursor = cursors.get(sub.name)
+            position = cursor.last_event_id if cursor else None
+            skipped = _load_skipped(cursor.skipped_ids) if cursor else {}
+        else:
+            position = dispatcher.positions.get(sub.name)
+            skipped = dispatcher.skipped.get(sub.name, {})
+
+        subscribers.append({
+            "name": sub.name,
+            "scope": "shared" if sub.shared else "process",
+            "entities": sorted(sub.entities) if sub.entities else None,
+            "position": position,
+            "lag": latest - position if position is not None else None,
+            "skipped": sorted(skipped),
+            "delivered": sub.delivered,
+            "failures": sub.failures,
+            "last_error": sub.last_error,
+        })
+
+    return {
+        "latest_event_id": latest,
+        "events": db.query(func.count(OutboxEvent.id)).scalar(),
+        "dispatcher_running": dispatcher.thread is not None,
+        "subscribers": subscribers,
+    }
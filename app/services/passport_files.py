@@ -0,0 +1,208 @@
+import gzip
+import os
+import tempfile
+import threading
+
+from sqlalchemy import event, select
+
+from app.database import SessionLocal
+from app.services.content_versions import passport_target
+from app.utils.logger import get_logger
+
+try:
+    import brotli
+except ImportError:  # optional; gzip files are still written
+    brotli = None
+
+logger = get_logger("passport_files")
+
+# Write /passports/{batch_id}.json(.gz|.br) whenever passport data changes
+PASSPORT_PRERENDER = os.getenv("PASSPORT_PRERENDER", "false").lower() == "true"
+PASSPORT_STATIC_DIR = os.getenv("PASSPORT_STATIC_DIR", "static/passports")
+
+RENDER_CHUNK = 200
+
+
+# =====================================================
+# FILES
+# =====================================================
+
+def passport_path(batch_id: int, suffix: str = "") -> str:
+    return os.path.join(PASSPORT_STATIC_DIR, f"{batch_id}.json{suffix}")
+
+
+def _atomic_write(path: str, data: bytes):
+    """Write to a temp file in the same directory, then rename over the target."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600; the proxy serving these runs as another user
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def write_passport(batch_id: int, payload: bytes):
+    # Plain file last: once it is replaced, every variant is already current
+    _atomic_write(passport_path(batch_id, ".gz"), gzip.compress(payload, compresslevel=9, mtime=0))
+    if brotli is not None:
+        _atomic_write(passport_path(batch_id, ".br"), brotli.compress(payload, quality=11))
+    _atomic_write(passport_path(batch_id), payload)
+
+
+def remove_passport(batch_id: int):
+    for suffix in ("", ".gz", ".br"):
+        try:
+            os.unlink(passport_path(batch_id, suffix))
+        except FileNotFoundError:
+            pass
+
+
+def render_batches(db, batch_ids) -> int:
+    """Render (or remove, if deleted) the given batches. Returns files written."""
+    from app.crud.passport import get_batch_passports
+
+    os.makedirs(PASSPORT_STATIC_DIR, exist_ok=True)
+    batch_ids = sorted(set(batch_ids))
+    written = 0
+
+    for start in range(0, len(batch_ids), RENDER_CHUNK):
+        chunk = batch_ids[start:start + RENDER_CHUNK]
+        passports = get_batch_passports(db, chunk)
+
+        for batch_id in chunk:
+            passport = passports.get(batch_id)
+            if passport is None:
+                remove_passport(batch_id)
+            else:
+                write_passport(batch_id, passport.model_dump_json().encode("utf-8"))
+                written += 1
+
+        # Release loaded objects between chunks
+        db.expunge_all()
+
+    return written
+
+
+# =====================================================
+# CHANGE TRACKING
+# =====================================================
+
+class PassportRenderer:
+    """
+    Collects batch/product ids touched by committed transactions and
+    re-renders their passports on a background thread, so writes never
+    wait on file I/O.
+    """
+
+    def __init__(self):
+        self.batch_ids = set()
+        self.product_ids = set()
+        self.condition = threading.Condition()
+        self.thread = None
+        self.running = False
+
+    def schedule(self, batch_ids=(), product_ids=()):
+        with self.condition:
+            self.batch_ids.update(batch_ids)
+            self.product_ids.update(product_ids)
+            self.condition.notify()
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="passport-renderer", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join(timeout=10)
+            self.thread = None
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.running and not (self.batch_ids or self.product_ids):
+                    self.condition.wait()
+                if not (self.batch_ids or self.product_ids):
+                    return
+                batch_ids, self.batch_ids = self.batch_ids, set()
+                product_ids, self.product_ids = self.product_ids, set()
+
+            try:
+                self._render(batch_ids, product_ids)
+            except Exception:
+                logger.exception("Passport pre-render failed")
+
+    def _render(self, batch_ids: set, product_ids: set):
+        from app.models.batch import Batch
+
+        db = SessionLocal()
+        try:
+            if product_ids:
+                batch_ids |= set(db.execute(
+                    select(Batch.id).where(Batch.product_id.in_(product_ids))
+                ).scalars())
+            written = render_batches(db, batch_ids)
+            logger.debug(f"Pre-rendered {written} passports")
+        finally:
+            db.close()
+
+
+renderer = PassportRenderer()
+
+_PENDING_KEY = "passport_batches"
+_PENDING_PRODUCTS_KEY = "passport_products"
+
+
+def _after_flush(session, flush_context):
+    batches = session.info.setdefault(_PENDING_KEY, set())
+    products = session.info.setdefault(_PENDING_PRODUCTS_KEY, set())
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        batch_id, product_id = passport_target(obj)
+        if batch_id is not None:
+            batches.add(batch_id)
+        if product_id is not None:
+            products.add(product_id)
+
+
+def _after_commit(session):
+    batches = session.info.pop(_PENDING_KEY, None)
+    products = session.info.pop(_PENDING_PRODUCTS_KEY, None)
+    if batches or products:
+        renderer.schedule(batches or (), products or ())
+
+
+def _after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_PENDING_PRODUCTS_KEY, None)
+
+
+def start_prerender():
+    """Track passport changes on SessionLocal sessions and start the renderer."""
+    os.makedirs(PASSPORT_STATIC_DIR, exist_ok=True)
+
+    if not event.contains(SessionLocal, "after_flush", _after_flush):
+        event.listen(SessionLocal, "after_flush", _after_flush)
+        event.listen(SessionLocal, "after_commit", _after_commit)
+        event.listen(SessionLocal, "after_rollback", _after_rollback)
+
+    renderer.start()
+
+    if brotli is None:
+        logger.warning("brotli not installed; pre-rendering gzip passports only")
+    logger.info(f"Passport pre-rendering enabled ({PASSPORT_STATIC_DIR})")
+
+
+def stop_prerender():
+    renderer.stop()
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models.lab_report import LabReportBody, LabMeasurement
+from app.services.lab_analysis import extract_measurements
+from app.utils.logger import get_logger
+
+logger = get_logger("report_bodies")
+
+# Bodies are immutable (keyed by content hash), so cached entries never go stale
+REPORT_BODY_CACHE_SIZE = int(os.getenv("REPORT_BODY_CACHE_SIZE", "4096"))
+
+
+class BodyCache:
+    """Thread-safe LRU of body hash -> analysis_data."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, self.entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: str, value):
+        if self.size <= 0:
+            return
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "size": len(self.entries),
+                "capacity": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+cache = BodyCache(REPORT_BODY_CACHE_SIZE)
+
+
+def body_hash(analysis_data) -> str:
+    payload = json.dumps(analysis_data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def insert_bodies_stmt(bind):
+    """INSERT ... ON CONFLICT DO NOTHING for the bind's dialect."""
+    dialect = postgresql if bind.dialect.name == "postgresql" else sqlite
+    return dialect.insert(LabReportBody.__table__).on_conflict_do_nothing(index_elements=["hash"])
+
+
+def store_body(db, analysis_data) -> str | None:
+    """
+    Store analysis_data once and return its hash. Existing bodies are left
+    untouched, so concurrent writers of the same content do not conflict.
+    """
+    if analysis_data is None:
+        return None
+
+    key = body_hash(analysis_data)
+    measurements = extract_measurements(analysis_data)
+
+    # Always insert-or-ignore: a cached hash may belong to a rolled-back write
+    inserted = db.execute(
+        insert_bodies_stmt(db.get_bind()),
+        {"hash": key, "analysis_data": analysis_data, "parameter_count": len(measurements)},
+    ).rowcount
+
+    # Measurements are written once, by whoever inserted the body
+    if inserted and measurements:
+        db.execute(
+            LabMeasurement.__table__.insert(),
+            [{"body_hash": key, **m} for m in measurements],
+        )
+
+    cache.put(key, analysis_data)
+
+    return key
+
+
+def load_bodies(db, hashes) -> dict:
+    """Resolve many hashes with at most one query for the cache misses."""
+    result = {}
+    missing = []
+
+    for key in set(h for h in hashes if h):
+        found, value = cache.get(key)
+        if found:
+            result[key] = value
+        else:
+            missing.append(key)
+
+    if missing and db is not None:
+        rows = db.execute(
+            select(LabReportBody.hash, LabReportBody.analysis_data)
+            .where(LabReportBody.hash.in_(missing))
+        )
+        for key, value in rows:
+            cache.put(key, value)
+            result[key] = value
+
+    return result
+
+
+def get_body(db, key: str):
+    return load_bodies(db, [key]).get(key)
+
+
+def prefetch_bodies(db, reports):
+    """Warm the cache for a page of reports before they are serialized."""
+    load_bodies(db, [r.body_hash for r in reports])
+    return reports
@@ -0,0 +1,99 @@
+import os
+
+# Scores at or above this confidence are stored without calling the LLM.
+# Set above 1 to always escalate.
+RULE_SCORER_MIN_CONFIDENCE = float(os.getenv("RULE_SCORER_MIN_CONFIDENCE", "0.7"))
+
+# Escalate compositions no earlier batch (of any product) has had, however
+# confident the rules are: the LLM has not assessed that mix before
+RULE_SCORER_ESCALATE_NOVEL = os.getenv("RULE_SCORER_ESCALATE_NOVEL", "true").lower() == "true"
+
+# Risk contribution per unit of composition share
+RISK_WEIGHTS = {
+    "low": 0.1,
+    "moderate": 0.45,
+    "high": 0.9,
+}
+UNKNOWN_RISK_WEIGHT = 0.5
+
+# Bonus points for fully traceable compositions
+TRACEABILITY_BONUS = 10
+
+
+def _risk_key(risk_level) -> str | None:
+    return getattr(risk_level, "value", risk_level)
+
+
+def score_composition(materials: list) -> dict:
+    """
+    Deterministic sustainability score from material risk levels.
+
+    `materials` is a list of dicts with name, percentage, risk_level
+    (RiskLevel, str or None) and source. Returns rating (0-100), reasoning,
+    confidence (0-1) and source="rules".
+
+    Confidence is the share of the composition with a known risk level,
+    reduced when the percentages do not add up to ~100%.
+    """
+    total = sum(max(m.get("percentage") or 0, 0) for m in materials)
+
+    if not materials or total <= 0:
+        return {
+            "rating": None,
+            "reasoning": "No composition data for rule-based scoring",
+            "confidence": 0.0,
+            "source": "rules",
+        }
+
+    risk_index = 0.0
+    known_share = 0.0
+    sourced_share = 0.0
+    high_risk = []
+    unknown = []
+
+    for m in materials:
+        share = max(m.get("percentage") or 0, 0) / total
+        risk = _risk_key(m.get("risk_level"))
+
+        if risk in RISK_WEIGHTS:
+            risk_index += share * RISK_WEIGHTS[risk]
+            known_share += share
+            if risk == "high":
+                high_risk.append(m["name"])
+        else:
+            risk_index += share * UNKNOWN_RISK_WEIGHT
+            unknown.append(m["name"])
+
+        if m.get("source"):
+            sourced_share += share
+
+    rating = (1 - risk_index) * (100 - TRACEABILITY_BONUS) + sourced_share * TRACEABILITY_BONUS
+    rating = round(min(100.0, max(0.0, rating)), 1)
+
+    # Compositions that do not sum to 100% are less trustworthy
+    completeness = max(0.0, 1 - abs(total - 100) / 100)
+    confidence = round(known_share * completeness, 3)
+
+    parts = [f"Weighted material risk index {risk_index:.2f}"]
+    if high_risk:
+        parts.append(f"high-risk materials: {', '.join(high_risk)}")
+    if unknown:
+        parts.append(f"unrated materials: {', '.join(unknown)}")
+    parts.append(f"{round(sourced_share * 100)}% of composition has a declared source")
+
+    return {
+        "rating": rating,
+        "reasoning": "Rule-based assessment. " + "; ".join(parts) + ".",
+        "confidence": confidence,
+        "source": "rules",
+    }
+
+
+def needs_escalation(score: dict, novel: bool = False) -> bool:
+    """
+    True when the rule score is too uncertain (or missing) to store on its
+    own, or the composition is novel (see RULE_SCORER_ESCALATE_NOVEL).
+    """
+    if novel and RULE_SCORER_ESCALATE_NOVEL:
+        return True
+    return score["rating"] is None or score["confidence"] < RULE_SCORER_MIN_CONFIDENCE
@@ -0,0 +1,306 @@
+"""
+Lightweight periodic job scheduler with state in the scheduled_jobs table.
+
+Jobs register with @scheduled (see app.services.jobs). The loop runs either
+as a thread inside app workers (SCHEDULER_ENABLED=true) or as its own
+process (`python -m scripts.run_scheduler`). Every instance polls the
+table and claims due runs with a conditional UPDATE, so several workers
+can run the loop and each run still happens once; a crashed run is
+retried when its lock expires.
+"""
+
+import calendar
+import os
+import random
+import re
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable
+
+from sqlalchemy import update, or_, and_
+from sqlalchemy.exc import IntegrityError
+
+from app.database import SessionLocal
+from app.models.scheduled_job import ScheduledJob
+from app.utils.logger import get_logger
+
+logger = get_logger("scheduler")
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "false").lower() == "true"
+SCHEDULER_POLL_SECONDS = float(os.getenv("SCHEDULER_POLL_SECONDS", "5"))
+
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}"[:64]
+
+UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+DURATION = re.compile(r"^\s*(\d+)\s*([smhd])\s*$")
+
+
+def parse_duration(value) -> int:
+    """Seconds from 90, "30s", "15m", "6h" or "1d"."""
+    if isinstance(value, (int, float)):
+        return int(value)
+
+    match = DURATION.match(value)
+    if not match:
+        raise ValueError(f"Invalid duration: {value!r}")
+    return int(match.group(1)) * UNITS[match.group(2)]
+
+
+@dataclass
+class Job:
+    name: str
+    fn: Callable
+    interval_seconds: int
+    jitter_seconds: int = 0
+    # Run on wall-clock multiples of the interval ("every hour on the hour")
+    align: bool = False
+    timeout_seconds: int = 900
+
+    def next_run(self, after: datetime) -> datetime:
+        if self.align:
+            seconds = calendar.timegm(after.utctimetuple())
+            epoch = seconds // self.interval_seconds * self.interval_seconds
+            base = datetime.utcfromtimestamp(epoch + self.interval_seconds)
+        else:
+            base = after + timedelta(seconds=self.interval_seconds)
+
+        if self.jitter_seconds:
+            base += timedelta(seconds=random.uniform(0, self.jitter_seconds))
+        return base
+
+
+JOBS: dict[str, Job] = {}
+
+
+def scheduled(name: str, every, jitter=0, align: bool = False, timeout="15m"):
+    """Register fn(db) -> summary as a periodic job."""
+    def decorator(fn):
+        JOBS[name] = Job(
+            name=name,
+            fn=fn,
+            interval_seconds=parse_duration(every),
+            jitter_seconds=parse_duration(jitter),
+            align=align,
+            timeout_seconds=parse_duration(timeout),
+        )
+        return fn
+    return decorator
+
+
+def load_jobs():
+    import app.services.jobs  # noqa: F401  (registers via @scheduled)
+    return JOBS
+
+
+# =====================================================
+# STATE
+# =====================================================
+
+def ensure_jobs(db):
+    """Create rows for new jobs and sync interval/jitter from code."""
+    load_jobs()
+    now = datetime.utcnow()
+    rows = {row.name: row for row in db.query(ScheduledJob).all()}
+
+    for job in JOBS.values():
+        row = rows.get(job.name)
+        if row is None:
+            db.add(ScheduledJob(
+                name=job.name,
+                interval_seconds=job.interval_seconds,
+                jitter_seconds=job.jitter_seconds,
+                next_run_at=job.next_run(now),
+            ))
+        elif (row.interval_seconds, row.jitter_seconds) != (job.interval_seconds, job.jitter_seconds):
+            row.interval_seconds = job.interval_seconds
+            row.jitter_seconds = job.jitter_seconds
+            row.next_run_at = min(row.next_run_at, job.next_run(now))
+
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another worker registered the same jobs at the same moment
+        db.rollback()
+
+
+def job_states(db) -> list:
+    """Every job row plus its mean run time, for the admin endpoints."""
+    ensure_jobs(db)
+    rows = db.query(ScheduledJob).order_by(ScheduledJob.name).all()
+
+    for row in rows:
+        row.avg_duration_ms = round(row.total_duration_ms / row.run_count, 1) if row.run_count else None
+    return rows
+
+
+def _claimable(now: datetime):
+    return and_(
+        ScheduledJob.enabled.is_(True),
+        or_(ScheduledJob.locked_until.is_(None), ScheduledJob.locked_until < now),
+    )
+
+
+def _claim(db, job: Job, now: datetime, due_only: bool = True) -> bool:
+    conditions = [ScheduledJob.name == job.name, _claimable(now)]
+    if due_only:
+        conditions.append(ScheduledJob.next_run_at <= now)
+
+    claimed = db.execute(
+        update(ScheduledJob)
+        .where(*conditions)
+        .values(
+            locked_by=INSTANCE_ID,
+            locked_until=now + timedelta(seconds=job.timeout_seconds),
+            last_started_at=now,
+            last_status="running",
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return claimed == 1
+
+
+def _execute(job: Job):
+    """Run one claimed job in a fresh session and record the outcome."""
+    started = time.perf_counter()
+    status, error, result = "ok", None, None
+
+    db = SessionLocal()
+    try:
+        result = job.fn(db)
+    except Exception as e:
+        db.rollback()
+        status, error = "error", f"{type(e).__name__}: {e}"
+        logger.exception(f"Job {job.name} failed")
+    finally:
+        db.close()
+
+    duration_ms = (time.perf_counter() - started) * 1000
+    finished = datetime.utcnow()
+
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(ScheduledJob)
+            .where(ScheduledJob.name == job.name, ScheduledJob.locked_by == INSTANCE_ID)
+            .values(
+                locked_by=None,
+                locked_until=None,
+                last_finished_at=finished,
+                last_status=status,
+                last_error=error[:2000] if error else None,
+                last_result=str(result)[:500] if result is not None else None,
+                last_duration_ms=round(duration_ms, 1),
+                run_count=ScheduledJob.run_count + 1,
+                failure_count=ScheduledJob.failure_count + (1 if error else 0),
+                total_duration_ms=ScheduledJob.total_duration_ms + duration_ms,
+                next_run_at=job.next_run(finished),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    logger.info(f"Job {job.name} {status} in {duration_ms:.0f} ms: {error or result}")
+    return status, result, error
+
+
+def run_pending() -> int:
+    """One scheduler pass: run every due job this instance can claim."""
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        due = [
+            name for (name,) in db.query(ScheduledJob.name)
+            .filter(_claimable(now), ScheduledJob.next_run_at <= now)
+            .order_by(ScheduledJob.next_run_at)
+        ]
+
+        ran = 0
+        # Claim one at a time so a long job never sits on others' locks
+        for name in due:
+            job = JOBS.get(name)
+            if job and _claim(db, job, datetime.utcnow()):
+                _execute(job)
+                ran += 1
+    finally:
+        db.close()
+
+    return ran
+
+
+def run_now(db, name: str):
+    """Run a job immediately in the caller's thread (admin trigger with wait)."""
+    job = load_jobs().get(name)
+    if job is None:
+        raise KeyError(name)
+    if not _claim(db, job, datetime.utcnow(), due_only=False):
+        return None
+    return _execute(job)
+
+
+def trigger(db, name: str) -> bool:
+    """Make a job due now; the next scheduler pass picks it up."""
+    if name not in load_jobs():
+        raise KeyError(name)
+    updated = db.execute(
+        update(ScheduledJob)
+        .where(ScheduledJob.name == name)
+        .values(next_run_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    runner.wake()
+    return updated == 1
+
+
+# =====================================================
+# LOOP
+# =====================================================
+
+class SchedulerThread:
+    def __init__(self, poll_seconds: float):
+        self.poll_seconds = poll_seconds
+        self.stopped = threading.Event()
+        self.woken = threading.Event()
+        self.thread = None
+
+    def wake(self):
+        self.woken.set()
+
+    def run_forever(self):
+        db = SessionLocal()
+        try:
+            ensure_jobs(db)
+        finally:
+            db.close()
+
+        logger.info(f"Scheduler {INSTANCE_ID} running {sorted(JOBS)}")
+        while not self.stopped.is_set():
+            try:
+                run_pending()
+            except Exception:
+                logger.exception("Scheduler pass failed")
+            self.woken.wait(self.poll_seconds)
+            self.woken.clear()
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run_forever, name="scheduler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.woken.set()
+        if self.thread is not None:
+            self.thread.join(timeout=30)
+            self.thread = None
+
+
+runner = SchedulerThread(SCHEDULER_POLL_SECONDS)
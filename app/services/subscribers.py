@@ -0,0 +1,120 @@
+"""
+Outbox subscribers (see app.services.outbox). Each receives committed
+change events in id order and must tolerate seeing an event twice.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import select, insert
+
+from app.models.audit_log import AuditLog
+from app.models.batch import Batch
+from app.models.product import Product
+from app.models.transport import Transport
+from app.services import emission_buckets
+from app.services.outbox import subscriber
+
+
+@subscriber("dashboard_cache", entities={"batch", "product"})
+def invalidate_dashboards(db, events):
+    """Drop manufacturer dashboards cached in this worker that a write touched."""
+    from app.crud.product import invalidate_manufacturer_dashboard
+
+    manufacturer_ids, product_ids = set(), set()
+
+    for e in events:
+        if e.entity == "batch" and e.action == "updated" and "batch_code" not in e.fields:
+            continue  # the dashboard shows codes and counts only
+        if e.entity == "product" and e.state:
+            manufacturer_ids.add(e.state["manufacturer_id"])
+        elif e.product_id is not None:
+            product_ids.add(e.product_id)
+
+    if product_ids:
+        manufacturer_ids.update(db.execute(
+            select(Product.manufacturer_id).where(Product.id.in_(product_ids))
+        ).scalars())
+
+    for manufacturer_id in manufacturer_ids - {None}:
+        invalidate_manufacturer_dashboard(manufacturer_id)
+
+
+@subscriber("audit_log", shared=True)
+def record_audit_log(db, events):
+    """One audit_logs row per change, written once across all workers."""
+    db.execute(insert(AuditLog.__table__), [
+        {
+            "entity_type": e.entity,
+            "entity_id": e.entity_id,
+            "action": e.action,
+            "performed_by": e.actor_id,
+            "timestamp": e.created_at,
+        }
+        for e in events
+    ])
+
+
+@subscriber("event_stream", entities={"batch", "ai_score", "lab_report", "transport"})
+def publish_batch_events(db, events):
+    """Fan batch status changes out to SSE clients connected to this worker."""
+    from app.services.event_stream import broker, to_message, batch_topic, manufacturer_topic
+
+    messages = [(e, m) for e in events if (m := to_message(e)) is not None]
+    if not messages:
+        return
+
+    owners = {}
+    if broker.has_prefix("manufacturer:"):
+        batch_ids = {e.batch_id for e, _ in messages}
+        owners = dict(db.execute(
+            select(Batch.id, Product.manufacturer_id)
+            .join(Product, Product.id == Batch.product_id)
+            .where(Batch.id.in_(batch_ids))
+        ).all())
+        # A deleted batch's row is gone; its event still names the product
+        product_ids = {e.product_id for e, _ in messages if e.batch_id not in owners and e.product_id}
+        if product_ids:
+            by_product = dict(db.execute(
+                select(Product.id, Product.manufacturer_id).where(Product.id.in_(product_ids))
+            ).all())
+            for e, _ in messages:
+                if e.batch_id not in owners and e.product_id in by_product:
+                    owners[e.batch_id] = by_product[e.product_id]
+
+    for e, message in messages:
+        broker.publish(batch_topic(e.batch_id), message)
+        if e.batch_id in owners:
+            broker.publish(manufacturer_topic(owners[e.batch_id]), message)
+
+
+@subscriber("emission_buckets", entities={"transport"}, shared=True)
+def refresh_emission_buckets(db, events):
+    """Recompute the daily emission buckets (product x day) that transport writes touched."""
+    cells = set()
+    live_ids = set()
+
+    for e in events:
+        if e.action == "deleted":
+            if e.state and e.state.get("created_at"):
+                cells.add((e.batch_id, datetime.fromisoformat(e.state["created_at"]).date()))
+        else:
+            live_ids.add(e.entity_id)
+
+    # Product and day of surviving transports come from their current rows
+    if live_ids:
+        cells.update(db.execute(
+            select(Transport.batch_id, emission_buckets.transport_day())
+            .where(Transport.id.in_(live_ids))
+        ).all())
+
+    batch_ids = {batch_id for batch_id, _ in cells}
+    if not batch_ids:
+        return
+
+    products = dict(db.execute(
+        select(Batch.id, Batch.product_id).where(Batch.id.in_(batch_ids))
+    ).all())
+    emission_buckets.refresh_cells(
+        db.connection(),
+        {(products.get(batch_id), day) for batch_id, day in cells},
+    )
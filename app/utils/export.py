@@ -0,0 +1,55 @@
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime
+
+# Rows per yielded chunk; keeps syscalls low and memory flat
+CHUNK_ROWS = 500
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return str(value)
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=_default)
+    return _default(value) if isinstance(value, (datetime, date, enum.Enum)) else value
+
+
+def iter_csv(rows, columns: list):
+    """Encode an iterable of dicts as CSV text chunks (header first)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    count = 0
+    for row in rows:
+        writer.writerow([_csv_value(row.get(c)) for c in columns])
+        count += 1
+        if count % CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    yield buffer.getvalue()
+
+
+def iter_ndjson(rows):
+    """Encode an iterable of dicts as newline-delimited JSON chunks."""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row, default=_default))
+        if len(lines) >= CHUNK_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines = []
+
+    if lines:
+        yield "\n".join(lines) + "\n"
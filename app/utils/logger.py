@@ -1,34 +1,116 @@
+import atexit
+import contextvars
+import json
 import logging
-import sys
-from logging.handlers import RotatingFileHandler
 import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 # Check if running in production (Render, etc.)
 IS_PRODUCTION = os.getenv("ENVIRONMENT", "development").lower() == "production"
 
-# Configure logging
-logger = logging.getLogger("ecotrace")
-logger.setLevel(logging.DEBUG)
+# json (default) or text
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+
+# Per-logger sampling for high-frequency messages, e.g.
+# LOG_SAMPLE_RATES="ecotrace.main=0.01,ecotrace.database=0.1"
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+
+# Correlation id for the request currently being handled (set by middleware)
+request_id_var = contextvars.ContextVar("request_id", default=None)
+
+
+# ---------- Formatters ----------
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; cheap to ship and to parse."""
+
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+
+        if getattr(record, "request_id", None):
+            payload["request_id"] = record.request_id
 
-# Format for logs
-formatter = logging.Formatter(
-    "%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s",
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+
+        return json.dumps(payload, default=str)
+
+
+text_formatter = logging.Formatter(
+    "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] - %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S"
 )
 
+formatter = JsonFormatter() if LOG_FORMAT == "json" else text_formatter
+
+
+# ---------- Filters ----------
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the current request id in the caller's thread."""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get() or "-"
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of DEBUG/INFO records for the configured loggers.
+    Warnings and errors always pass.
+    """
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+
+        rate = self.rates.get(record.name)
+        if rate is None:
+            return True
+
+        return random.random() < rate
+
+
+def _parse_sample_rates(value: str) -> dict:
+    rates = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        name, rate = item.split("=", 1)
+        try:
+            rates[name.strip()] = float(rate)
+        except ValueError:
+            continue
+    return rates
+
+
+# ---------- Sink handlers (run on the listener thread) ----------
+handlers = []
+
 # Console handler (always output to console - captured by Render logs)
 console_handler = logging.StreamHandler(sys.stdout)
-console_level = logging.INFO if IS_PRODUCTION else logging.INFO
-console_handler.setLevel(console_level)
+console_handler.setLevel(logging.INFO)
 console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
+handlers.append(console_handler)
 
 # File handler only in development (not persistent on Render)
 if not IS_PRODUCTION:
     # Create logs directory if it doesn't exist
     if not os.path.exists("logs"):
         os.makedirs("logs")
-    
+
     file_handler = RotatingFileHandler(
         "logs/ecotrace.log",
         maxBytes=5 * 1024 * 1024,  # 5 MB
@@ -36,7 +118,57 @@ if not IS_PRODUCTION:
     )
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    handlers.append(file_handler)
+
+
+# ---------- Non-blocking pipeline ----------
+# Request threads only enqueue; formatting and I/O happen on the listener thread.
+# Threads do not survive fork (gunicorn preloads the app in the master), so
+# each process starts its own listener, with its own queue, on first use.
+class ProcessQueueHandler(QueueHandler):
+    def enqueue(self, record):
+        if _listener_pid != os.getpid():
+            _start_listener()
+        self.queue.put_nowait(record)
+
+
+def _start_listener():
+    global listener, _listener_pid
+    with _listener_lock:
+        if _listener_pid == os.getpid():
+            return
+        # Records the parent queued before the fork are drained by the parent
+        queue_handler.queue = queue.SimpleQueue()
+        listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+        listener.start()
+        _listener_pid = os.getpid()
+
+
+def _stop_listener():
+    if listener is not None and _listener_pid == os.getpid():
+        listener.stop()
+
+
+def _after_fork():
+    global _listener_lock
+    # The lock may have been held by another thread at fork time
+    _listener_lock = threading.Lock()
+
+
+listener = None
+_listener_pid = None
+_listener_lock = threading.Lock()
+os.register_at_fork(after_in_child=_after_fork)
+atexit.register(_stop_listener)
+
+queue_handler = ProcessQueueHandler(queue.SimpleQueue())
+queue_handler.addFilter(RequestIdFilter())
+queue_handler.addFilter(SamplingFilter(_parse_sample_rates(LOG_SAMPLE_RATES)))
+
+# Configure logging
+logger = logging.getLogger("ecotrace")
+logger.setLevel(logging.DEBUG)
+logger.addHandler(queue_handler)
 
 # Export logger
 get_logger = lambda name: logging.getLogger(f"ecotrace.{name}")
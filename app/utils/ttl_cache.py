@@ -0,0 +1,66 @@
+import threading
+import time
+
+
+class TTLCache:
+    """
+    Small thread-safe key -> value cache with a time-to-live.
+
+    Writers invalidate the keys they affect; the TTL bounds staleness for
+    anything those invalidations miss (e.g. writes in other processes).
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 10_000):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self.entries = {}
+        # Bumped on invalidate so a computation that raced a write is not stored
+        self.generations = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, generation=None):
+        if self.ttl <= 0:
+            return
+        with self.lock:
+            if generation is not None and self.generations.get(key, 0) != generation:
+                return
+            if len(self.entries) >= self.max_entries:
+                now = time.monotonic()
+                self.entries = {k: e for k, e in self.entries.items() if e[0] > now}
+                if len(self.entries) >= self.max_entries:
+                    self.entries.clear()
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+            self.generations[key] = self.generations.get(key, 0) + 1
+
+    def get_or_compute(self, key, compute):
+        with self.lock:
+            generation = self.generations.get(key, 0)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value, generation)
+        return value
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "size": len(self.entries),
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
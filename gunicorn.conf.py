@@ -0,0 +1,45 @@
+"""
+Production server: gunicorn managing uvicorn worker processes.
+
+    gunicorn app.main:app -c gunicorn.conf.py
+
+Each worker is a separate process with its own GIL, event loop, threadpool
+and DB pool (sized from DB_CONNECTION_BUDGET / WEB_CONCURRENCY). Schema
+bootstrap in the lifespan hook is serialized by app.database.schema_lock.
+
+Graceful restart: `kill -HUP <master>` starts fresh workers and lets the
+old ones finish in-flight requests (up to graceful_timeout). Because the
+app is preloaded, HUP does not pick up new code; deploy by restarting the
+master, or `kill -USR2` then `kill -TERM` the old master.
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# gunicorn also reads WEB_CONCURRENCY itself; keep the DB pool math in sync
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(multiprocessing.cpu_count() * 2 + 1, 8))))
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app once in the master; workers fork with modules loaded
+preload_app = True
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+# Recycle workers periodically so slow leaks never accumulate
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+
+
+def post_fork(server, worker):
+    # Never share pooled sockets opened in the master with a child
+    from app.database import engine
+
+    engine.dispose(close=False)
@@ -0,0 +1,91 @@
+"""
+Request-path logging overhead: synchronous handlers vs the QueueHandler pipeline.
+
+The synchronous setup mirrors the previous logger (stdout + RotatingFileHandler,
+verbose filename:lineno formatter). Both sinks write to real files so the
+blocking I/O cost is included.
+
+Usage:
+    python -m scripts.bench_logging --records 50000
+"""
+
+import argparse
+import logging
+import os
+import queue
+import tempfile
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from app.utils.logger import JsonFormatter, RequestIdFilter, request_id_var
+
+
+def _sinks(directory: str, formatter):
+    stream = logging.StreamHandler(open(os.path.join(directory, "stdout.log"), "w"))
+    stream.setFormatter(formatter)
+    rotating = RotatingFileHandler(
+        os.path.join(directory, "ecotrace.log"),
+        maxBytes=5 * 1024 * 1024,
+        backupCount=3,
+    )
+    rotating.setFormatter(formatter)
+    return [stream, rotating]
+
+
+def _run(logger: logging.Logger, records: int) -> float:
+    started = time.perf_counter()
+    for i in range(records):
+        logger.info("Root endpoint accessed %s", i)
+    return time.perf_counter() - started
+
+
+def bench_sync(directory: str, records: int) -> float:
+    formatter = logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S"
+    )
+    logger = logging.getLogger("bench.sync")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    for handler in _sinks(directory, formatter):
+        logger.addHandler(handler)
+
+    return _run(logger, records)
+
+
+def bench_queue(directory: str, records: int) -> float:
+    log_queue = queue.SimpleQueue()
+    handler = QueueHandler(log_queue)
+    handler.addFilter(RequestIdFilter())
+
+    listener = QueueListener(log_queue, *_sinks(directory, JsonFormatter()))
+    listener.start()
+
+    logger = logging.getLogger("bench.queue")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+
+    request_id_var.set("bench")
+    elapsed = _run(logger, records)
+
+    # Drain outside the measured request path
+    listener.stop()
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark logging overhead on the request path")
+    parser.add_argument("--records", type=int, default=50_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        sync = bench_sync(directory, args.records)
+        queued = bench_queue(directory, args.records)
+
+    for name, elapsed in (("sync handlers", sync), ("queue pipeline", queued)):
+        print(f"{name:>15}: {elapsed * 1e6 / args.records:8.2f} us/record  ({elapsed:.3f}s total)")
+
+
+if __name__ == "__main__":
+    main()
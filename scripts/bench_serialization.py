@@ -0,0 +1,137 @@
+"""
+Serialization cost per passport and per list page: jsonable_encoder vs typed models.
+
+"before" mirrors what FastAPI did for the untyped endpoints (jsonable_encoder
+over the dict / ORM objects, then json.dumps). "after" builds the Pydantic
+response model from the loaded ORM objects and serializes it with
+model_dump_json in pydantic-core.
+
+Uses an in-memory SQLite database so it never touches the configured one.
+
+Usage:
+    python -m scripts.bench_serialization --iterations 2000
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, joinedload
+
+from app.database import Base
+from app.models import *
+from app.crud.passport import get_batch_passport, build_passport
+from app.services.report_bodies import store_body
+from app.schemas.lab_report import LabReportListResponse
+
+
+def _populate(db, materials: int, legs: int, reports: int):
+    rng = random.Random(7)
+    now = datetime(2025, 1, 1)
+
+    manufacturer = User(name="Maker", email="m@x", password="x", role=UserRole.manufacturer)
+    transporter = User(name="Mover", email="t@x", password="x", role=UserRole.transporter)
+    lab = User(name="Lab", email="l@x", password="x", role=UserRole.lab)
+    db.add_all([manufacturer, transporter, lab])
+    db.flush()
+
+    product = Product(name="Bench Product", brand="Bench", category="apparel", manufacturer_id=manufacturer.id)
+    db.add(product)
+    db.flush()
+
+    batch = Batch(
+        product_id=product.id, batch_code="BENCH-1", manufacture_date=now, expiry_date=now + timedelta(days=365),
+        manufacturing_location="Mumbai", base_carbon_footprint=4.2,
+        status=BatchStatus.verified, validation_status=ValidationStatus.lab_required,
+    )
+    db.add(batch)
+    db.flush()
+
+    for i in range(materials):
+        material = Material(name=f"Material {i}", common_name=f"M{i}", risk_level=rng.choice(list(RiskLevel)))
+        db.add(material)
+        db.flush()
+        db.add(BatchMaterial(batch_id=batch.id, material_id=material.id, percentage=100 / materials,
+                             source_info_provided=True, source="Surat"))
+
+    origin = "Mumbai"
+    for i in range(legs):
+        destination = f"Stop {i}"
+        db.add(Transport(batch_id=batch.id, transporter_id=transporter.id, origin=origin, destination=destination,
+                         distance_km=100.0 + i, fuel_type="diesel", vehicle_type="truck", transport_emission=27.0))
+        origin = destination
+
+    analysis = [{"title": f"Section {i}", "content": "Lead: 0.1 ppm\nCadmium: 0.01 ppm"} for i in range(4)]
+    for i in range(reports):
+        db.add(LabReport(batch_id=batch.id, lab_id=lab.id, body_hash=store_body(db, analysis), certifications="GOTS",
+                         safety_status=SafetyStatus.safe, notes="ok", lab_score=4.0, verified=True))
+
+    db.add(AIScore(batch_id=batch.id, rating=71.0, reasoning="Bench reasoning"))
+    db.commit()
+    return batch.id, lab.id
+
+
+def _legacy_passport(passport_model) -> dict:
+    # Same shape as the old hand-built dict: plain containers with datetimes/enums inside
+    return passport_model.model_dump()
+
+
+def _time(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark response serialization")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--materials", type=int, default=20)
+    parser.add_argument("--legs", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+
+    batch_id, lab_id = _populate(db, args.materials, args.legs, args.page_size)
+
+    # ---------------- PASSPORT ----------------
+    passport = get_batch_passport(db, batch_id)
+    batch = db.get(Batch, batch_id)  # already loaded by get_batch_passport
+    legacy = _legacy_passport(passport)
+
+    before = _time(lambda: json.dumps(jsonable_encoder(legacy)), args.iterations)
+    after = _time(lambda: build_passport(batch).model_dump_json(), args.iterations)
+    print(f"passport   before {before * 1e6:9.1f} us   after {after * 1e6:9.1f} us   ({before / after:.1f}x)")
+
+    # ---------------- LIST PAGE ----------------
+    # Fresh session: only what the endpoint loads is in the identity map
+    db.close()
+    db = Session()
+    items = (
+        db.query(LabReport)
+        .options(joinedload(LabReport.batch))
+        .filter(LabReport.lab_id == lab_id)
+        .limit(args.page_size)
+        .all()
+    )
+    page = {"items": items, "total": len(items), "page": 1, "limit": args.page_size}
+
+    iterations = max(1, args.iterations // 10)
+    before = _time(lambda: json.dumps(jsonable_encoder(page)), iterations)
+    after = _time(lambda: LabReportListResponse(**page).model_dump_json(), iterations)
+    print(f"list page  before {before * 1e6:9.1f} us   after {after * 1e6:9.1f} us   ({before / after:.1f}x)"
+          f"   [{len(items)} lab reports]")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Rebuild pre-rendered passport files (.json, .json.gz and, with brotli
+installed, .json.br) under PASSPORT_STATIC_DIR.
+
+Run after deploying, after restoring a database, or after changes the
+renderer does not track (e.g. renaming a lab, transporter or material).
+Files are replaced atomically, so this is safe to run while serving.
+
+Usage:
+    python -m scripts.build_passports
+    python -m scripts.build_passports --batch-id 12 --batch-id 13
+    python -m scripts.build_passports --prune   # also delete files of removed batches
+"""
+
+import argparse
+import os
+import time
+
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models.batch import Batch
+from app.services import passport_files
+
+ID_CHUNK = 5000
+
+
+def _existing_file_ids() -> set:
+    ids = set()
+    for name in os.listdir(passport_files.PASSPORT_STATIC_DIR):
+        stem = name.split(".", 1)[0]
+        if stem.isdigit():
+            ids.add(int(stem))
+    return ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-id", type=int, action="append", help="Only rebuild these batches")
+    parser.add_argument("--prune", action="store_true", help="Remove files for batches that no longer exist")
+    args = parser.parse_args()
+
+    os.makedirs(passport_files.PASSPORT_STATIC_DIR, exist_ok=True)
+    started = time.perf_counter()
+    written = 0
+    seen = set()
+
+    db = SessionLocal()
+    try:
+        if args.batch_id:
+            written = passport_files.render_batches(db, args.batch_id)
+        else:
+            last_id = 0
+            while True:
+                ids = list(db.execute(
+                    select(Batch.id).where(Batch.id > last_id).order_by(Batch.id).limit(ID_CHUNK)
+                ).scalars())
+                if not ids:
+                    break
+                written += passport_files.render_batches(db, ids)
+                seen.update(ids)
+                last_id = ids[-1]
+    finally:
+        db.close()
+
+    removed = 0
+    if args.prune and not args.batch_id:
+        for batch_id in _existing_file_ids() - seen:
+            passport_files.remove_passport(batch_id)
+            removed += 1
+
+    print(
+        f"Wrote {written} passports to {passport_files.PASSPORT_STATIC_DIR} "
+        f"({removed} pruned) in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
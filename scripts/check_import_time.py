@@ -0,0 +1,94 @@
+"""
+Cold-start budget check for `import app.main`.
+
+Runs a fresh interpreter with `-X importtime`, reports the slowest modules
+and exits non-zero when the cumulative import time of app.main exceeds the
+budget or imports a module listed in FORBIDDEN_MODULES. tests/test_import_time.py
+runs the same check in CI; use this script to see where the time goes.
+
+Usage:
+    python -m scripts.check_import_time --budget-ms 1200
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+DEFAULT_BUDGET_MS = int(os.getenv("IMPORT_TIME_BUDGET_MS", "1200"))
+
+# Modules that must never be imported at startup (loaded by the code paths
+# that need them)
+FORBIDDEN_MODULES = ("google.generativeai", "numpy")
+
+
+def measure(module: str, runs: int) -> tuple[float, list, set]:
+    best_total = None
+    best_rows = []
+    imported = set()
+
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            env=os.environ.copy(),
+        )
+        if result.returncode != 0:
+            raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+        rows = []
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            parts = line[len("import time:"):].split("|")
+            try:
+                cumulative = int(parts[1])
+            except ValueError:
+                continue  # header line
+            name = parts[2].strip()
+            rows.append((cumulative, name))
+            imported.add(name)
+
+        total = next((c for c, name in rows if name == module), None)
+        if total is not None and (best_total is None or total < best_total):
+            best_total, best_rows = total, rows
+
+    return best_total / 1000, sorted(best_rows, reverse=True), imported
+
+
+def check(total_ms: float, imported: set, budget_ms: int) -> list:
+    """Budget and forbidden-module failures for one measurement."""
+    failures = []
+    if total_ms > budget_ms:
+        failures.append(f"import time {total_ms:.1f} ms exceeds budget {budget_ms} ms")
+
+    for forbidden in FORBIDDEN_MODULES:
+        if forbidden in imported:
+            failures.append(f"{forbidden} is imported at startup")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Enforce an import-time budget for the app")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=int, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3, help="best of N fresh interpreters")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    total_ms, rows, imported = measure(args.module, args.runs)
+
+    print(f"import {args.module}: {total_ms:.1f} ms (budget {args.budget_ms} ms)")
+    for cumulative, name in rows[1:args.top + 1]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failures = check(total_ms, imported, args.budget_ms)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
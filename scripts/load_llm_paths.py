@@ -0,0 +1,102 @@
+"""
+Load the AI rating and transport emission paths without a real model.
+
+Runs generate_ai_rating / calculate_transport_emission from a thread pool
+against an in-process provider (fake by default, or a recorded cassette),
+then prints throughput, latency percentiles and the governor counters.
+
+Usage:
+    python -m scripts.load_llm_paths --calls 200 --workers 16 --latency-ms 800
+    python -m scripts.load_llm_paths --replay llm_cassette.jsonl
+    python -m scripts.load_llm_paths --distinct 10   # duplicate-heavy traffic
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from app.services import llm_client
+from app.services.llm_providers import FakeProvider, ReplayProvider
+from app.services.ai_engine import generate_ai_rating
+from app.services.carbon_engine import calculate_transport_emission
+
+FUELS = ["diesel", "petrol", "electric", "lpg", "natural_gas"]
+VEHICLES = ["truck", "van", "car", "bus"]
+MATERIALS = ["Cotton", "Polyester", "Recycled PET", "Wool", "Nylon", "Hemp"]
+
+
+def _rating_call(rng: random.Random, i: int):
+    product = {"name": f"Product {i % 50}", "category": "apparel"}
+    batch = SimpleNamespace(batch_code=f"LOAD-{i}", created_at=None)
+    materials = [
+        {"name": rng.choice(MATERIALS), "percentage": p, "source": "load"}
+        for p in (60, 40)
+    ]
+    return lambda: generate_ai_rating(product, batch, materials)
+
+
+def _emission_call(rng: random.Random, i: int):
+    distance = round(rng.uniform(10, 2000), 1)
+    fuel = rng.choice(FUELS)
+    vehicle = rng.choice(VEHICLES)
+    return lambda: calculate_transport_emission(distance, fuel, vehicle, None)
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--jitter-ms", type=float, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--replay", help="Replay a recorded cassette instead of the fake provider")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--distinct", type=int, default=0,
+                        help="Draw inputs from this many distinct shapes per path (0 = all unique)")
+    args = parser.parse_args()
+
+    if args.replay:
+        provider = ReplayProvider(args.replay)
+    else:
+        provider = FakeProvider(args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    llm_client.set_provider(provider)
+
+    rng = random.Random(args.seed)
+    calls = []
+    for i in range(args.calls):
+        call = _rating_call if i % 2 == 0 else _emission_call
+        if args.distinct:
+            shape = (i // 2) % args.distinct
+            calls.append(call(random.Random(args.seed + shape), shape))
+        else:
+            calls.append(call(rng, i))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        latencies = sorted(pool.map(_timed, calls))
+    elapsed = time.perf_counter() - started
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000
+
+    print(f"provider   : {provider.name}")
+    print(f"calls      : {args.calls} over {args.workers} workers in {elapsed:.2f}s")
+    print(f"throughput : {args.calls / elapsed:.1f} calls/s")
+    print(f"latency ms : p50={pct(50):.0f} p95={pct(95):.0f} p99={pct(99):.0f} "
+          f"mean={statistics.mean(latencies) * 1000:.0f}")
+    print("governor   :")
+    print(json.dumps(llm_client.get_llm_metrics(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Recompute every transport's emission from the emission factor table
+(app.services.emission_factors, plus EMISSION_FACTORS_FILE corrections)
+and print which batches' totals changed.
+
+Runs in chunks of EMISSION_RECALC_CHUNK transports and saves a checkpoint
+with each one; after an interruption, run it again to continue (as long as
+the factor table is unchanged). Passport versions are bumped for changed
+batches; re-render pre-rendered passports afterwards if you use them.
+
+Usage:
+    python -m scripts.recalculate_emissions --dry-run     # diff only, no writes
+    python -m scripts.recalculate_emissions               # write (resumes if interrupted)
+    python -m scripts.recalculate_emissions --restart     # ignore an unfinished run
+"""
+
+import argparse
+import time
+
+from app.database import SessionLocal, init_db
+from app.services import emission_recalc
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Compute and report the diff without writing")
+    parser.add_argument("--restart", action="store_true", help="Start over instead of resuming an unfinished run")
+    parser.add_argument("--chunk-size", type=int, default=emission_recalc.EMISSION_RECALC_CHUNK)
+    parser.add_argument("--top", type=int, default=20, help="Batches to list in the diff summary")
+    args = parser.parse_args()
+
+    init_db()
+    started = time.perf_counter()
+
+    def progress(run):
+        total = max(run.total_transports, 1)
+        rate = run.processed_transports / max(time.perf_counter() - started, 1e-9)
+        print(
+            f"  {run.processed_transports}/{run.total_transports} transports "
+            f"({100 * run.processed_transports / total:.0f}%), {run.changed_transports} changed, "
+            f"{rate:.0f}/s",
+            flush=True,
+        )
+
+    db = SessionLocal()
+    try:
+        run = None
+        if not args.dry_run:
+            run = emission_recalc.start_run(db, resume=not args.restart)
+            if run.processed_transports:
+                print(f"Resuming run {run.id} after batch {run.last_batch_id} "
+                      f"({run.processed_transports} transports done)")
+
+        run = emission_recalc.recalculate(
+            db,
+            run=run,
+            dry_run=args.dry_run,
+            chunk_size=args.chunk_size,
+            progress=progress,
+        )
+
+        if args.dry_run:
+            changes = sorted(run.diff, key=lambda d: abs(d[3] - d[2]), reverse=True)[:args.top]
+        else:
+            changes = [
+                (row.batch_id, row.transports_changed, row.total_before, row.total_after)
+                for row in emission_recalc.top_changes(db, run.id, args.top)
+            ]
+
+        print(
+            f"{'Dry run' if args.dry_run else f'Run {run.id}'} (factors {run.factors_version}): "
+            f"{run.processed_transports} transports, {run.changed_transports} changed, "
+            f"{run.changed_batches} batches changed; total emission "
+            f"{run.emission_before:.2f} -> {run.emission_after:.2f} kg "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        if changes:
+            print(f"{'batch':>8} {'legs':>5} {'before':>12} {'after':>12} {'delta':>12}")
+            for batch_id, count, before, after in changes:
+                print(f"{batch_id:>8} {count:>5} {before:>12.2f} {after:>12.2f} {after - before:>+12.2f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Run the periodic job scheduler as its own process (instead of, or next to,
+SCHEDULER_ENABLED=true in the web workers; runs are claimed in the
+scheduled_jobs table so each one executes once).
+
+Usage:
+    python -m scripts.run_scheduler
+    python -m scripts.run_scheduler --once          # single pass, then exit
+    python -m scripts.run_scheduler --run lab_queue_reconcile
+"""
+
+import argparse
+
+from app.database import SessionLocal, init_db
+from app.services import scheduler, outbox, content_versions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="Run due jobs once and exit")
+    parser.add_argument("--run", metavar="JOB", help="Run one job now, due or not, and exit")
+    args = parser.parse_args()
+
+    init_db()
+
+    # Job writes get the same version bumps and change events as app writes
+    content_versions.install()
+    if outbox.OUTBOX_ENABLED:
+        outbox.install()
+
+    db = SessionLocal()
+    try:
+        scheduler.ensure_jobs(db)
+
+        if args.run:
+            outcome = scheduler.run_now(db, args.run)
+            print(outcome if outcome else f"{args.run} is running elsewhere or disabled")
+            return
+    finally:
+        db.close()
+
+    if args.once:
+        print(f"Ran {scheduler.run_pending()} due jobs")
+        return
+
+    try:
+        scheduler.runner.run_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,618 @@
+"""
+Synthetic data generator for scale testing.
+
+Writes users, materials, locations, products, batches (with 5-30 materials each),
+AI scores, transport chains, lab reports and reviews straight through the
+DBAPI connection:
+
+- PostgreSQL: COPY ... FROM STDIN (csv)
+- SQLite:     executemany inside a single transaction
+
+Output is fully determined by --seed, so benchmark datasets are reproducible.
+
+Usage:
+    python -m scripts.seed_data --seed 42 --manufacturers 200 --products-per-manufacturer 20 \
+        --batches-per-product 50
+"""
+
+import argparse
+import csv
+import io
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, JSON, DateTime
+
+from app.database import engine, SessionLocal, init_db
+from app.models import *
+from app.core.security import hash_password
+from app.services.composition import composition_vector, composition_fingerprint
+from app.services.report_bodies import body_hash
+from app.services.lab_analysis import extract_measurements
+from app.services import gazetteer, emission_buckets
+from app.crud.lab_queue import queue_risk, queue_priority
+from app.crud.location import location_key
+from app.utils.logger import get_logger
+
+logger = get_logger("seed")
+
+CHUNK_SIZE = 50_000
+BASE_TIME = datetime(2024, 1, 1)
+
+MATERIAL_BASES = [
+    ("Organic Cotton", "low"), ("Recycled Polyester", "low"), ("Polyester", "moderate"),
+    ("Nylon", "moderate"), ("Wool", "low"), ("Bamboo Fiber", "low"), ("Hemp", "low"),
+    ("Linen", "low"), ("Viscose", "moderate"), ("Acrylic", "high"), ("Spandex", "moderate"),
+    ("PVC", "high"), ("PET Plastic", "moderate"), ("HDPE", "moderate"), ("Glass", "low"),
+    ("Aluminium", "moderate"), ("Recycled Aluminium", "low"), ("Steel", "moderate"),
+    ("Paperboard", "low"), ("Natural Rubber", "low"), ("Synthetic Rubber", "high"),
+    ("Palm Oil", "high"), ("Shea Butter", "low"), ("Glycerin", "low"), ("Parabens", "high"),
+    ("Sodium Lauryl Sulfate", "moderate"), ("Titanium Dioxide", "moderate"),
+    ("Cocoa", "low"), ("Cane Sugar", "low"), ("Soy Lecithin", "low"),
+    ("Lithium Cells", "high"), ("Copper Wire", "moderate"), ("ABS Plastic", "high"),
+]
+
+CITIES = [
+    "Mumbai", "Delhi", "Chennai", "Kolkata", "Bengaluru", "Hyderabad", "Pune", "Ahmedabad",
+    "Surat", "Jaipur", "Lucknow", "Kochi", "Visakhapatnam", "Nagpur", "Indore", "Coimbatore",
+    "Singapore", "Dubai", "Rotterdam", "Hamburg", "Antwerp", "Shanghai", "Shenzhen",
+    "Los Angeles", "New York", "London", "Colombo", "Jebel Ali", "Busan", "Tokyo",
+]
+
+FUEL_FACTORS = {
+    "diesel": 0.27, "petrol": 0.24, "electric": 0.05, "lpg": 0.21,
+    "natural_gas": 0.19, "marine_fuel": 0.015, "jet_fuel": 0.6,
+}
+VEHICLES = ["truck", "van", "ship", "rail", "aircraft"]
+
+LAB_PARAMETERS = {
+    "Heavy Metals": [("Lead", "ppm", 0.0, 5.0), ("Cadmium", "ppm", 0.0, 1.0), ("Mercury", "ppm", 0.0, 0.5)],
+    "Chemical Safety": [("Formaldehyde", "mg/kg", 0.0, 150.0), ("pH", "", 4.0, 9.0)],
+    "Microbiology": [("Total Plate Count", "cfu/g", 0.0, 1000.0), ("Yeast and Mould", "cfu/g", 0.0, 100.0)],
+    "Physical Properties": [("Moisture", "%", 0.0, 15.0), ("Tensile Strength", "MPa", 10.0, 80.0)],
+}
+
+CERTIFICATIONS = ["GOTS", "OEKO-TEX 100", "ISO 14001", "FSC", "Fairtrade", "BIS", "ECOCERT"]
+
+REVIEW_COMMENTS = [
+    "Great product, transparent sourcing.",
+    "Packaging could be more sustainable.",
+    "Good quality, will buy again.",
+    "Decent, but the carbon footprint is high.",
+    None,
+]
+
+
+# ============================================================
+# WRITERS
+# ============================================================
+
+class BulkWriter:
+    """
+    Bulk row writer bound to a raw DBAPI connection.
+    Rows are plain tuples in table column order.
+    """
+
+    def __init__(self, connection, dialect: str):
+        self.connection = connection
+        self.dialect = dialect
+        self.counts = {}
+
+    def write(self, table, rows: list):
+        if not rows:
+            return
+
+        columns = [c.name for c in table.columns]
+        rows = _convert(table, rows, self.dialect)
+
+        if self.dialect == "postgresql":
+            self._copy(table.name, columns, rows)
+        else:
+            self._executemany(table.name, columns, rows)
+
+        self.counts[table.name] = self.counts.get(table.name, 0) + len(rows)
+
+    def _copy(self, table_name: str, columns: list, rows: list):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+
+        cursor = self.connection.cursor()
+        cursor.copy_expert(
+            f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+        cursor.close()
+
+    def _executemany(self, table_name: str, columns: list, rows: list):
+        placeholders = ", ".join("?" for _ in columns)
+        cursor = self.connection.cursor()
+        cursor.executemany(
+            f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})",
+            rows,
+        )
+        cursor.close()
+
+
+def _convert(table, rows: list, dialect: str) -> list:
+    """
+    Convert only the columns that need it (JSON everywhere, DateTime on
+    SQLite to match SQLAlchemy's storage format); other values pass through.
+    """
+    converters = {}
+    for i, column in enumerate(table.columns):
+        if isinstance(column.type, JSON):
+            converters[i] = lambda v: None if v is None else json.dumps(v)
+        elif isinstance(column.type, DateTime) and dialect == "sqlite":
+            converters[i] = lambda v: None if v is None else v.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+    if not converters:
+        return rows
+
+    converted = []
+    for row in rows:
+        row = list(row)
+        for i, convert in converters.items():
+            row[i] = convert(row[i])
+        converted.append(row)
+    return converted
+
+
+class ChunkedTable:
+    """Buffers rows for one table until the generator flushes."""
+
+    def __init__(self, writer: BulkWriter, table, on_full):
+        self.writer = writer
+        self.table = table
+        self.columns = [c.name for c in table.columns]
+        self.on_full = on_full
+        self.rows = []
+
+    def add(self, **values):
+        self.rows.append(tuple(map(values.get, self.columns)))
+        if len(self.rows) >= CHUNK_SIZE:
+            self.on_full()
+
+    def flush(self):
+        self.writer.write(self.table, self.rows)
+        self.rows = []
+
+
+# ============================================================
+# GENERATOR
+# ============================================================
+
+class SeedGenerator:
+    def __init__(self, args, writer: BulkWriter, start_ids: dict, locations: dict):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.writer = writer
+        self.next_ids = dict(start_ids)
+        self.password = hash_password(args.password)
+        self.material_risk = {}
+        self.location_ids = dict(locations)
+
+        self.tables = {
+            name: ChunkedTable(writer, model.__table__, self.flush)
+            for name, model in {
+                "users": User,
+                "materials": Material,
+                "locations": Location,
+                "products": Product,
+                "batches": Batch,
+                "batch_materials": BatchMaterial,
+                "ai_scores": AIScore,
+                "transports": Transport,
+                "lab_report_bodies": LabReportBody,
+                "lab_measurements": LabMeasurement,
+                "lab_reports": LabReport,
+                "lab_queue": LabQueueItem,
+                "reviews": Review,
+            }.items()
+        }
+
+    def _id(self, table: str) -> int:
+        value = self.next_ids[table]
+        self.next_ids[table] += 1
+        return value
+
+    def _location(self, name: str) -> int:
+        """Location id for a place name, adding the row on first use."""
+        key = location_key(name)
+        if key not in self.location_ids:
+            self.location_ids[key] = self._id("locations")
+            self.tables["locations"].add(id=self.location_ids[key], key=key, name=name, created_at=BASE_TIME)
+        return self.location_ids[key]
+
+    def _time(self, max_days: int = 700) -> datetime:
+        return BASE_TIME + timedelta(seconds=self.rng.randrange(max_days * 86400))
+
+    # ---------------- USERS ----------------
+    def users(self):
+        role_counts = {
+            UserRole.manufacturer: self.args.manufacturers,
+            UserRole.transporter: self.args.transporters,
+            UserRole.lab: self.args.labs,
+            UserRole.consumer: self.args.consumers,
+        }
+
+        users = {}
+        for role, count in role_counts.items():
+            ids = []
+            for _ in range(count):
+                user_id = self._id("users")
+                self.tables["users"].add(
+                    id=user_id,
+                    name=f"{role.value.title()} {user_id}",
+                    email=f"{role.value}{user_id}@seed.ecotrace.test",
+                    password=self.password,
+                    role=role.name,
+                    created_at=self._time(30),
+                )
+                ids.append(user_id)
+            users[role] = ids
+
+        return users
+
+    # ---------------- MATERIALS ----------------
+    def materials(self):
+        materials = []
+        for i in range(self.args.materials):
+            material_id = self._id("materials")
+            base, risk = MATERIAL_BASES[i % len(MATERIAL_BASES)]
+            self.tables["materials"].add(
+                id=material_id,
+                name=f"{base} {material_id}",
+                common_name=base,
+                risk_level=risk,
+                description=f"{base} (seeded)",
+            )
+            self.material_risk[material_id] = risk
+            materials.append(material_id)
+        return materials
+
+    # ---------------- COMPOSITION ----------------
+    def _composition(self, materials: list) -> list:
+        count = self.rng.randint(5, min(30, len(materials)))
+        chosen = self.rng.sample(materials, count)
+        weights = [self.rng.random() + 0.05 for _ in chosen]
+        total = sum(weights)
+        percentages = [round(w * 100 / total, 2) for w in weights]
+        percentages[-1] = round(100 - sum(percentages[:-1]), 2)
+        return list(zip(chosen, percentages))
+
+    def _evolve(self, composition: list, materials: list):
+        """Return (new composition, change_type) following classify_change thresholds."""
+        roll = self.rng.random()
+
+        if roll < self.args.no_change_ratio:
+            return composition, "no_change"
+
+        if roll < self.args.no_change_ratio + self.args.minor_change_ratio:
+            i, j = self.rng.sample(range(len(composition)), 2)
+            delta = round(min(self.rng.uniform(0.1, 5.0), composition[j][1]), 2)
+            updated = list(composition)
+            updated[i] = (updated[i][0], round(updated[i][1] + delta, 2))
+            updated[j] = (updated[j][0], round(updated[j][1] - delta, 2))
+            return updated, "minor"
+
+        return self._composition(materials), "major"
+
+    # ---------------- PRODUCTS / BATCHES ----------------
+    def products_and_batches(self, users: dict, materials: list):
+        transporters = users[UserRole.transporter]
+        labs = users[UserRole.lab]
+        consumers = users[UserRole.consumer]
+
+        for manufacturer_id in users[UserRole.manufacturer]:
+            for _ in range(self.args.products_per_manufacturer):
+                product_id = self._id("products")
+                brand = f"Brand{manufacturer_id}"
+                self.tables["products"].add(
+                    id=product_id,
+                    name=f"{brand} Product {product_id}",
+                    brand=brand,
+                    category=self.rng.choice(["apparel", "cosmetics", "food", "electronics", "home"]),
+                    description="Seeded product",
+                    manufacturer_id=manufacturer_id,
+                    created_at=BASE_TIME,
+                )
+
+                composition = None
+                created_at = BASE_TIME + timedelta(days=1)
+                previous_lab = None
+
+                for n in range(self.args.batches_per_product):
+                    if composition is None:
+                        composition, change_type = self._composition(materials), "first"
+                    else:
+                        composition, change_type = self._evolve(composition, materials)
+
+                    created_at += timedelta(minutes=self.rng.randint(1, 2880))
+                    previous_lab = self._batch(
+                        product_id, n, composition, change_type, created_at,
+                        previous_lab, transporters, labs, consumers,
+                    )
+
+    def _batch(self, product_id, n, composition, change_type, created_at,
+               previous_lab, transporters, labs, consumers):
+        batch_id = self._id("batches")
+        location = self.rng.choice(CITIES)
+
+        if change_type == "no_change":
+            validation, status = "auto_verified", "verified"
+        elif change_type == "minor":
+            validation, status = "ai_review", "verified"
+        else:
+            validation = "lab_required"
+            status = self.rng.choice(["pending", "verified", "verified", "rejected"])
+
+        vector = composition_vector(composition)
+        self.tables["batches"].add(
+            id=batch_id,
+            product_id=product_id,
+            batch_code=f"B{product_id}-{n:05d}",
+            manufacture_date=created_at - timedelta(days=1),
+            expiry_date=created_at + timedelta(days=365),
+            manufacturing_location=location,
+            manufacturing_location_id=self._location(location),
+            base_carbon_footprint=round(self.rng.uniform(0.5, 50.0), 2),
+            created_at=created_at,
+            composition_vector=vector,
+            composition_fingerprint=composition_fingerprint(vector),
+            version=1,
+            review_version=0,
+            status=status,
+            validation_status=validation,
+        )
+
+        for material_id, percentage in composition:
+            source = self.rng.choice(CITIES) if self.rng.random() < 0.33 else None
+            self.tables["batch_materials"].add(
+                id=self._id("batch_materials"),
+                batch_id=batch_id,
+                material_id=material_id,
+                percentage=percentage,
+                source_info_provided=bool(source),
+                source=source,
+            )
+
+        self.tables["ai_scores"].add(
+            id=self._id("ai_scores"),
+            batch_id=batch_id,
+            rating=round(self.rng.uniform(20, 95), 1),
+            reasoning="Seeded sustainability assessment",
+            source="llm",
+            generated_at=created_at,
+        )
+
+        self._transports(batch_id, location, created_at, transporters)
+
+        # create_batch only reuses the immediately previous batch's report
+        lab = None
+        if change_type == "no_change" and previous_lab:
+            lab = self._lab_report(batch_id, created_at, previous_lab, reused=True)
+        elif validation == "lab_required" and status != "pending" and labs:
+            lab = self._lab_report(batch_id, created_at, None, labs=labs, status=status)
+        elif validation == "lab_required":
+            risk = queue_risk(self.material_risk[m] for m, _ in composition)
+            self.tables["lab_queue"].add(
+                id=self._id("lab_queue"),
+                batch_id=batch_id,
+                risk_level=risk,
+                priority_at=queue_priority(created_at, risk),
+                attempts=0,
+                created_at=created_at,
+            )
+
+        if status == "verified" and consumers:
+            reviewers = self.rng.sample(
+                consumers,
+                min(len(consumers), self.rng.randint(0, self.args.max_reviews_per_batch)),
+            )
+            for user_id in reviewers:
+                self.tables["reviews"].add(
+                    id=self._id("reviews"),
+                    batch_id=batch_id,
+                    user_id=user_id,
+                    rating=self.rng.randint(1, 5),
+                    comment=self.rng.choice(REVIEW_COMMENTS),
+                    created_at=created_at + timedelta(days=self.rng.randint(1, 60)),
+                )
+
+        return lab
+
+    def _transports(self, batch_id, source, created_at, transporters):
+        """
+        Emit a linear chain source -> A -> B -> ... so every leg's origin is
+        one of get_available_origins() at the time it is created, and no
+        (origin, destination) pair repeats within the batch.
+        """
+        if not transporters:
+            return
+
+        legs = self.rng.randint(1, self.args.max_legs)
+        stops = self.rng.sample([c for c in CITIES if c != source], legs)
+
+        origin = source
+        leg_time = created_at
+        for destination in stops:
+            fuel = self.rng.choice(list(FUEL_FACTORS))
+            vehicle = self.rng.choice(VEHICLES)
+            # Every seed city is in the gazetteer; pairs repeat, so this is cached
+            distance = gazetteer.leg_distance(origin, destination, vehicle)
+            leg_time += timedelta(hours=self.rng.randint(1, 72))
+            self.tables["transports"].add(
+                id=self._id("transports"),
+                batch_id=batch_id,
+                transporter_id=self.rng.choice(transporters),
+                origin=origin,
+                destination=destination,
+                origin_id=self._location(origin),
+                destination_id=self._location(destination),
+                distance_km=distance,
+                distance_source="gazetteer",
+                fuel_type=fuel,
+                vehicle_type=vehicle,
+                transport_emission=round(distance * FUEL_FACTORS[fuel], 2),
+                notes=None,
+                created_at=leg_time,
+            )
+            origin = destination
+
+    def _analysis_data(self, batch_id: int) -> list:
+        sections = []
+        for title in self.rng.sample(list(LAB_PARAMETERS), self.rng.randint(2, len(LAB_PARAMETERS))):
+            lines = [
+                f"{name}: {round(self.rng.uniform(low, high), 3)} {unit}".rstrip()
+                for name, unit, low, high in LAB_PARAMETERS[title]
+            ]
+            sections.append({"title": title, "content": "\n".join(lines)})
+        sections.append({"title": "Summary", "content": f"Sample {batch_id} tested against applicable limits."})
+        return sections
+
+    def _lab_report(self, batch_id, created_at, previous, reused=False, labs=None, status=None):
+        if reused:
+            lab = dict(previous)
+            notes = "Reused from previous batch"
+            verified = True
+        else:
+            analysis_data = self._analysis_data(batch_id)
+            key = body_hash(analysis_data)
+            measurements = extract_measurements(analysis_data)
+            self.tables["lab_report_bodies"].add(
+                hash=key,
+                analysis_data=analysis_data,
+                parameter_count=len(measurements),
+                created_at=created_at,
+            )
+            for measurement in measurements:
+                self.tables["lab_measurements"].add(
+                    id=self._id("lab_measurements"), body_hash=key, **measurement
+                )
+            lab = {
+                "lab_id": self.rng.choice(labs),
+                "body_hash": key,
+                "certifications": ", ".join(self.rng.sample(CERTIFICATIONS, 2)),
+                "safety_status": "unsafe" if status == "rejected" else self.rng.choice(["safe", "safe", "caution"]),
+                "lab_score": round(self.rng.uniform(1, 5), 1),
+            }
+            notes = "Seeded lab analysis"
+            verified = True
+
+        self.tables["lab_reports"].add(
+            id=self._id("lab_reports"),
+            batch_id=batch_id,
+            created_at=created_at + timedelta(days=2),
+            notes=notes,
+            verified=verified,
+            **lab,
+        )
+        return lab
+
+    def flush(self):
+        # Tables are declared parents-first, so FKs hold after every flush
+        for table in self.tables.values():
+            table.flush()
+
+
+# ============================================================
+# ENTRYPOINT
+# ============================================================
+
+def _start_ids(db) -> dict:
+    models = {
+        "users": User, "materials": Material, "locations": Location, "products": Product, "batches": Batch,
+        "batch_materials": BatchMaterial, "ai_scores": AIScore, "transports": Transport,
+        "lab_reports": LabReport, "lab_measurements": LabMeasurement, "lab_queue": LabQueueItem, "reviews": Review,
+    }
+    return {
+        name: (db.query(func.max(model.id)).scalar() or 0) + 1
+        for name, model in models.items()
+    }
+
+
+def _reset_sequences(connection, tables: list):
+    cursor = connection.cursor()
+    for table in tables:
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        )
+    cursor.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Seed the EcoTrace database with synthetic data")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--manufacturers", type=int, default=50)
+    parser.add_argument("--transporters", type=int, default=100)
+    parser.add_argument("--labs", type=int, default=20)
+    parser.add_argument("--consumers", type=int, default=1000)
+    parser.add_argument("--materials", type=int, default=500)
+    parser.add_argument("--products-per-manufacturer", type=int, default=20)
+    parser.add_argument("--batches-per-product", type=int, default=20)
+    parser.add_argument("--max-legs", type=int, default=4)
+    parser.add_argument("--max-reviews-per-batch", type=int, default=5)
+    parser.add_argument("--no-change-ratio", type=float, default=0.5)
+    parser.add_argument("--minor-change-ratio", type=float, default=0.3)
+    parser.add_argument("--password", default="password123")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    init_db()
+
+    db = SessionLocal()
+    start_ids = _start_ids(db)
+    locations = dict(db.query(Location.key, Location.id).all())
+    db.close()
+
+    dialect = engine.dialect.name
+    started = time.perf_counter()
+
+    raw = engine.raw_connection()
+    try:
+        if dialect == "sqlite":
+            raw.execute("PRAGMA synchronous = OFF")
+
+        writer = BulkWriter(raw, dialect)
+        generator = SeedGenerator(args, writer, start_ids, locations)
+
+        users = generator.users()
+        materials = generator.materials()
+        generator.flush()
+
+        generator.products_and_batches(users, materials)
+        generator.flush()
+
+        if dialect == "postgresql":
+            # lab_report_bodies is keyed by hash and has no sequence
+            _reset_sequences(raw, [t for t in writer.counts if t in start_ids])
+
+        raw.commit()
+    except Exception:
+        raw.rollback()
+        logger.exception("Seeding failed")
+        raise
+    finally:
+        raw.close()
+
+    # Seeded rows bypass the outbox, so derive the analytics buckets in one pass
+    with engine.begin() as conn:
+        writer.counts["emission_buckets"] = emission_buckets.rebuild(conn)
+
+    elapsed = time.perf_counter() - started
+    total = sum(writer.counts.values())
+
+    for table, count in writer.counts.items():
+        logger.info(f"{table}: {count} rows")
+    logger.info(f"Seeded {total} rows in {elapsed:.2f}s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
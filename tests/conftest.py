@@ -0,0 +1,65 @@
+import itertools
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Settings are read at import time: point the app at a throwaway SQLite
+# database and the in-process LLM before anything under app/ is imported
+os.environ.setdefault("DEBUG", "true")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("APP_BASE_URL", "http://testserver")
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("LOG_FORMAT", "text")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp(prefix="ecotrace-tests-"))
+
+
+@pytest.fixture
+def db():
+    from app.database import SessionLocal, init_db
+    from app.services import content_versions, outbox
+
+    init_db()
+    content_versions.install()
+    outbox.install()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+_names = itertools.count(1)
+
+
+@pytest.fixture
+def make_user(db):
+    """make_user(role) -> committed User with a unique email."""
+    from app.models.user import User, UserRole
+
+    def make(role=UserRole.manufacturer):
+        n = next(_names)
+        user = User(name=f"user{n}", email=f"user{n}@test", password="x", role=role)
+        db.add(user)
+        db.commit()
+        return user
+
+    return make
+
+
+@pytest.fixture
+def make_product(db, make_user):
+    """make_product(manufacturer=None) -> committed Product."""
+    from app.models.product import Product
+
+    def make(manufacturer=None):
+        manufacturer = manufacturer or make_user()
+        product = Product(name=f"product{next(_names)}", brand="B", manufacturer_id=manufacturer.id)
+        db.add(product)
+        db.commit()
+        return product
+
+    return make
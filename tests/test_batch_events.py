@@ -0,0 +1,44 @@
+from datetime import datetime
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.core.security import create_access_token
+from app.main import app
+from app.models.batch import Batch
+from app.models.user import UserRole
+from app.routes import batches
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # TestClient buffers the whole body, so stand in for the endless SSE stream
+    monkeypatch.setattr(
+        batches, "_event_stream_response",
+        lambda request, topic, batch_ids: JSONResponse({"topic": topic}),
+    )
+    return TestClient(app)
+
+
+def _auth(user):
+    return {"Authorization": f"Bearer {create_access_token(user.id, user.role.value)}"}
+
+
+def test_batch_event_stream_access(db, client, make_user, make_product):
+    owner = make_user()
+    product = make_product(owner)
+    batch = Batch(product_id=product.id, batch_code="SSE-1", manufacture_date=datetime(2025, 1, 1))
+    db.add(batch)
+    db.commit()
+    path = f"/api/batches/{batch.id}/events"
+
+    for user, status in [
+        (owner, 200),
+        (make_user(UserRole.admin), 200),
+        (make_user(), 404),  # another manufacturer
+    ]:
+        assert client.get(path, headers=_auth(user)).status_code == status
+
+    missing = client.get("/api/batches/999999/events", headers=_auth(make_user(UserRole.admin)))
+    assert missing.status_code == 404
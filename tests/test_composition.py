@@ -0,0 +1,69 @@
+import hashlib
+import uuid
+from datetime import datetime
+
+import pytest
+
+import app.crud.batch as crud_batch
+from app.models.ai_score import AIScore
+from app.models.batch import ValidationStatus
+from app.schemas.batch import BatchCreate
+from app.services.composition import composition_vector, composition_fingerprint, parse_vector
+
+
+def test_vector_is_order_independent_and_rounded():
+    vector = composition_vector([(7, 40), (3, 59.999)])
+
+    assert vector == "3:60.00;7:40.00"
+    assert composition_vector([(3, 60.0), (7, 40.004)]) == vector
+    assert composition_vector([]) is None
+
+
+def test_fingerprint_and_parse_round_trip():
+    vector = "3:60.00;7:40.00"
+
+    assert composition_fingerprint(vector) == hashlib.sha256(vector.encode()).hexdigest()
+    assert composition_fingerprint(None) is None
+    assert parse_vector(vector) == [
+        {"material_id": 3, "percentage": 60.0},
+        {"material_id": 7, "percentage": 40.0},
+    ]
+    assert parse_vector(None) == []
+
+
+@pytest.fixture
+def create(db, monkeypatch):
+    """create(product, code, materials) -> (Batch, its AIScore or None)."""
+    monkeypatch.setattr(
+        crud_batch, "generate_ai_rating",
+        lambda product, batch, materials: {"rating": 55.0, "reasoning": batch.batch_code},
+    )
+
+    def make(product, code, materials):
+        product_id, manufacturer_id = product.id, product.manufacturer_id
+        db.commit()  # create_batch opens its own transaction
+        batch, _ = crud_batch.create_batch(db, product_id, manufacturer_id, BatchCreate(
+            batch_code=code, manufacture_date=datetime(2025, 1, 1), materials=materials,
+        ))
+        score = db.query(AIScore).filter(AIScore.batch_id == batch.id).order_by(AIScore.id.desc()).first()
+        return batch, score
+
+    return make
+
+
+def test_repeat_of_an_older_composition_reuses_its_score(create, make_product):
+    cotton, wool = f"Cotton {uuid.uuid4().hex[:6]}", f"Wool {uuid.uuid4().hex[:6]}"
+    product = make_product()
+
+    first, first_score = create(product, "FP-1", [
+        {"name": cotton, "percentage": 70}, {"name": wool, "percentage": 30},
+    ])
+    create(product, "FP-2", [{"name": wool, "percentage": 100}])
+    # Same mix as FP-1 in another order, after a different batch in between
+    repeat, repeat_score = create(product, "FP-3", [
+        {"name": wool, "percentage": 30.001}, {"name": cotton, "percentage": 70},
+    ])
+
+    assert repeat.composition_fingerprint == first.composition_fingerprint
+    assert repeat.validation_status == ValidationStatus.auto_verified
+    assert (repeat_score.rating, repeat_score.reasoning) == (first_score.rating, first_score.reasoning)
@@ -0,0 +1,68 @@
+from datetime import datetime
+
+import pytest
+
+from app.crud.product import get_manufacturer_dashboard, invalidate_manufacturer_dashboard
+from app.models.batch import Batch
+from app.utils.ttl_cache import TTLCache
+
+
+@pytest.fixture
+def manufacturer(make_user):
+    user = make_user()
+    yield user
+    invalidate_manufacturer_dashboard(user.id)
+
+
+def _add_batch(db, product, code, created_at):
+    batch = Batch(product_id=product.id, batch_code=code, created_at=created_at)
+    db.add(batch)
+    db.commit()
+    return batch
+
+
+def test_one_row_per_product_with_its_latest_batch(db, manufacturer, make_product):
+    busy, idle = make_product(manufacturer), make_product(manufacturer)
+    same_time = datetime(2025, 3, 1)
+    _add_batch(db, busy, "OLD", datetime(2025, 1, 1))
+    _add_batch(db, busy, "TIE-1", same_time)
+    latest = _add_batch(db, busy, "TIE-2", same_time)
+
+    dashboard = get_manufacturer_dashboard(db, manufacturer.id)
+
+    assert (dashboard["total_products"], dashboard["total_batches"]) == (2, 3)
+    rows = {row["id"]: row for row in dashboard["products"]}
+    assert rows[busy.id]["batch_count"] == 3
+    assert (rows[busy.id]["last_batch_id"], rows[busy.id]["last_batch_code"]) == (latest.id, "TIE-2")
+    assert rows[idle.id]["batch_count"] == 0
+    assert rows[idle.id]["last_batch_id"] is None
+
+
+def test_dashboard_is_cached_until_invalidated(db, manufacturer, make_product):
+    product = make_product(manufacturer)
+    assert get_manufacturer_dashboard(db, manufacturer.id)["total_batches"] == 0
+
+    _add_batch(db, product, "NEW", datetime(2025, 1, 1))
+    assert get_manufacturer_dashboard(db, manufacturer.id)["total_batches"] == 0
+
+    invalidate_manufacturer_dashboard(manufacturer.id)
+    assert get_manufacturer_dashboard(db, manufacturer.id)["total_batches"] == 1
+
+
+def test_computation_racing_an_invalidation_is_not_stored():
+    cache = TTLCache(60)
+
+    def compute():
+        cache.invalidate("key")  # a write lands while computing
+        return "stale"
+
+    assert cache.get_or_compute("key", compute) == "stale"
+    assert cache.get("key") is None
+    assert cache.get_or_compute("key", lambda: "fresh") == "fresh"
+    assert cache.get("key") == "fresh"
+
+
+def test_zero_ttl_disables_caching():
+    cache = TTLCache(0)
+    cache.put("key", "value")
+    assert cache.get("key") is None
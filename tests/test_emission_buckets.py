@@ -0,0 +1,121 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import select
+
+from app.models.batch import Batch
+from app.models.emission_bucket import EmissionBucket
+from app.models.transport import Transport
+from app.models.user import UserRole
+from app.services import emission_buckets
+
+# An old range no other test writes transports into
+MARCH = (date(2020, 3, 1), date(2020, 3, 31))
+
+
+@pytest.fixture
+def shipments(db, make_user, make_product):
+    """A product with two transporters' transports spread over March 2020."""
+    product = make_product()
+    batch = Batch(product_id=product.id, batch_code="BUCKET-1", manufacture_date=datetime(2020, 2, 1))
+    truck, ship = make_user(UserRole.transporter), make_user(UserRole.transporter)
+    db.add(batch)
+    db.flush()
+
+    def ship_on(day, transporter, fuel, distance, emission):
+        db.add(Transport(
+            batch_id=batch.id,
+            transporter_id=transporter.id,
+            origin="A",
+            destination="B",
+            distance_km=distance,
+            fuel_type=fuel,
+            transport_emission=emission,
+            created_at=datetime(2020, 3, day, 12),
+        ))
+
+    ship_on(2, truck, "Diesel", 100, 10)
+    ship_on(2, truck, "diesel ", 50, 5)
+    ship_on(2, ship, "Natural Gas", 200, 8)
+    ship_on(3, ship, "natural-gas", 300, 12)
+    ship_on(16, truck, "Diesel", 10, 1)
+    db.commit()
+
+    emission_buckets.rebuild(db.connection(), *MARCH)
+    db.commit()
+    return product, truck, ship
+
+
+def _buckets(db, product_id):
+    return {
+        (row.day, row.transporter_id, row.fuel_type): (row.transports, row.distance_km, row.emission)
+        for row in db.scalars(select(EmissionBucket).where(EmissionBucket.product_id == product_id))
+    }
+
+
+def test_rebuild_aggregates_per_day_transporter_and_fuel(db, shipments):
+    product, truck, ship = shipments
+
+    assert _buckets(db, product.id) == {
+        (date(2020, 3, 2), truck.id, "diesel"): (2, 150, 15),
+        (date(2020, 3, 2), ship.id, "natural_gas"): (1, 200, 8),
+        (date(2020, 3, 3), ship.id, "natural_gas"): (1, 300, 12),
+        (date(2020, 3, 16), truck.id, "diesel"): (1, 10, 1),
+    }
+
+
+def test_refresh_cells_recomputes_only_the_touched_days(db, shipments):
+    product, truck, ship = shipments
+    day_two = datetime(2020, 3, 2, 12)
+
+    for transport in db.scalars(select(Transport).where(Transport.created_at == day_two)):
+        db.delete(transport)
+    db.query(Transport).filter(Transport.created_at == datetime(2020, 3, 16, 12)).update({"distance_km": 999})
+    db.commit()
+
+    assert emission_buckets.refresh_cells(db.connection(), [(product.id, date(2020, 3, 2))]) == 1
+    db.commit()
+
+    assert _buckets(db, product.id) == {
+        (date(2020, 3, 3), ship.id, "natural_gas"): (1, 300, 12),
+        (date(2020, 3, 16), truck.id, "diesel"): (1, 10, 1),  # not refreshed
+    }
+
+
+def test_series_folds_days_into_zero_filled_weeks(db, shipments):
+    product, truck, ship = shipments
+
+    result = emission_buckets.series(db, *MARCH, interval="week", product_id=product.id)
+
+    assert result["interval"] == "week"
+    (line,) = result["series"]
+    weeks = {point["period"]: point["emission"] for point in line["points"]}
+    assert weeks[date(2020, 3, 2)] == 35
+    assert weeks[date(2020, 3, 9)] == 0
+    assert weeks[date(2020, 3, 16)] == 1
+    assert result["totals"] == {
+        "transports": 5,
+        "distance_km": 660,
+        "emission": 36,
+        "avg_emission_per_km": round(36 / 660, 4),
+    }
+
+
+def test_series_groups_and_coarsens(db, shipments):
+    product, truck, ship = shipments
+
+    result = emission_buckets.series(
+        db, *MARCH, group_by="transporter", product_id=product.id, fuel_type="Natural Gas", max_points=6,
+    )
+
+    assert result["interval"] == "week"  # 31 days do not fit in 6 points; six weeks do
+    (line,) = result["series"]
+    assert (line["key"], line["label"]) == (ship.id, ship.name)
+    assert result["totals"]["emission"] == 20
+
+
+def test_series_rejects_bad_arguments(db):
+    with pytest.raises(ValueError):
+        emission_buckets.series(db, interval="hour")
+    with pytest.raises(ValueError):
+        emission_buckets.series(db, date(2020, 3, 2), date(2020, 3, 1))
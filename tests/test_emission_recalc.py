@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import pytest
+
+from app.models.batch import Batch
+from app.models.transport import Transport
+from app.services import emission_recalc
+from app.services.emission_recalc import compute_emissions, diff_chunk
+
+
+def test_compute_emissions_uses_pair_then_fuel_then_default_factors():
+    result = compute_emissions(
+        [100, 100, 100, 10],
+        ["Diesel", "diesel", "hydrogen", "Natural Gas"],
+        ["Truck", None, None, "truck"],
+    )
+
+    assert result.tolist() == [90.0, 27.0, 25.0, 7.5]
+
+
+def test_diff_chunk_reports_changed_batches_only():
+    # (id, batch_id, distance_km, fuel_type, vehicle_type, transport_emission)
+    rows = [
+        (1, 10, 100, "diesel", "truck", 90.0),
+        (2, 10, 100, "diesel", None, 27.004),  # within tolerance
+        (3, 11, 100, "diesel", "truck", 20.0),
+        (4, 11, 50, "petrol", "car", 9.5),
+    ]
+
+    new, changed, diff = diff_chunk(rows)
+
+    assert changed.tolist() == [False, False, True, False]
+    assert diff == [(11, 1, 29.5, 99.5)]
+
+
+@pytest.fixture
+def stale_batch(db, make_product, make_user):
+    """A batch whose first transport was stored with an outdated emission."""
+    batch = Batch(product_id=make_product().id, batch_code="RECALC-1", manufacture_date=datetime(2025, 1, 1))
+    db.add(batch)
+    db.flush()
+    transporter = make_user()
+    for emission in (12.0, 90.0):
+        db.add(Transport(
+            batch_id=batch.id, transporter_id=transporter.id, origin="A", destination="B",
+            distance_km=100, fuel_type="diesel", vehicle_type="truck", transport_emission=emission,
+        ))
+    db.commit()
+    return batch
+
+
+def test_dry_run_lists_the_diff_without_writing(db, stale_batch):
+    run = emission_recalc.recalculate(db, dry_run=True, chunk_size=1)
+
+    assert (stale_batch.id, 1, 102.0, 180.0) in run.diff
+    assert run.status == "completed"
+    emissions = sorted(t.transport_emission for t in db.query(Transport).filter_by(batch_id=stale_batch.id))
+    assert emissions == [12.0, 90.0]
+
+
+def test_next_chunk_keeps_a_batch_whole(db, stale_batch):
+    rows = emission_recalc._next_chunk(db, stale_batch.id - 1, limit=1)
+
+    assert [row.batch_id for row in rows] == [stale_batch.id, stale_batch.id]
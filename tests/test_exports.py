@@ -0,0 +1,76 @@
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from app.core.security import create_access_token
+from app.main import app
+from app.models.batch import Batch
+from app.utils import export
+from app.utils.export import iter_csv, iter_ndjson
+
+
+class Colour(enum.Enum):
+    green = "green"
+
+
+ROWS = [
+    {"id": 1, "when": datetime(2025, 1, 2, 3, 4), "colour": Colour.green, "tags": ["a", "b"], "note": None},
+    {"id": 2, "when": None, "colour": None, "tags": [], "note": 'says "hi", twice'},
+    {"id": 3, "when": None, "colour": None, "tags": None, "note": "x"},
+]
+
+
+def test_csv_is_encoded_and_flushed_in_chunks(monkeypatch):
+    monkeypatch.setattr(export, "CHUNK_ROWS", 2)
+
+    chunks = list(iter_csv(iter(ROWS), ["id", "when", "colour", "tags", "note"]))
+
+    assert len(chunks) == 2
+    assert list(csv.reader(io.StringIO("".join(chunks)))) == [
+        ["id", "when", "colour", "tags", "note"],
+        ["1", "2025-01-02T03:04:00", "green", '["a", "b"]', ""],
+        ["2", "", "", "[]", 'says "hi", twice'],
+        ["3", "", "", "", "x"],
+    ]
+
+
+def test_ndjson_writes_one_object_per_line(monkeypatch):
+    monkeypatch.setattr(export, "CHUNK_ROWS", 2)
+
+    chunks = list(iter_ndjson(iter(ROWS)))
+
+    assert len(chunks) == 2
+    lines = "".join(chunks).splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 2, 3]
+    assert json.loads(lines[0])["when"] == "2025-01-02T03:04:00"
+    assert list(iter_ndjson([])) == []
+
+
+def test_batch_export_is_scoped_to_the_manufacturer(db, make_user, make_product):
+    owner = make_user()
+    mine = make_product(owner)
+    theirs = make_product()
+    db.add_all([
+        Batch(product_id=mine.id, batch_code="EXPORT-MINE", manufacture_date=datetime(2025, 1, 1)),
+        Batch(product_id=theirs.id, batch_code="EXPORT-THEIRS", manufacture_date=datetime(2025, 1, 1)),
+    ])
+    db.commit()
+    token = create_access_token(owner.id, owner.role.value)
+
+    response = TestClient(app).get(
+        "/api/exports/batches",
+        params={"format": "ndjson"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert 'filename="batches.ndjson"' in response.headers["content-disposition"]
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [(row["batch_code"], row["product_name"], row["materials"]) for row in rows] == [
+        ("EXPORT-MINE", mine.name, []),
+    ]
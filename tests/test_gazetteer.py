@@ -0,0 +1,51 @@
+import math
+
+import pytest
+
+from app.services import gazetteer
+from app.services.gazetteer import Gazetteer, leg_distance, leg_distances, normalize_place, resolve
+
+
+def test_free_text_resolves_by_alias_accents_and_parts():
+    assert normalize_place("  São-Paulo!! ") == "sao paulo"
+    assert resolve("Bombay").name == "Mumbai"
+    assert resolve("São Paulo").country == "BR"
+    assert resolve("Factory A, Mumbai").name == "Mumbai"
+    assert resolve("Atlantis") is None
+
+
+def test_leg_distance_is_great_circle_times_circuity():
+    direct = leg_distance("London", "Paris")
+
+    assert direct == pytest.approx(343.5, abs=1)
+    assert leg_distance("Paris", "London") == direct
+    assert leg_distance("London", "Paris", "Truck") == pytest.approx(direct * 1.3, abs=0.1)
+    assert leg_distance("London", "Atlantis") is None
+
+
+def test_bulk_distances_match_single_legs():
+    origins = ["London", "Mumbai", "Atlantis"]
+    destinations = ["Paris", "Rotterdam", "Paris"]
+    vehicles = ["truck", "ship", "truck"]
+
+    km = leg_distances(origins, destinations, vehicles)
+
+    assert km[:2].tolist() == [leg_distance(o, d, v) for o, d, v in zip(origins[:2], destinations[:2], vehicles[:2])]
+    assert math.isnan(km[2])
+
+
+def test_local_rows_take_precedence_and_are_searchable():
+    places = Gazetteer([
+        {"name": "Port Alpha", "country": "XX", "kind": "port", "lat": "10", "lon": "20", "aliases": "PA|Alpha Harbour"},
+        {"name": "Port Beta", "country": "XX", "kind": "port", "lat": "-10", "lon": "20", "aliases": "PA"},
+    ])
+
+    assert places.lookup("pa") == 0  # first row wins a shared alias
+    assert places.lookup("Port Beta XX") == 1
+    assert [p.name for p in places.search("port")] == ["Port Alpha", "Port Beta"]
+    assert places.place(1).lat == -10
+
+
+def test_unknown_vehicle_types_use_the_straight_line():
+    assert gazetteer.circuity("hovercraft") == 1.0
+    assert gazetteer.circuity(None) == 1.0
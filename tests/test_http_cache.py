@@ -0,0 +1,63 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.batch import Batch
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def batch(db, make_product):
+    batch = Batch(product_id=make_product().id, batch_code="ETAG-1", manufacture_date=datetime(2025, 1, 1))
+    db.add(batch)
+    db.commit()
+    return batch
+
+
+def test_passport_revalidates_with_etag(client, batch):
+    path = f"/api/batch/{batch.id}"
+
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag == f'W/"passport-{batch.id}-1"'
+
+    cached = client.get(path, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+
+    assert client.get(path, headers={"If-None-Match": 'W/"passport-0-0"'}).status_code == 200
+
+
+def test_passport_changes_bump_the_version(db, client, batch):
+    path = f"/api/batch/{batch.id}"
+    etag = client.get(path).headers["etag"]
+
+    batch.product.name = "Renamed"
+    db.commit()
+
+    fresh = client.get(path, headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] == f'W/"passport-{batch.id}-2"'
+    assert fresh.json()["product"]["name"] == "Renamed"
+
+    modified = fresh.headers["last-modified"]
+    assert client.get(path, headers={"If-Modified-Since": modified}).status_code == 304
+
+
+def test_unrelated_writes_keep_the_etag(db, client, batch, make_product):
+    path = f"/api/batch/{batch.id}"
+    etag = client.get(path).headers["etag"]
+
+    other = make_product()
+    other.name = "Other"
+    db.commit()
+
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+from scripts import check_import_time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def measurement():
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("PYTHONPATH", ROOT)
+        result = check_import_time.measure("app.main", runs=5)
+        if result[0] > check_import_time.DEFAULT_BUDGET_MS:
+            # Noise from other load only ever adds time: take more samples
+            # before calling it a regression
+            retry = check_import_time.measure("app.main", runs=10)
+            result = min(result, retry, key=lambda r: r[0])
+        return result
+
+
+def test_heavy_modules_stay_off_the_startup_path(measurement):
+    _, _, imported = measurement
+    assert [m for m in check_import_time.FORBIDDEN_MODULES if m in imported] == []
+
+
+def test_app_import_within_budget(measurement):
+    total_ms, rows, _ = measurement
+    slowest = ", ".join(f"{name} {cumulative / 1000:.0f} ms" for cumulative, name in rows[1:6])
+    assert total_ms <= check_import_time.DEFAULT_BUDGET_MS, f"{total_ms:.0f} ms; slowest: {slowest}"
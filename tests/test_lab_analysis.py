@@ -0,0 +1,70 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.crud.lab_report import list_parameters, search_reports
+from app.models.batch import Batch
+from app.models.lab_report import LabReport
+from app.models.user import UserRole
+from app.services.lab_analysis import extract_measurements, parameter_key
+from app.services.report_bodies import store_body
+
+
+def test_extract_measurements_reads_numeric_lines_only():
+    analysis = [
+        {"title": "Metals", "content": "Lead: 0.4 ppm\nCadmium: <0.01 mg/kg\nLooks clean overall"},
+        {"title": "Chemistry", "content": "pH = 6,8\nMoisture: 1e-2"},
+        "not a section",
+    ]
+
+    assert [(m["section"], m["parameter"], m["value"], m["unit"]) for m in extract_measurements(analysis)] == [
+        ("Metals", "Lead", 0.4, "ppm"),
+        ("Metals", "Cadmium", 0.01, "mg/kg"),
+        ("Chemistry", "pH", 6.8, None),
+        ("Chemistry", "Moisture", 0.01, None),
+    ]
+    assert extract_measurements(None) == []
+    assert parameter_key("  Heavy   METAL ") == "heavy metal"
+
+
+@pytest.fixture
+def reports(db, make_user, make_product):
+    """Two labs' reports measuring a parameter no other test uses."""
+    parameter = f"Zinc {uuid.uuid4().hex[:6]}"
+    lab_a, lab_b = make_user(UserRole.lab), make_user(UserRole.lab)
+    batch = Batch(product_id=make_product().id, batch_code="ANALYSIS-1", manufacture_date=datetime(2025, 1, 1))
+    db.add(batch)
+    db.flush()
+
+    def report(lab, value, section="Metals"):
+        body = store_body(db, [{"title": section, "content": f"{parameter}: {value} ppm"}])
+        row = LabReport(batch_id=batch.id, lab_id=lab.id, body_hash=body, lab_score=4)
+        db.add(row)
+        return row
+
+    low, high, other = report(lab_a, 1.5), report(lab_a, 9), report(lab_b, 5, section="Trace")
+    db.commit()
+    return parameter, lab_a, lab_b, low, high, other
+
+
+def test_search_filters_by_parameter_range_and_lab(db, reports):
+    parameter, lab_a, lab_b, low, high, other = reports
+
+    def found(lab_id, **filters):
+        items, total = search_reports(db, lab_id, 0, 50, parameter=parameter.upper(), **filters)
+        assert total == len(items)
+        return {item.id for item in items}
+
+    assert found(None) == {low.id, high.id, other.id}
+    assert found(None, min_value=2, max_value=9) == {high.id, other.id}
+    assert found(lab_a.id, min_value=2) == {high.id}
+    assert found(None, section="Trace") == {other.id}
+
+
+def test_parameter_summary_per_lab(db, reports):
+    parameter, lab_a, lab_b, low, high, other = reports
+
+    rows = [row for row in list_parameters(db, lab_a.id) if row.parameter == parameter]
+
+    assert [(row.unit, row.reports, row.min_value, row.max_value) for row in rows] == [("ppm", 2, 1.5, 9)]
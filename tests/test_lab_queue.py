@@ -0,0 +1,144 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.core.security import create_access_token
+from app.main import app
+from app.models.batch import Batch, ValidationStatus
+from app.models.user import UserRole
+
+
+@pytest.fixture
+def make_lab_batch(db, make_product):
+    """make_lab_batch() -> committed lab_required Batch with a unique code."""
+
+    def make():
+        batch = Batch(
+            product_id=make_product().id,
+            batch_code=f"LAB-{uuid.uuid4().hex[:8]}",
+            manufacture_date=datetime(2025, 1, 1),
+            validation_status=ValidationStatus.lab_required,
+            composition_vector="1:100.0",
+            composition_fingerprint="f" * 64,
+        )
+        db.add(batch)
+        db.commit()
+        return batch
+
+    return make
+
+
+def _auth(user):
+    return {"Authorization": f"Bearer {create_access_token(user.id, user.role.value)}"}
+
+
+def test_pending_tests_expose_only_public_batch_fields(db, make_user, make_lab_batch):
+    batch = make_lab_batch()
+    lab = make_user(UserRole.lab)
+
+    response = TestClient(app).get(
+        "/api/labs/pending-tests",
+        params={"search": batch.batch_code},
+        headers=_auth(lab),
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 1
+    (item,) = body["items"]
+    assert item["batch_code"] == batch.batch_code
+    assert item["validation_status"] == "lab_required"
+    assert item["product"]["id"] == batch.product_id
+    for internal in ("composition_vector", "composition_fingerprint", "version", "review_version"):
+        assert internal not in item
+
+
+# ==========================================================
+# CLAIMS / LEASES
+# ==========================================================
+
+@pytest.fixture
+def queued(db, make_lab_batch):
+    """queued(risk) -> committed LabQueueItem for a fresh lab_required batch."""
+    from app.crud.lab_queue import enqueue_batch
+
+    def make(risk="low"):
+        item = enqueue_batch(db, make_lab_batch(), [risk])
+        db.commit()
+        return item
+
+    return make
+
+
+@pytest.fixture
+def empty_queue(db):
+    from app.models.lab_queue import LabQueueItem
+
+    db.query(LabQueueItem).delete()
+    db.commit()
+
+
+def test_claim_orders_by_risk_then_age(db, make_user, queued, empty_queue):
+    from app.crud.lab_queue import claim_items
+
+    low = queued("low")
+    high = queued("high")
+
+    claimed = claim_items(db, make_user(UserRole.lab).id, 2)
+
+    assert [item.id for item in claimed] == [high.id, low.id]
+    assert all(item.attempts == 1 for item in claimed)
+
+
+def test_claimed_items_are_skipped_by_other_labs(db, make_user, queued, empty_queue):
+    from app.crud.lab_queue import claim_items, claimed_by_others
+    from app.models.batch import Batch
+
+    first, second = queued(), queued()
+    lab_a, lab_b = make_user(UserRole.lab), make_user(UserRole.lab)
+
+    (mine,) = claim_items(db, lab_a.id, 1)
+    (theirs,) = claim_items(db, lab_b.id, 5)
+
+    assert {mine.id, theirs.id} == {first.id, second.id}
+    assert claim_items(db, make_user(UserRole.lab).id, 5) == []
+    hidden = db.query(Batch.id).filter(Batch.id.in_(claimed_by_others(lab_a.id))).all()
+    assert [row.id for row in hidden] == [theirs.batch_id]
+
+
+def test_expired_lease_returns_to_the_queue(db, make_user, queued, empty_queue):
+    from app.crud.lab_queue import claim_items, queue_stats, renew_claim
+
+    item = queued()
+    lab_a, lab_b = make_user(UserRole.lab), make_user(UserRole.lab)
+    claim_items(db, lab_a.id, 1)
+
+    db.refresh(item)
+    item.lease_expires_at = datetime.utcnow() - timedelta(minutes=1)
+    db.commit()
+    assert queue_stats(db)["expired_leases"] == 1
+
+    (reclaimed,) = claim_items(db, lab_b.id, 1)
+    assert reclaimed.id == item.id
+    assert reclaimed.claimed_by == lab_b.id
+    assert reclaimed.attempts == 2
+
+    with pytest.raises(HTTPException) as exc:
+        renew_claim(db, item.id, lab_a.id)
+    assert exc.value.status_code == 409
+
+
+def test_release_makes_the_item_claimable(db, make_user, queued, empty_queue):
+    from app.crud.lab_queue import claim_items, release_claim
+
+    item = queued()
+    lab_a, lab_b = make_user(UserRole.lab), make_user(UserRole.lab)
+    claim_items(db, lab_a.id, 1)
+
+    release_claim(db, item.id, lab_a.id)
+
+    (reclaimed,) = claim_items(db, lab_b.id, 1)
+    assert reclaimed.id == item.id
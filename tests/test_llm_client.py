@@ -0,0 +1,197 @@
+import threading
+import time
+
+import pytest
+
+from app.services import llm_client
+from app.services.llm_client import CircuitBreaker, LLMGovernor, LLMUnavailable, SingleFlight, canonical_key
+
+
+class StubProvider:
+    """Fails while `failing` is set; otherwise echoes the prompt."""
+
+    name = "stub"
+
+    def __init__(self):
+        self.failing = False
+        self.calls = 0
+
+    def generate(self, prompt, generation_config=None, timeout=None):
+        self.calls += 1
+        if self.failing:
+            raise RuntimeError("provider down")
+        return f"ok: {prompt}"
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    stub = StubProvider()
+    monkeypatch.setattr(llm_client, "_provider", stub)
+    return stub
+
+
+@pytest.fixture
+def governor(monkeypatch, provider):
+    monkeypatch.setattr(llm_client, "LLM_MAX_RETRIES", 0)
+    monkeypatch.setattr(llm_client, "LLM_BREAKER_THRESHOLD", 2)
+    monkeypatch.setattr(llm_client, "LLM_BREAKER_COOLDOWN_SECONDS", 0.05)
+    monkeypatch.setattr(llm_client, "LLM_RATE_PER_MINUTE", 60_000)
+    return LLMGovernor()
+
+
+# =====================================================
+# CIRCUIT BREAKER
+# =====================================================
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(threshold=3, cooldown=60)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # resets the streak
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_half_open_breaker_admits_one_probe():
+    breaker = CircuitBreaker(threshold=1, cooldown=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()  # probe already out
+
+    breaker.release()  # probe never sent
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_governor_sheds_calls_while_open_and_recovers(governor, provider):
+    provider.failing = True
+    for _ in range(2):
+        with pytest.raises(LLMUnavailable):
+            governor.generate("p")
+
+    with pytest.raises(LLMUnavailable, match="circuit open"):
+        governor.generate("p")
+    assert provider.calls == 2
+    assert governor.metrics()["rejected_circuit_open"] == 1
+
+    time.sleep(0.06)
+    provider.failing = False
+    assert governor.generate("p") == "ok: p"
+
+    metrics = governor.metrics()
+    assert metrics["circuit"] == {"state": "closed", "consecutive_failures": 0}
+    assert (metrics["successes"], metrics["failures"]) == (1, 2)
+
+
+def test_governor_rate_limit_gives_back_the_probe(monkeypatch, governor, provider):
+    monkeypatch.setattr(llm_client, "LLM_QUEUE_TIMEOUT_SECONDS", 0)
+    governor.bucket = llm_client.TokenBucket(rate=0, capacity=1)
+
+    assert governor.generate("p") == "ok: p"
+    with pytest.raises(LLMUnavailable, match="rate limit"):
+        governor.generate("p")
+    assert governor.metrics()["rejected_rate_limit"] == 1
+    assert provider.calls == 1
+
+
+# =====================================================
+# SINGLE FLIGHT
+# =====================================================
+
+def _concurrently(n, target):
+    threads = [threading.Thread(target=target) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+
+def test_single_flight_shares_one_call_between_concurrent_callers():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls, results = [], []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return "answer"
+
+    def caller():
+        results.append(flight.do("key", slow))
+
+    def leader_finishes_once_all_joined():
+        while flight.coalesced < 3:
+            time.sleep(0.001)
+        release.set()
+
+    threading.Thread(target=leader_finishes_once_all_joined, daemon=True).start()
+    _concurrently(4, caller)
+
+    assert calls == [1]
+    assert results == ["answer"] * 4
+    assert flight.coalesced == 3
+    assert flight.in_flight() == 0
+
+
+def test_single_flight_shares_exceptions_and_forgets_the_key():
+    flight = SingleFlight()
+
+    def boom():
+        raise LLMUnavailable("down")
+
+    with pytest.raises(LLMUnavailable):
+        flight.do("key", boom)
+    assert flight.do("key", lambda: "retried") == "retried"  # nothing cached
+
+
+def test_canonical_key_ignores_dict_order():
+    assert canonical_key({"a": 1, "b": [1, 2]}, 3) == canonical_key({"b": [1, 2], "a": 1}, 3)
+    assert canonical_key({"a": 1}) != canonical_key({"a": 2})
+
+
+def test_ai_ratings_for_the_same_composition_share_one_call(monkeypatch):
+    from types import SimpleNamespace
+
+    from app.services import ai_engine
+
+    prompts, results = [], []
+    release = threading.Event()
+
+    def rate(prompt):
+        prompts.append(prompt)
+        release.wait(5)
+        return {"rating": 70.0, "reasoning": "shared"}
+
+    monkeypatch.setattr(ai_engine, "_rate", rate)
+    monkeypatch.setattr(llm_client, "single_flight", SingleFlight())
+
+    product = {"name": "Soap", "brand": "B"}
+    cotton, wool = {"name": "cotton", "percentage": 60}, {"name": "wool", "percentage": 40}
+    orders = iter([[cotton, wool], [wool, cotton]])
+
+    def caller():
+        batch = SimpleNamespace(batch_code="B1", created_at=None)
+        results.append(ai_engine.generate_ai_rating(product, batch, next(orders)))
+
+    def leader_finishes_once_joined():
+        while llm_client.single_flight.coalesced < 1:
+            time.sleep(0.001)
+        release.set()
+
+    threading.Thread(target=leader_finishes_once_joined, daemon=True).start()
+    _concurrently(2, caller)
+
+    assert len(prompts) == 1
+    assert results == [{"rating": 70.0, "reasoning": "shared"}] * 2
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from app.services.llm_providers import (
+    FakeProvider,
+    RecordingProvider,
+    ReplayProvider,
+    create_provider,
+)
+
+RATING_PROMPT = "Rate this composition: cotton 70%, wool 30%"
+EMISSION_PROMPT = "Distance: 120 km\nFuel type: Diesel\nReturn carbon_emission_kg"
+
+
+@pytest.fixture
+def fake():
+    return FakeProvider(latency_ms=0, jitter_ms=0)
+
+
+def test_fake_answers_depend_only_on_the_prompt(fake):
+    first = json.loads(fake.generate(RATING_PROMPT))
+
+    assert json.loads(FakeProvider(latency_ms=0, jitter_ms=0).generate(RATING_PROMPT)) == first
+    assert 30 <= first["rating"] < 95
+    assert json.loads(fake.generate(EMISSION_PROMPT)) == {"emission_factor": 0.27, "carbon_emission_kg": 32.4}
+
+
+def test_fake_injects_errors_and_deadlines():
+    with pytest.raises(RuntimeError):
+        FakeProvider(latency_ms=0, jitter_ms=0, error_rate=1).generate(RATING_PROMPT)
+    with pytest.raises(TimeoutError):
+        FakeProvider(latency_ms=50, jitter_ms=0).generate(RATING_PROMPT, timeout=0.01)
+
+
+def test_recorded_cassette_replays_the_same_answers(tmp_path, fake):
+    cassette = tmp_path / "cassette.jsonl"
+    config = {"temperature": 0.2}
+    recorder = RecordingProvider(fake, path=str(cassette))
+
+    recorded = [recorder.generate(RATING_PROMPT, config), recorder.generate(EMISSION_PROMPT)]
+    replay = ReplayProvider(path=str(cassette), replay_latency=False)
+
+    assert [replay.generate(RATING_PROMPT, config), replay.generate(EMISSION_PROMPT)] == recorded
+    with pytest.raises(KeyError):
+        replay.generate(RATING_PROMPT)  # recorded with a different config
+
+
+def test_create_provider_falls_back_to_gemini():
+    assert create_provider("fake").name == "fake"
+    assert create_provider("nonsense").name == "gemini"
@@ -0,0 +1,74 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+import app.crud.transport as crud_transport
+from app.crud.location import find_location_id, get_location_id, get_location_ids, location_key
+from app.models.batch import Batch
+from app.models.location import Location
+from app.models.user import UserRole
+from app.schemas.transport import TransportCreate
+
+
+def test_location_key_ignores_case_accents_and_punctuation():
+    assert location_key("  São  Paulo, BR ") == location_key("sao-paulo br") == "sao paulo br"
+    assert location_key("東京") == "東京"
+    assert location_key("   ") is None
+
+
+def test_spelling_variants_share_one_location(db):
+    place = f"Depot {uuid.uuid4().hex[:6]}"
+    assert find_location_id(db, place) is None
+
+    ids = get_location_ids(db, [place, place.upper(), f" {place.lower()}. "])
+    db.commit()
+
+    assert len(set(ids.values())) == 1
+    location = db.get(Location, ids[place])
+    assert location.name == place  # first spelling wins
+    assert find_location_id(db, place.lower()) == location.id
+    assert get_location_id(db, place) == location.id
+
+
+@pytest.fixture
+def ship(db, make_user, make_product, monkeypatch):
+    """ship(origin, destination, **fields) -> Transport of a batch made in Mumbai."""
+    # Emissions come from a fixed stub, not the LLM
+    monkeypatch.setattr(crud_transport, "calculate_transport_emission", lambda distance, *args: distance * 0.1)
+    batch = Batch(
+        product_id=make_product().id,
+        batch_code="CHAIN-1",
+        manufacture_date=datetime(2025, 1, 1),
+        manufacturing_location="Mumbai",
+        manufacturing_location_id=get_location_id(db, "Mumbai"),
+    )
+    db.add(batch)
+    db.commit()
+    transporter = make_user(UserRole.transporter)
+
+    def create(origin, destination, **fields):
+        data = TransportCreate(batch_id=batch.id, origin=origin, destination=destination, fuel_type="diesel", **fields)
+        return crud_transport.create_transport(db, data, transporter.id)
+
+    return create
+
+
+def test_transport_chain_matches_locations_not_spellings(ship):
+    first = ship("mumbai", "Rotterdam", vehicle_type="ship")
+    assert first.distance_source == "gazetteer"
+    assert first.distance_km > 6000
+
+    second = ship("ROTTERDAM", "Paris", distance_km=450)
+    assert second.distance_source == "entered"
+    assert second.origin_id == first.destination_id
+
+    with pytest.raises(ValueError, match="Invalid origin"):
+        ship("London", "Paris", distance_km=10)
+    with pytest.raises(ValueError, match="already exists"):
+        ship("Mumbai", "rotterdam.", distance_km=10)
+
+
+def test_unknown_places_need_an_entered_distance(ship):
+    with pytest.raises(ValueError, match="enter distance_km"):
+        ship("Mumbai", f"Nowhere {uuid.uuid4().hex[:6]}")
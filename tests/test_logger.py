@@ -0,0 +1,27 @@
+import os
+import uuid
+
+import pytest
+
+from app.utils import logger as logging_setup
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_child_writes_its_own_records():
+    """Workers forked from a preloaded master still get their logs written."""
+    log = logging_setup.get_logger("fork_test")
+    log.info("parent before fork")  # listener thread now runs in the parent
+
+    marker = f"child-{uuid.uuid4().hex}"
+    pid = os.fork()
+    if pid == 0:
+        try:
+            log.warning(marker)
+            logging_setup._stop_listener()  # drains the child's queue
+        finally:
+            os._exit(0)
+
+    os.waitpid(pid, 0)
+    logging_setup.file_handler.flush()
+    with open("logs/ecotrace.log") as f:
+        assert marker in f.read()
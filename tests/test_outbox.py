@@ -0,0 +1,176 @@
+import json
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select, insert
+
+from app.database import SessionLocal, engine, init_db
+from app.models.ai_score import AIScore
+from app.models.audit_log import AuditLog
+from app.models.outbox import OutboxEvent, OutboxCursor
+from app.models.product import Product
+from app.models.user import User, UserRole
+from app.schemas.batch import BatchCreate
+from app.services import outbox
+import app.crud.batch as crud_batch
+
+
+@pytest.fixture
+def received(monkeypatch):
+    """Events seen by a throwaway process subscriber."""
+    events = []
+    monkeypatch.setitem(outbox.SUBSCRIBERS, "test_probe", outbox.Subscriber(
+        name="test_probe", handler=lambda db, rows: events.extend(rows),
+    ))
+    return events
+
+
+@pytest.fixture
+def dispatcher(monkeypatch, received):
+    init_db()
+    outbox.install()
+    # Worst case: any hole in the ids is given up as a rollback at once
+    monkeypatch.setattr(outbox, "OUTBOX_GAP_SECONDS", 0)
+    dispatcher = outbox.Dispatcher(poll_seconds=0, batch_size=500)
+    dispatcher.prepare()
+    return dispatcher
+
+
+def _manufacturer_product(name: str) -> tuple:
+    db = SessionLocal()
+    try:
+        user = User(name=name, email=f"{name}@test", password="x", role=UserRole.manufacturer)
+        db.add(user)
+        db.flush()
+        product = Product(name=f"{name} shirt", brand="B", manufacturer_id=user.id)
+        db.add(product)
+        db.commit()
+        return user.id, product.id
+    finally:
+        db.close()
+
+
+def _audited(db) -> set:
+    return set(db.execute(select(AuditLog.entity_type, AuditLog.entity_id, AuditLog.action)).all())
+
+
+def test_events_committed_during_slow_scoring_are_delivered(dispatcher, monkeypatch):
+    """
+    A batch whose score escalates to the LLM must not hold its events in an
+    open transaction: a second write commits while the LLM call is still
+    running, the dispatcher runs, and no event of either is skipped.
+    """
+    db = SessionLocal()
+    start = outbox.latest_event_id(db)
+    db.close()
+
+    manufacturer_id, product_id = _manufacturer_product("slow")
+    concurrent = {}
+
+    def slow_rating(product, batch, materials):
+        def second_writer():
+            db = SessionLocal()
+            try:
+                product = Product(name="committed meanwhile", brand="B", manufacturer_id=manufacturer_id)
+                db.add(product)
+                db.commit()
+                concurrent["product_id"] = product.id
+            finally:
+                db.close()
+
+        # Another request, on its own connection, while this call is in flight
+        writer = threading.Thread(target=second_writer)
+        writer.start()
+        writer.join(timeout=10)
+        assert "product_id" in concurrent, "second transaction could not commit"
+
+        dispatcher.dispatch_once()
+        return {"rating": 4.0, "reasoning": "slow model"}
+
+    monkeypatch.setattr(crud_batch, "generate_ai_rating", slow_rating)
+
+    db = SessionLocal()
+    try:
+        batch, _ = crud_batch.create_batch(db, product_id, manufacturer_id, BatchCreate(
+            batch_code="SLOW-1",
+            manufacture_date=datetime(2025, 1, 1),
+            materials=[{"name": "Unrated Fiber", "percentage": 100}],
+        ))
+        score = db.query(AIScore).filter(AIScore.batch_id == batch.id).one()
+        assert score.source == "llm"
+
+        while dispatcher.dispatch_once():
+            pass
+
+        audited = _audited(db)
+        assert ("batch", batch.id, "created") in audited
+        assert ("product", concurrent["product_id"], "created") in audited
+        assert ("ai_score", score.id, "updated") in audited
+
+        # Every event written during the test reached the shared subscriber
+        events = db.execute(
+            select(OutboxEvent.entity, OutboxEvent.entity_id, OutboxEvent.action).where(OutboxEvent.id > start)
+        ).all()
+        assert set(events) <= audited
+    finally:
+        db.close()
+
+
+def _write_event(event_id: int):
+    with engine.begin() as conn:
+        conn.execute(insert(OutboxEvent.__table__).values(
+            id=event_id, entity="product", entity_id=event_id, action="updated", created_at=datetime.utcnow(),
+        ))
+
+
+def test_event_committed_inside_a_skipped_gap_is_delivered(dispatcher, received):
+    """
+    A hole older than OUTBOX_GAP_SECONDS is stepped over, but its id is
+    rescanned: the event committing late is still delivered to process and
+    shared subscribers, once.
+    """
+    db = SessionLocal()
+    try:
+        first = outbox.latest_event_id(db) + 1
+        _write_event(first)
+        _write_event(first + 2)  # first + 1 is still "in flight"
+
+        while dispatcher.dispatch_once():
+            pass
+        assert [e.id for e in received] == [first, first + 2]
+        assert dispatcher.skipped["test_probe"].keys() == {first + 1}
+        cursor = db.get(OutboxCursor, "audit_log")
+        assert cursor.last_event_id == first + 2
+        assert [event_id for event_id, _ in json.loads(cursor.skipped_ids)] == [first + 1]
+
+        # The slow transaction commits after the dispatcher moved on
+        _write_event(first + 1)
+        dispatcher.dispatch_once()
+        dispatcher.dispatch_once()
+
+        assert [e.id for e in received] == [first, first + 2, first + 1]
+        assert dispatcher.skipped["test_probe"] == {}
+        db.expire_all()
+        assert db.get(OutboxCursor, "audit_log").skipped_ids is None
+        audited = db.execute(
+            select(AuditLog.entity_id).where(AuditLog.entity_type == "product", AuditLog.entity_id >= first)
+        ).scalars().all()
+        assert sorted(audited) == [first, first + 1, first + 2]
+    finally:
+        db.close()
+
+
+def test_postgres_hole_waits_for_owning_transactions(monkeypatch):
+    """With snapshot bounds, a hole is never timed out: it is stepped over
+    only once every transaction running when it was seen has ended."""
+    monkeypatch.setattr(outbox, "OUTBOX_GAP_SECONDS", 0)
+    monkeypatch.setattr(outbox, "_snapshot_bound", lambda db, bound: 100)
+    dispatcher = outbox.Dispatcher(poll_seconds=0, batch_size=500)
+    rows = [SimpleNamespace(id=1), SimpleNamespace(id=3)]
+
+    assert dispatcher._contiguous(None, rows, 0, horizon=99) == ([rows[0]], [])
+    assert dispatcher._contiguous(None, rows, 0, horizon=99) == ([rows[0]], [])
+    # Proven absent: nothing to rescan
+    assert dispatcher._contiguous(None, rows, 0, horizon=100) == (rows, [])
@@ -0,0 +1,81 @@
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from app.core.responses import ModelResponse
+from app.crud.passport import get_batch_passport, get_batch_passports
+from app.models.ai_score import AIScore
+from app.models.batch import Batch, BatchStatus
+from app.models.lab_report import LabReport, SafetyStatus
+from app.models.material import BatchMaterial, Material, RiskLevel
+from app.models.transport import Transport
+from app.models.user import UserRole
+from app.services.report_bodies import store_body
+
+
+@pytest.fixture
+def stocked(db, make_user, make_product):
+    """(batch, maker, lab, transporter): a batch with one of everything a passport shows."""
+    maker = make_user()
+    batch = Batch(
+        product_id=make_product(maker).id,
+        batch_code="PASSPORT-1",
+        manufacture_date=datetime(2025, 1, 1),
+        status=BatchStatus.verified,
+    )
+    material = Material(name=f"Hemp {uuid.uuid4().hex[:6]}", risk_level=RiskLevel.high)
+    db.add_all([batch, material])
+    db.flush()
+
+    lab, transporter = make_user(UserRole.lab), make_user(UserRole.transporter)
+    db.add_all([
+        BatchMaterial(batch_id=batch.id, material_id=material.id, percentage=100),
+        Transport(
+            batch_id=batch.id, transporter_id=transporter.id, origin="Mumbai", destination="Paris",
+            distance_km=7000, fuel_type="diesel", transport_emission=12.5,
+        ),
+        LabReport(
+            batch_id=batch.id, lab_id=lab.id, lab_score=4, safety_status=SafetyStatus.safe,
+            body_hash=store_body(db, [{"title": "Metals", "content": "Lead: 0.1 ppm"}]),
+        ),
+        AIScore(batch_id=batch.id, rating=72, reasoning="ok", source="rules", confidence=0.9),
+    ])
+    db.commit()
+    return batch, maker, lab, transporter
+
+
+def test_passport_flattens_enums_and_resolves_shared_bodies(db, stocked):
+    batch, maker, lab, transporter = stocked
+    passport = get_batch_passport(db, batch.id)
+
+    assert passport.batch.manufacturer_name == maker.name
+    assert (passport.batch.status, passport.batch.validation_status) == ("verified", "auto_verified")
+    assert passport.materials[0].risk_level == RiskLevel.high
+    assert passport.transports[0].transporter_name == transporter.name
+    (report,) = passport.lab_reports
+    assert (report.lab_name, report.safety_status) == (lab.name, "safe")
+    assert report.analysis == [{"title": "Metals", "content": "Lead: 0.1 ppm"}]
+    assert (passport.ai_score.rating, passport.ai_score.source) == (72, "rules")
+
+    assert get_batch_passport(db, 999_999) is None
+
+
+def test_model_response_matches_the_default_encoder(db, stocked):
+    passport = get_batch_passport(db, stocked[0].id)
+
+    response = ModelResponse(passport, headers={"ETag": "x"})
+
+    assert response.media_type == "application/json"
+    assert response.headers["etag"] == "x"
+    assert json.loads(response.body) == jsonable_encoder(passport)
+
+
+def test_bulk_passports_skip_missing_batches(db, stocked):
+    batch = stocked[0]
+    passports = get_batch_passports(db, [batch.id, 999_999])
+
+    assert list(passports) == [batch.id]
+    assert passports[batch.id] == get_batch_passport(db, batch.id)
@@ -0,0 +1,67 @@
+import gzip
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.datastructures import Headers
+
+from app.core.static_files import PrecompressedStaticFiles, accepted_encodings
+from app.models.batch import Batch
+from app.services import passport_files
+
+
+@pytest.fixture
+def static_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(passport_files, "PASSPORT_STATIC_DIR", str(tmp_path))
+    monkeypatch.setattr(passport_files, "brotli", None)
+    return tmp_path
+
+
+@pytest.fixture
+def batch(db, make_product):
+    batch = Batch(product_id=make_product().id, batch_code="STATIC-1", manufacture_date=datetime(2025, 1, 1))
+    db.add(batch)
+    db.commit()
+    return batch
+
+
+def test_render_writes_plain_and_gzip_passports(db, static_dir, batch):
+    assert passport_files.render_batches(db, [batch.id, batch.id]) == 1
+
+    plain = (static_dir / f"{batch.id}.json").read_bytes()
+    assert json.loads(plain)["batch"]["code"] == "STATIC-1"
+    assert gzip.decompress((static_dir / f"{batch.id}.json.gz").read_bytes()) == plain
+    assert not any(p.name.startswith(".tmp-") for p in static_dir.iterdir())
+
+
+def test_render_removes_deleted_batches(db, static_dir, batch):
+    passport_files.render_batches(db, [batch.id])
+    batch_id = batch.id
+    db.delete(db.get(Batch, batch_id))
+    db.commit()
+
+    assert passport_files.render_batches(db, [batch_id]) == 0
+    assert list(static_dir.iterdir()) == []
+
+
+def test_static_files_prefer_the_precompressed_variant(tmp_path):
+    (tmp_path / "1.json").write_bytes(b'{"id": 1}')
+    (tmp_path / "1.json.gz").write_bytes(gzip.compress(b'{"id": 1}'))
+    app = FastAPI()
+    app.mount("/passports", PrecompressedStaticFiles(directory=str(tmp_path)))
+    client = TestClient(app)
+
+    zipped = client.get("/passports/1.json", headers={"Accept-Encoding": "br, gzip"})
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert zipped.headers["content-type"] == "application/json"
+    assert zipped.json() == {"id": 1}
+
+    plain = client.get("/passports/1.json", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == "Accept-Encoding"
+
+
+def test_accepted_encodings_skip_q_zero():
+    assert accepted_encodings(Headers({"accept-encoding": "gzip;q=0.5, br;q=0, deflate"})) == {"gzip", "deflate"}
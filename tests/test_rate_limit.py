@@ -0,0 +1,84 @@
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.core import rate_limit
+from app.core.rate_limit import LocalBuckets, client_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_spends_burst_then_refills(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    buckets = LocalBuckets(rate_per_second=1.0, burst=10)
+
+    assert buckets.take("a", 6) == 0
+    assert buckets.take("a", 4) == 0
+    assert buckets.take("a", 2) == 2.0  # empty: two seconds until 2 tokens
+    assert buckets.take("b", 10) == 0  # other clients are unaffected
+
+    clock.now += 2
+    assert buckets.take("a", 2) == 0
+    clock.now += 60
+    assert buckets.take("a", 11) == 1.0  # never refills past the burst
+
+
+def test_least_recent_buckets_are_evicted(monkeypatch):
+    monkeypatch.setattr(rate_limit.time, "monotonic", Clock())
+    buckets = LocalBuckets(rate_per_second=1.0, burst=5, max_keys=2)
+
+    buckets.take("a", 5)
+    buckets.take("b", 5)
+    buckets.take("c", 5)
+    assert list(buckets.buckets) == ["b", "c"]
+    assert buckets.take("a", 5) == 0  # forgotten, so full again
+
+
+def _request(forwarded=None, peer="10.0.0.1"):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 1234)})
+
+
+def test_client_ip_behind_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_TRUSTED_PROXIES", 0)
+    assert client_key(_request("1.1.1.1")) == "ip:10.0.0.1"
+
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_TRUSTED_PROXIES", 1)
+    # The client prepended a fake hop; the proxy appended the real address
+    assert client_key(_request("6.6.6.6, 203.0.113.7")) == "ip:203.0.113.7"
+    assert client_key(_request()) == "ip:10.0.0.1"
+
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_TRUSTED_PROXIES", 2)
+    assert client_key(_request("6.6.6.6, 203.0.113.7, 10.1.1.1")) == "ip:203.0.113.7"
+    assert client_key(_request("203.0.113.7")) == "ip:10.0.0.1"  # fewer hops than proxies
+
+
+def test_limited_route_returns_429_with_retry_after(monkeypatch):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_TRUSTED_PROXIES", 1)
+    monkeypatch.setattr(rate_limit, "buckets", LocalBuckets(rate_per_second=0.5, burst=2))
+
+    app = FastAPI()
+
+    @app.get("/passport", dependencies=[Depends(rate_limit.rate_limit("passport_view"))])
+    def passport():
+        return {"ok": True}
+
+    client = TestClient(app)
+    venue = {"X-Forwarded-For": "198.51.100.1"}
+    assert client.get("/passport", headers=venue).status_code == 200
+    assert client.get("/passport", headers=venue).status_code == 200
+
+    limited = client.get("/passport", headers=venue)
+    assert limited.status_code == 429
+    assert limited.headers["Retry-After"] == "2"
+
+    # Another client behind the same proxy has its own bucket
+    assert client.get("/passport", headers={"X-Forwarded-For": "198.51.100.2"}).status_code == 200
@@ -0,0 +1,56 @@
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.lab_report import LabMeasurement, LabReportBody
+from app.services import report_bodies
+from app.services.report_bodies import BodyCache, body_hash, load_bodies, store_body
+
+
+@pytest.fixture
+def analysis():
+    # Unique per test: bodies are shared across the whole database
+    return [{"title": "Heavy metals", "content": f"Lead: 0.4 ppm\nSample {uuid.uuid4().hex}"}]
+
+
+def _count(db, model, key):
+    column = model.hash if model is LabReportBody else model.body_hash
+    return db.scalar(select(func.count()).select_from(model).where(column == key))
+
+
+def test_identical_analyses_share_one_body(db, analysis):
+    key = store_body(db, analysis)
+    reordered = [{"content": analysis[0]["content"], "title": analysis[0]["title"]}]
+
+    assert store_body(db, reordered) == key == body_hash(analysis)
+    db.commit()
+
+    assert _count(db, LabReportBody, key) == 1
+    assert _count(db, LabMeasurement, key) == 1  # written by the first insert only
+    assert store_body(db, None) is None
+
+
+def test_load_bodies_queries_only_cache_misses(db, analysis, monkeypatch):
+    key = store_body(db, analysis)
+    db.commit()
+    monkeypatch.setattr(report_bodies, "cache", BodyCache(16))
+
+    assert load_bodies(db, [key, key, None]) == {key: analysis}
+    assert report_bodies.cache.stats()["misses"] == 1
+
+    # Served from the cache without a session
+    assert load_bodies(None, [key]) == {key: analysis}
+    assert report_bodies.cache.stats()["hits"] == 1
+
+
+def test_body_cache_evicts_least_recently_used():
+    cache = BodyCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.get("c") == (True, 3)
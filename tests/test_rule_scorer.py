@@ -0,0 +1,86 @@
+from datetime import datetime
+
+import pytest
+
+import app.crud.batch as crud_batch
+from app.models.ai_score import AIScore
+from app.models.material import Material, RiskLevel
+from app.schemas.batch import BatchCreate
+from app.services import rule_scorer
+from app.services.rule_scorer import score_composition, needs_escalation
+
+
+def test_confidence_is_the_rated_share_of_the_composition():
+    score = score_composition([
+        {"name": "Cotton", "percentage": 60, "risk_level": "low"},
+        {"name": "Mystery", "percentage": 40, "risk_level": None},
+    ])
+    assert score["confidence"] == 0.6
+    assert score["source"] == "rules"
+    assert "unrated materials: Mystery" in score["reasoning"]
+
+
+def test_incomplete_percentages_lower_confidence():
+    full = score_composition([{"name": "Cotton", "percentage": 100, "risk_level": RiskLevel.low}])
+    partial = score_composition([{"name": "Cotton", "percentage": 50, "risk_level": RiskLevel.low}])
+    assert full["confidence"] == 1.0
+    assert partial["confidence"] == 0.5
+    assert full["rating"] == partial["rating"]  # shares, not raw percentages
+
+
+def test_risk_and_traceability_move_the_rating():
+    low = score_composition([{"name": "A", "percentage": 100, "risk_level": "low"}])
+    high = score_composition([{"name": "A", "percentage": 100, "risk_level": "high"}])
+    sourced = score_composition([{"name": "A", "percentage": 100, "risk_level": "low", "source": "IN"}])
+    assert high["rating"] < low["rating"] < sourced["rating"]
+
+
+def test_empty_composition_has_no_rating():
+    score = score_composition([])
+    assert score["rating"] is None and score["confidence"] == 0.0
+    assert needs_escalation(score)
+
+
+def test_escalation_thresholds(monkeypatch):
+    confident = {"rating": 80.0, "confidence": 0.9}
+    unsure = {"rating": 80.0, "confidence": 0.5}
+    assert not needs_escalation(confident)
+    assert needs_escalation(unsure)
+    assert needs_escalation(confident, novel=True)
+
+    monkeypatch.setattr(rule_scorer, "RULE_SCORER_ESCALATE_NOVEL", False)
+    assert not needs_escalation(confident, novel=True)
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    calls = []
+
+    def rating(product, batch, materials):
+        calls.append(batch.batch_code)
+        return {"rating": 55.0, "reasoning": "llm"}
+
+    monkeypatch.setattr(crud_batch, "generate_ai_rating", rating)
+    return calls
+
+
+def test_novel_composition_escalates_even_when_rules_are_confident(db, make_product, llm_calls):
+    names = ["Rated Fiber A", "Rated Fiber B"]
+    db.add_all(Material(name=name, risk_level=RiskLevel.low) for name in names)
+    db.commit()
+    materials = [{"name": names[0], "percentage": 70}, {"name": names[1], "percentage": 30}]
+
+    def create(product, code):
+        product_id, manufacturer_id = product.id, product.manufacturer_id
+        db.commit()  # create_batch opens its own transaction
+        batch, _ = crud_batch.create_batch(db, product_id, manufacturer_id, BatchCreate(
+            batch_code=code, manufacture_date=datetime(2025, 1, 1), materials=materials,
+        ))
+        return db.query(AIScore).filter(AIScore.batch_id == batch.id).one()
+
+    first = create(make_product(), "NOVEL-1")
+    assert llm_calls == ["NOVEL-1"] and first.source == "llm"
+
+    # Same mix for another product: seen before, and the rules are sure
+    second = create(make_product(), "NOVEL-2")
+    assert llm_calls == ["NOVEL-1"] and second.source == "rules"
@@ -0,0 +1,107 @@
+import itertools
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.scheduled_job import ScheduledJob
+from app.services import scheduler
+
+_names = itertools.count(1)
+
+
+@pytest.fixture
+def job(db, monkeypatch):
+    """A registered test job, due now, that records each call."""
+    calls = []
+
+    def fn(db):
+        calls.append(datetime.utcnow())
+        if getattr(fn, "fail", False):
+            raise RuntimeError("boom")
+        return f"run {len(calls)}"
+
+    job = scheduler.Job(name=f"test_job_{next(_names)}", fn=fn, interval_seconds=3600)
+    job.calls = calls
+    monkeypatch.setitem(scheduler.JOBS, job.name, job)
+    monkeypatch.setattr(scheduler, "load_jobs", lambda: scheduler.JOBS)
+
+    scheduler.ensure_jobs(db)
+    _row(db, job).next_run_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    return job
+
+
+def _row(db, job):
+    db.expire_all()
+    return db.get(ScheduledJob, job.name)
+
+
+def test_parse_duration():
+    assert scheduler.parse_duration(90) == 90
+    assert scheduler.parse_duration("15m") == 900
+    assert scheduler.parse_duration(" 6h ") == 21600
+    with pytest.raises(ValueError):
+        scheduler.parse_duration("soon")
+
+
+def test_aligned_jobs_run_on_the_interval_boundary():
+    job = scheduler.Job(name="aligned", fn=None, interval_seconds=3600, align=True)
+    assert job.next_run(datetime(2025, 1, 1, 10, 42, 7)) == datetime(2025, 1, 1, 11, 0, 0)
+
+
+def test_due_job_runs_once_and_is_rescheduled(db, job):
+    assert scheduler.run_pending() >= 1
+    assert len(job.calls) == 1
+
+    row = _row(db, job)
+    assert row.last_status == "ok"
+    assert row.last_result == "run 1"
+    assert row.run_count == 1
+    assert row.locked_by is None and row.locked_until is None
+    assert row.next_run_at > datetime.utcnow() + timedelta(minutes=59)
+
+    scheduler.run_pending()
+    assert len(job.calls) == 1  # not due again yet
+
+
+def test_claim_is_exclusive_until_the_lock_expires(db, job):
+    now = datetime.utcnow()
+    assert scheduler._claim(db, job, now)
+    assert not scheduler._claim(db, job, now)  # held by the first claim
+
+    scheduler.run_pending()
+    assert job.calls == []
+
+    # The holder crashed: its lock times out and another pass retries
+    row = _row(db, job)
+    row.locked_by = "crashed:1"
+    row.locked_until = now - timedelta(seconds=1)
+    db.commit()
+
+    scheduler.run_pending()
+    assert len(job.calls) == 1
+    assert _row(db, job).locked_by is None
+
+
+def test_failed_run_is_recorded_and_unlocked(db, job):
+    job.fn.fail = True
+
+    scheduler.run_pending()
+
+    row = _row(db, job)
+    assert row.last_status == "error"
+    assert row.last_error == "RuntimeError: boom"
+    assert (row.run_count, row.failure_count) == (1, 1)
+    assert row.locked_until is None
+
+
+def test_run_now_ignores_the_schedule_but_not_the_lock(db, job):
+    row = _row(db, job)
+    row.next_run_at = datetime.utcnow() + timedelta(days=1)
+    db.commit()
+
+    status, result, error = scheduler.run_now(db, job.name)
+    assert (status, result, error) == ("ok", "run 1", None)
+
+    assert scheduler._claim(db, job, datetime.utcnow(), due_only=False)
+    assert scheduler.run_now(db, job.name) is None
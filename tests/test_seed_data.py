@@ -0,0 +1,84 @@
+import os
+import sqlite3
+import subprocess
+import sys
+from collections import defaultdict
+
+import pytest
+
+from app.services.composition import composition_fingerprint, composition_vector
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SMALL = [
+    "--manufacturers", "2", "--transporters", "2", "--labs", "1", "--consumers", "3",
+    "--materials", "40", "--products-per-manufacturer", "2", "--batches-per-product", "4",
+]
+
+
+def seed(directory, seed):
+    """Seed a fresh SQLite database in directory; returns a connection to it."""
+    subprocess.run(
+        [sys.executable, "-m", "scripts.seed_data", "--seed", str(seed), *SMALL],
+        cwd=directory,
+        env={**os.environ, "PYTHONPATH": ROOT, "DEBUG": "true"},
+        check=True,
+        capture_output=True,
+    )
+    return sqlite3.connect(os.path.join(directory, "ecotrace.db"))
+
+
+@pytest.fixture(scope="module")
+def seeded(tmp_path_factory):
+    return seed(tmp_path_factory.mktemp("seed"), 7)
+
+
+def _dump(conn, table):
+    return conn.execute(f"SELECT * FROM {table} ORDER BY 1").fetchall()
+
+
+def test_same_seed_gives_the_same_data(seeded, tmp_path_factory):
+    again = seed(tmp_path_factory.mktemp("seed"), 7)
+    other = seed(tmp_path_factory.mktemp("seed"), 8)
+
+    for table in ("batches", "batch_materials", "transports", "lab_reports", "reviews"):
+        assert _dump(again, table) == _dump(seeded, table), table
+    assert _dump(other, "batch_materials") != _dump(seeded, "batch_materials")
+
+
+def test_batches_carry_their_composition_fingerprint(seeded):
+    materials = defaultdict(list)
+    for batch_id, material_id, percentage in seeded.execute(
+        "SELECT batch_id, material_id, percentage FROM batch_materials"
+    ):
+        materials[batch_id].append((material_id, percentage))
+
+    for batch_id, vector, fingerprint in seeded.execute(
+        "SELECT id, composition_vector, composition_fingerprint FROM batches"
+    ):
+        assert 5 <= len(materials[batch_id]) <= 30
+        assert vector == composition_vector(materials[batch_id])
+        assert fingerprint == composition_fingerprint(vector)
+
+
+def test_transport_legs_form_a_chain_from_the_factory(seeded):
+    legs = defaultdict(list)
+    for batch_id, origin_id, destination_id in seeded.execute(
+        "SELECT batch_id, origin_id, destination_id FROM transports ORDER BY id"
+    ):
+        legs[batch_id].append((origin_id, destination_id))
+    factories = dict(seeded.execute("SELECT id, manufacturing_location_id FROM batches"))
+
+    assert legs
+    for batch_id, chain in legs.items():
+        assert chain[0][0] == factories[batch_id]
+        for (_, arrived), (departed, _) in zip(chain, chain[1:]):
+            assert departed == arrived
+
+
+def test_emission_buckets_are_built_from_the_seeded_transports(seeded):
+    transports, emission = seeded.execute("SELECT COUNT(*), SUM(transport_emission) FROM transports").fetchone()
+    bucketed, bucket_emission = seeded.execute("SELECT SUM(transports), SUM(emission) FROM emission_buckets").fetchone()
+
+    assert bucketed == transports
+    assert bucket_emission == pytest.approx(emission)